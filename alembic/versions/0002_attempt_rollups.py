@@ -0,0 +1,42 @@
+"""unauthorized attempt rollups
+
+Revision ID: 0002_attempt_rollups
+Revises: 0001_initial
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002_attempt_rollups"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "unauthorized_attempt_rollups",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("granularity", sa.String(10), nullable=False),
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("reason", sa.String(100), nullable=False),
+        sa.Column("ip", sa.String(64), nullable=True),
+        sa.Column("telegram_id", sa.BigInteger(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_seen", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("granularity", "bucket", "reason", "ip", "telegram_id", name="uq_attempt_rollup_key", postgresql_nulls_not_distinct=True),
+    )
+    op.execute(
+        """
+        INSERT INTO unauthorized_attempt_rollups (id, granularity, bucket, reason, ip, telegram_id, attempts, last_seen)
+        SELECT gen_random_uuid(), g.granularity, date_trunc(g.granularity, a.created_at), a.reason, a.ip, a.telegram_id, count(*), max(a.created_at)
+        FROM unauthorized_attempts a CROSS JOIN (VALUES ('minute'), ('hour')) AS g(granularity)
+        GROUP BY g.granularity, date_trunc(g.granularity, a.created_at), a.reason, a.ip, a.telegram_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("unauthorized_attempt_rollups")
@@ -0,0 +1,97 @@
+"""monthly range partitions for append-only tables
+
+Revision ID: 0003_partition_append_only
+Revises: 0002_attempt_rollups
+Create Date: 2026-10-19
+"""
+
+from datetime import UTC, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_partition_append_only"
+down_revision = "0002_attempt_rollups"
+branch_labels = None
+depends_on = None
+
+PREMAKE_MONTHS = 3
+
+TABLES = {
+    "chat_messages": {
+        "foreign_keys": [("stream_id", "streams"), ("user_id", "users")],
+        "indexes": ["stream_id", "user_id"],
+    },
+    "login_logs": {
+        "foreign_keys": [("user_id", "users")],
+        "indexes": ["user_id", "created_at"],
+    },
+    "unauthorized_attempts": {
+        "foreign_keys": [],
+        "indexes": ["telegram_id", "created_at"],
+    },
+    "transactions": {
+        "foreign_keys": [("user_id", "users"), ("stream_id", "streams")],
+        "indexes": ["user_id"],
+    },
+}
+
+ON_DELETE = {("transactions", "stream_id"): "SET NULL"}
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    years, month_index = divmod(moment.month - 1 + months, 12)
+    return moment.replace(year=moment.year + years, month=month_index + 1)
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.astimezone(UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    current = _month_start(datetime.now(UTC))
+    for table, spec in TABLES.items():
+        legacy = f"{table}_legacy"
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+        for column in spec["indexes"]:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}")
+
+        op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)")
+        for column, target in spec["foreign_keys"]:
+            on_delete = ON_DELETE.get((table, column), "CASCADE")
+            op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) REFERENCES {target}(id) ON DELETE {on_delete}")
+        for column in spec["indexes"]:
+            op.create_index(f"ix_{table}_{column}", table, [column])
+
+        oldest = bind.execute(sa.text(f"SELECT min(created_at) FROM {legacy}")).scalar()
+        month = _month_start(oldest) if oldest and oldest < current else current
+        last = _add_months(current, PREMAKE_MONTHS)
+        while month <= last:
+            end = _add_months(month, 1)
+            op.execute(f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')")
+            month = end
+        op.execute(f"CREATE TABLE {table}_pdefault PARTITION OF {table} DEFAULT")
+
+        op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        op.execute(f"DROP TABLE {legacy}")
+
+
+def downgrade() -> None:
+    for table, spec in TABLES.items():
+        partitioned = f"{table}_partitioned"
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        for column in spec["indexes"]:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}")
+
+        op.execute(f"CREATE TABLE {table} (LIKE {partitioned} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+        op.execute(f"DROP TABLE {partitioned} CASCADE")
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        for column, target in spec["foreign_keys"]:
+            on_delete = ON_DELETE.get((table, column), "CASCADE")
+            op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) REFERENCES {target}(id) ON DELETE {on_delete}")
+        for column in spec["indexes"]:
+            op.create_index(f"ix_{table}_{column}", table, [column])
@@ -0,0 +1,57 @@
+"""wallet ledger reconciliation checkpoints
+
+Revision ID: 0004_ledger_reconciliation
+Revises: 0003_partition_append_only
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004_ledger_reconciliation"
+down_revision = "0003_partition_append_only"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("wallets", sa.Column("initial_balance", sa.Integer(), nullable=False, server_default="0"))
+    op.execute(
+        """
+        UPDATE wallets w
+        SET initial_balance = w.balance - coalesce((SELECT sum(t.amount) FROM transactions t WHERE t.user_id = w.user_id), 0)
+        """
+    )
+    op.create_index("ix_transactions_created_at", "transactions", ["created_at"])
+
+    op.create_table(
+        "wallet_ledger_checkpoints",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("ledger_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("tx_count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("last_tx_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("last_tx_created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("mismatch", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("checked_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    op.create_table(
+        "ledger_reconciliation_runs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("cursor", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("scanned_rows", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("users_updated", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("wallets_checked", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("mismatches", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_ms", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_ledger_reconciliation_runs_cursor", "ledger_reconciliation_runs", ["cursor"])
+
+
+def downgrade() -> None:
+    op.drop_table("ledger_reconciliation_runs")
+    op.drop_table("wallet_ledger_checkpoints")
+    op.drop_index("ix_transactions_created_at", table_name="transactions")
+    op.drop_column("wallets", "initial_balance")
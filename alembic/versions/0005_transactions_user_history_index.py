@@ -0,0 +1,33 @@
+"""covering index for per-user transaction history
+
+Revision ID: 0005_transactions_user_history_index
+Revises: 0004_ledger_reconciliation
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_transactions_user_history_index"
+down_revision = "0004_ledger_reconciliation"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # reason is part of the history response, so it is included to keep the query index-only; capping it keeps
+    # every index row well under the btree row size limit.
+    op.alter_column("transactions", "reason", type_=sa.String(255), existing_nullable=True, postgresql_using="left(reason, 255)")
+    op.create_index(
+        "ix_transactions_user_created",
+        "transactions",
+        ["user_id", "created_at", "id"],
+        postgresql_include=["type", "amount", "stream_id", "reason"],
+    )
+    op.drop_index("ix_transactions_user_id", table_name="transactions")
+
+
+def downgrade() -> None:
+    op.create_index("ix_transactions_user_id", "transactions", ["user_id"])
+    op.drop_index("ix_transactions_user_created", table_name="transactions")
+    op.alter_column("transactions", "reason", type_=sa.Text(), existing_nullable=True)
@@ -0,0 +1,22 @@
+"""wallet version for balance cache
+
+Revision ID: 0006_wallet_version
+Revises: 0005_transactions_user_history_index
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_wallet_version"
+down_revision = "0005_transactions_user_history_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("wallets", sa.Column("version", sa.BigInteger(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("wallets", "version")
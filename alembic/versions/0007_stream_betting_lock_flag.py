@@ -0,0 +1,23 @@
+"""stream betting lock flag maintained by the lifecycle scheduler
+
+Revision ID: 0007_stream_betting_lock_flag
+Revises: 0006_wallet_version
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_stream_betting_lock_flag"
+down_revision = "0006_wallet_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("streams", sa.Column("is_betting_locked", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.execute("UPDATE streams SET is_betting_locked = true WHERE status <> 'SCHEDULED' OR least(betting_locked_at, start_time) <= now()")
+
+
+def downgrade() -> None:
+    op.drop_column("streams", "is_betting_locked")
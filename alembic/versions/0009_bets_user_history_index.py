@@ -0,0 +1,28 @@
+"""covering index for per-user bet history
+
+Revision ID: 0009_bets_user_history_index
+Revises: 0008_outbox
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0009_bets_user_history_index"
+down_revision = "0008_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_bets_user_created",
+        "bets",
+        ["user_id", "created_at", "id"],
+        postgresql_include=["stream_id", "team_id", "amount", "status"],
+    )
+    op.drop_index("ix_bets_user_id", table_name="bets")
+
+
+def downgrade() -> None:
+    op.create_index("ix_bets_user_id", "bets", ["user_id"])
+    op.drop_index("ix_bets_user_created", table_name="bets")
@@ -0,0 +1,94 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+
+def _percentile(sorted_samples: list[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def summarize(samples: list[float], wall_seconds: float | None = None, **extra: Any) -> dict[str, Any]:
+    # Samples are per-operation durations in seconds; wall_seconds is the elapsed time of the whole run
+    # (differs from sum(samples) when operations overlap).
+    ordered = sorted(samples)
+    wall = wall_seconds if wall_seconds is not None else sum(samples)
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "ops_per_sec": len(samples) / wall if wall else 0.0,
+        **extra,
+    }
+
+
+def measure(fn: Callable[[], Any], iterations: int, warmup: int = 100) -> dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+async def measure_async(fn: Callable[[], Awaitable[Any]], iterations: int, warmup: int = 20) -> dict[str, Any]:
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: Path, results: dict[str, dict[str, Any]], args: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "meta": {
+            "created_at": datetime.now(UTC).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "args": args,
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2, sort_keys=True))
+
+
+def compare(current: dict[str, dict[str, Any]], baseline_path: Path, threshold: float, metric: str = "p50_ms") -> list[str]:
+    baseline = json.loads(baseline_path.read_text())["results"]
+    regressions = []
+    print(f"{'benchmark':<45} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name in sorted(current):
+        if name not in baseline or not baseline[name].get(metric):
+            print(f"{name:<45} {'-':>12} {current[name][metric]:>12.3f} {'new':>9}")
+            continue
+        before, after = baseline[name][metric], current[name][metric]
+        change = after / before - 1
+        flag = " !" if change > threshold else ""
+        print(f"{name:<45} {before:>12.3f} {after:>12.3f} {change:>+8.1%}{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
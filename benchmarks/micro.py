@@ -0,0 +1,89 @@
+import hashlib
+import hmac
+import time
+import uuid
+from datetime import UTC, datetime
+from typing import Any
+
+from redis.asyncio import Redis
+
+from benchmarks.harness import measure, measure_async
+from src.core.config import get_settings
+from src.core.security import create_access_token, decode_token, verify_telegram_payload
+from src.models.entities import Bet, BetStatus, StreamStatus, StreamType, TransactionType
+from src.schemas.common import BetOut, StreamOut, TelegramAuthIn, TransactionOut, TransactionPageOut
+from src.services.chat_moderation import BannedWordMatcher, ChatModerator
+from src.services.rate_limit import RateLimiter
+
+
+def _signed_telegram_payload() -> dict[str, Any]:
+    payload = {"id": 123456789, "first_name": "Bench", "last_name": "User", "username": "bench_user", "auth_date": int(time.time())}
+    data_check_string = "\n".join(f"{k}={payload[k]}" for k in sorted(payload))
+    secret_key = hashlib.sha256(get_settings().bot_token.encode()).digest()
+    payload["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return payload
+
+
+def _stream_dict(teams: int = 2) -> dict[str, Any]:
+    stream_id, now = uuid.uuid4(), datetime.now(UTC)
+    return {
+        "id": stream_id,
+        "title": "Bench stream",
+        "description": "Benchmark fixture",
+        "stream_type": StreamType.TWITCH,
+        "stream_url": "https://twitch.tv/bench",
+        "status": StreamStatus.SCHEDULED,
+        "start_time": now,
+        "betting_locked_at": now,
+        "is_betting_locked": False,
+        "created_by": uuid.uuid4(),
+        "created_at": now,
+        "teams": [{"id": uuid.uuid4(), "stream_id": stream_id, "name": f"Team {i}", "logo_url": None, "color": "#fff"} for i in range(teams)],
+    }
+
+
+def run_cpu(iterations: int) -> dict[str, dict[str, Any]]:
+    telegram_payload = _signed_telegram_payload()
+    token = create_access_token(str(uuid.uuid4()))
+    stream = _stream_dict()
+    bet = Bet(
+        id=uuid.uuid4(), user_id=uuid.uuid4(), stream_id=uuid.uuid4(), team_id=uuid.uuid4(), amount=100, status=BetStatus.ACTIVE, created_at=datetime.now(UTC)
+    )
+    page = TransactionPageOut(
+        items=[
+            TransactionOut(
+                id=uuid.uuid4(), user_id=uuid.uuid4(), type=TransactionType.BET, amount=-100, stream_id=uuid.uuid4(), reason="bench", created_at=datetime.now(UTC)
+            )
+            for _ in range(50)
+        ],
+        next_cursor="x",
+    )
+    moderator = ChatModerator(flood_max=3, flood_window=5, duplicate_window=60, duplicate_threshold=0.8, refresh_seconds=5)
+    moderator.matcher = BannedWordMatcher(f"badword{i}" for i in range(1_000))
+    chat_message = "message with some ordinary chat text about the match"
+    assert verify_telegram_payload(telegram_payload)
+    return {
+        "micro.verify_telegram_payload": measure(lambda: verify_telegram_payload(telegram_payload), iterations),
+        "micro.decode_token": measure(lambda: decode_token(token), iterations),
+        "micro.schema.TelegramAuthIn.validate": measure(lambda: TelegramAuthIn.model_validate(telegram_payload), iterations),
+        "micro.schema.StreamOut.validate": measure(lambda: StreamOut.model_validate(stream), iterations),
+        "micro.schema.StreamOut.dump_json": measure(StreamOut.model_validate(stream).model_dump_json, iterations),
+        "micro.schema.BetOut.from_orm": measure(lambda: BetOut.model_validate(bet), iterations),
+        "micro.schema.TransactionPageOut50.dump_json": measure(page.model_dump_json, max(iterations // 10, 1)),
+        # A fresh user per call keeps flood/duplicate history empty, so this measures the filter and fingerprint.
+        "micro.chat_moderation.check_1000_words": measure(lambda: moderator.check(uuid.uuid4(), chat_message), iterations),
+    }
+
+
+async def run_redis(redis: Redis, iterations: int) -> dict[str, dict[str, Any]]:
+    limiter = RateLimiter(redis)
+    prefix = f"bench:{uuid.uuid4().hex}"
+    counter = iter(range(10**9))
+    results = {
+        "micro.RateLimiter.hit.same_key": await measure_async(lambda: limiter.hit(f"{prefix}:same", limit=10**9, window_seconds=60), iterations),
+        "micro.RateLimiter.hit.new_key": await measure_async(lambda: limiter.hit(f"{prefix}:{next(counter)}", limit=5, window_seconds=60), iterations),
+    }
+    keys = [key async for key in redis.scan_iter(match=f"rl:{prefix}:*", count=1000)]
+    if keys:
+        await redis.delete(*keys)
+    return results
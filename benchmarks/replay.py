@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.harness import summarize, write_results
+from src.core.config import get_settings
+from src.core.security import create_access_token
+
+# Route mix for --synthetic, weighted roughly like a live match: stream polling dominates, bets come in bursts.
+SYNTHETIC_MIX = [
+    ("GET", "/streams", 40),
+    ("GET", "/streams/{stream_id}", 20),
+    ("POST", "/bets", 15),
+    ("GET", "/bets/me", 10),
+    ("GET", "/leaderboards/global", 8),
+    ("GET", "/leaderboards/streams/{stream_id}", 4),
+    ("GET", "/wallet/transactions", 3),
+]
+STREAM_ROUTES = {"/streams/{stream_id}", "/leaderboards/streams/{stream_id}", "/streams/{stream_id}/chat/replay", "/bets"}
+
+
+def load_trace(paths: list[Path]) -> list[dict[str, Any]]:
+    # Capture files are per worker; merging by timestamp restores the combined arrival pattern.
+    entries = []
+    for path in paths:
+        with path.open() as fh:
+            entries.extend(json.loads(line) for line in fh if line.strip())
+    return sorted(entries, key=lambda e: e["t"])
+
+
+def synthetic_trace(requests: int, rps: float, users: int, streams: int, seed: int = 0) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    routes, weights = [(m, r) for m, r, _ in SYNTHETIC_MIX], [w for *_, w in SYNTHETIC_MIX]
+    t, trace = 0.0, []
+    for _ in range(requests):
+        t += rng.expovariate(rps)
+        method, route = rng.choices(routes, weights)[0]
+        trace.append({"t": t, "method": method, "route": route, "user": f"u{rng.randrange(users)}", "stream": f"s{rng.randrange(streams)}" if route in STREAM_ROUTES else None})
+    return trace
+
+
+def replayable(entry: dict[str, Any]) -> bool:
+    # Admin routes need admin tokens, /auth/telegram a Telegram signature and other writes a body we never
+    # captured; those are counted as skipped instead of being guessed at.
+    route, method = entry["route"], entry["method"]
+    if route == "unmatched" or route.startswith("/admin") or route.startswith("/auth/telegram"):
+        return False
+    if method == "POST":
+        return route == "/bets"
+    return method == "GET" and {part for part in route.split("/") if part.startswith("{")} <= {"{stream_id}"}
+
+
+class Cast:
+    """Maps trace pseudonyms onto seeded users/streams, keeping the trace's user and stream cardinality."""
+
+    def __init__(self, user_ids: list, streams: list):
+        self.tokens = [f"Bearer {create_access_token(str(u))}" for u in user_ids]
+        self.streams = streams
+        self.users: dict[str, int] = {}
+        self.stream_slots: dict[str, int] = {}
+
+    def headers(self, user: str | None) -> dict[str, str]:
+        if user is None:
+            return {}
+        slot = self.users.setdefault(user, len(self.users) % len(self.tokens))
+        return {"Authorization": self.tokens[slot]}
+
+    def stream(self, entry: dict[str, Any]) -> tuple[Any, list]:
+        # POST /bets captures carry no stream (it is in the body); spread them by user instead.
+        key = entry.get("stream") or f"user:{entry.get('user')}"
+        slot = self.stream_slots.setdefault(key, len(self.stream_slots) % len(self.streams))
+        return self.streams[slot]
+
+    def request(self, entry: dict[str, Any]) -> tuple[str, str, dict[str, str], dict[str, Any] | None]:
+        stream_id, teams = self.stream(entry)
+        url = entry["route"].replace("{stream_id}", str(stream_id))
+        body = None
+        if entry["method"] == "POST" and entry["route"] == "/bets":
+            body = {"stream_id": str(stream_id), "team_id": str(random.choice(teams)), "amount": random.randint(10, 500)}
+        return entry["method"], url, self.headers(entry.get("user")), body
+
+
+async def replay(client: httpx.AsyncClient, trace: list[dict[str, Any]], cast: Cast, speed: float, max_in_flight: int) -> dict[str, dict[str, Any]]:
+    # Open loop: requests are sent on the trace's schedule whether or not earlier ones finished, which is what
+    # real clients do. Past max_in_flight the request is dropped and counted, so an overloaded target shows up
+    # as drops and latency rather than silently stretching the schedule.
+    samples: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, Counter[str]] = defaultdict(Counter)
+    skipped: Counter[str] = Counter()
+    in_flight: set[asyncio.Task] = set()
+    loop = asyncio.get_running_loop()
+
+    async def send(key: str, method: str, url: str, headers: dict[str, str], body: dict[str, Any] | None) -> None:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, headers=headers, json=body)
+            statuses[key][str(response.status_code)] += 1
+        except httpx.HTTPError as exc:
+            statuses[key][type(exc).__name__] += 1
+        samples[key].append(time.perf_counter() - started)
+
+    t0, start = trace[0]["t"], loop.time()
+    for entry in trace:
+        key = f"{entry['method']} {entry['route']}"
+        if not replayable(entry):
+            skipped[key] += 1
+            continue
+        delay = (entry["t"] - t0) / speed - (loop.time() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            statuses[key]["dropped"] += 1
+            continue
+        task = asyncio.create_task(send(key, *cast.request(entry)))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    await asyncio.gather(*in_flight)
+    wall = loop.time() - start
+
+    results = {f"replay.{key}": summarize(values, wall, statuses=dict(statuses[key])) for key, values in sorted(samples.items())}
+    results["replay.total"] = summarize(
+        [s for values in samples.values() for s in values],
+        wall,
+        statuses=dict(sum(statuses.values(), Counter())),
+        skipped=dict(skipped),
+        speed=speed,
+        trace_seconds=trace[-1]["t"] - t0,
+    )
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay a captured (TRAFFIC_CAPTURE_ENABLED) or synthetic trace against a local instance.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--trace", type=Path, nargs="+", help="capture files (one per worker); merged by timestamp")
+    source.add_argument("--synthetic", type=int, metavar="N", help="generate N requests from SYNTHETIC_MIX instead")
+    parser.add_argument("--rps", type=float, default=200.0, help="arrival rate for --synthetic")
+    parser.add_argument("--users", type=int, default=500, help="distinct users for --synthetic")
+    parser.add_argument("--streams", type=int, default=4, help="distinct streams for --synthetic")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay at N x the recorded rate")
+    parser.add_argument("--max-users", type=int, default=5_000, help="cap on seeded users; extra trace users share them")
+    parser.add_argument("--max-in-flight", type=int, default=1_000)
+    parser.add_argument("--target", help="base URL of a running instance sharing DATABASE_URL; default: in-process app")
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results/replay.json"))
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    if get_settings().environment == "prod":
+        raise SystemExit("refusing to seed replay fixtures with ENVIRONMENT=prod; point DATABASE_URL at a scratch database")
+
+    from benchmarks.scenarios import Fixtures
+    from src.core.redis import redis_pool
+    from src.db.session import database
+
+    trace = load_trace(args.trace) if args.trace else synthetic_trace(args.synthetic, args.rps, args.users, args.streams)
+    if not trace:
+        raise SystemExit("empty trace")
+    users = min(args.max_users, max(1, len({e["user"] for e in trace if e.get("user")})))
+    streams = max(1, len({e["stream"] for e in trace if e.get("stream")}))
+
+    redis = redis_pool.get()
+    fixtures = Fixtures(redis)
+    try:
+        cast = Cast(await fixtures.users(users, balance=10_000_000), await fixtures.streams(streams))
+        if args.target:
+            client = httpx.AsyncClient(base_url=args.target, timeout=30)
+        else:
+            from src.main import create_app
+
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app()), base_url="http://replay", timeout=30)
+        async with client:
+            return await replay(client, trace, cast, args.speed, args.max_in_flight)
+    finally:
+        await fixtures.cleanup()
+        await redis_pool.close()
+        await database.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    write_results(args.output, results, {k: str(v) for k, v in vars(args).items()})
+    for name, summary in results.items():
+        print(f"{name:<55} n={summary['n']:<7} p50={summary['p50_ms']:.2f}ms p95={summary['p95_ms']:.2f}ms p99={summary['p99_ms']:.2f}ms rps={summary['ops_per_sec']:.1f} {summary['statuses']}")
+    print(f"results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any
+
+from benchmarks import micro, scenarios
+from benchmarks.harness import compare, write_results
+from src.core.config import get_settings
+
+
+def _sizes(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Hot-path microbenchmarks and end-to-end scenarios.")
+    parser.add_argument("--only", choices=["cpu", "micro", "scenarios", "stress"], help="cpu: no DB/Redis; micro: cpu + Redis + single-op DB; scenarios: end-to-end only; stress: wallet lock contention only")
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--bettors", type=int, default=1_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--settle-sizes", type=_sizes, default=[1_000, 10_000, 100_000])
+    parser.add_argument("--streams", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--stress-users", type=int, default=2_000)
+    parser.add_argument("--stress-streams", type=int, default=5)
+    parser.add_argument("--stress-adjustments", type=int, default=2_000)
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results/latest.json"))
+    parser.add_argument("--baseline", type=Path, help="compare against this results file and exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed p50 slowdown before flagging a regression")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    results = {}
+    if args.only in (None, "cpu", "micro"):
+        results.update(micro.run_cpu(args.iterations))
+    if args.only == "cpu":
+        return results
+
+    if get_settings().environment == "prod":
+        raise SystemExit("refusing to write benchmark fixtures with ENVIRONMENT=prod; point DATABASE_URL at a scratch database")
+
+    from src.core.redis import redis_pool
+    from src.db.session import database
+    from src.main import create_app
+
+    app = create_app()
+    logging.getLogger("src").setLevel(logging.WARNING)
+    redis = redis_pool.get()
+    try:
+        if args.only in (None, "micro"):
+            results.update(await micro.run_redis(redis, args.iterations // 10))
+            results["micro.place_bet"] = await scenarios.concurrent_bettors(redis, bettors=200, concurrency=1)
+            results["micro.settle_stream.100"] = await scenarios.settle(redis, bets=100, repeats=10)
+        if args.only in (None, "scenarios"):
+            results[f"scenario.bettors.{args.bettors}x{args.concurrency}"] = await scenarios.concurrent_bettors(redis, args.bettors, args.concurrency)
+            for size in args.settle_sizes:
+                results[f"scenario.settle.{size}"] = await scenarios.settle(redis, bets=size)
+            results[f"scenario.list_streams.{args.streams}"] = await scenarios.list_streams(app, redis, args.streams, args.requests, args.concurrency)
+        if args.only in (None, "stress"):
+            results["stress.wallet_contention"] = summary = await scenarios.wallet_contention(
+                redis, args.stress_users, args.stress_streams, args.stress_adjustments, args.concurrency
+            )
+            print(json.dumps({k: summary[k] for k in ("outcomes", "lock_wait", "lock_failures")}, indent=2))
+    finally:
+        await redis_pool.close()
+        await database.dispose()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    write_results(args.output, results, {k: str(v) for k, v in vars(args).items()})
+    for name, summary in results.items():
+        print(f"{name:<45} p50={summary['p50_ms']:.3f}ms p99={summary['p99_ms']:.3f}ms ops/s={summary['ops_per_sec']:.1f}")
+    print(f"results written to {args.output}")
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
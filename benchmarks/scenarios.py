@@ -0,0 +1,243 @@
+import asyncio
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from redis.asyncio import Redis
+from sqlalchemy import any_, bindparam, delete, insert
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+
+from benchmarks.harness import summarize
+from src.core.metrics import WALLET_LOCK_FAILURES, WALLET_LOCK_WAIT
+from src.core.security import create_access_token
+from src.db.session import database
+from src.models.entities import Bet, BetStatus, OutboxEvent, Stream, StreamStatus, StreamType, Team, User, UserRole, Wallet
+from src.schemas.common import BalanceCampaignIn
+from src.services.services import BettingService, WalletService
+
+
+class Fixtures:
+    """Bulk-inserts throwaway rows for one benchmark run and removes them afterwards."""
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self.user_ids: list[uuid.UUID] = []
+        self.stream_ids: list[uuid.UUID] = []
+        self._telegram_ids = iter(range(random.randint(10**12, 8 * 10**12), 9 * 10**12))
+
+    async def users(self, n: int, balance: int) -> list[uuid.UUID]:
+        ids = [uuid.uuid4() for _ in range(n)]
+        async with database.session() as session:
+            await session.execute(
+                insert(User),
+                [
+                    {"id": i, "telegram_id": next(self._telegram_ids), "username": f"bench_{i.hex[:12]}", "first_name": "Bench", "role": UserRole.USER, "is_whitelisted": True}
+                    for i in ids
+                ],
+            )
+            await session.execute(insert(Wallet), [{"user_id": i, "balance": balance, "initial_balance": balance} for i in ids])
+            await session.commit()
+        self.user_ids.extend(ids)
+        return ids
+
+    async def streams(self, n: int, start_in: timedelta = timedelta(hours=1)) -> list[tuple[uuid.UUID, list[uuid.UUID]]]:
+        start = datetime.now(UTC) + start_in
+        created = [(uuid.uuid4(), [uuid.uuid4(), uuid.uuid4()]) for _ in range(n)]
+        async with database.session() as session:
+            await session.execute(
+                insert(Stream),
+                [
+                    {
+                        "id": stream_id,
+                        "title": f"Bench {stream_id.hex[:8]}",
+                        "stream_type": StreamType.TWITCH,
+                        "stream_url": "https://twitch.tv/bench",
+                        "status": StreamStatus.SCHEDULED,
+                        "start_time": start,
+                        "betting_locked_at": start,
+                        "is_betting_locked": False,
+                    }
+                    for stream_id, _ in created
+                ],
+            )
+            await session.execute(
+                insert(Team),
+                [{"id": team_id, "stream_id": stream_id, "name": f"Team {i}"} for stream_id, teams in created for i, team_id in enumerate(teams)],
+            )
+            await session.commit()
+        self.stream_ids.extend(stream_id for stream_id, _ in created)
+        return created
+
+    async def bets(self, stream_id: uuid.UUID, teams: list[uuid.UUID], user_ids: list[uuid.UUID]) -> None:
+        async with database.session() as session:
+            await session.execute(
+                insert(Bet),
+                [
+                    {"id": uuid.uuid4(), "user_id": u, "stream_id": stream_id, "team_id": teams[i % len(teams)], "amount": random.randint(10, 1000), "status": BetStatus.ACTIVE}
+                    for i, u in enumerate(user_ids)
+                ],
+            )
+            await session.commit()
+
+    async def cleanup(self) -> None:
+        async with database.session() as session:
+            if self.stream_ids:
+                stream_ids = bindparam("stream_ids", self.stream_ids, type_=ARRAY(UUID(as_uuid=True)))
+                await session.execute(delete(OutboxEvent).where(OutboxEvent.stream_id == any_(stream_ids)))
+                await session.execute(delete(Stream).where(Stream.id == any_(stream_ids)))
+            if self.user_ids:
+                user_ids = bindparam("user_ids", self.user_ids, type_=ARRAY(UUID(as_uuid=True)))
+                await session.execute(delete(User).where(User.id == any_(user_ids)))
+            await session.commit()
+        for offset in range(0, len(self.user_ids), 1000):
+            await self.redis.delete(*(f"balance:{u}" for u in self.user_ids[offset : offset + 1000]))
+        self.user_ids, self.stream_ids = [], []
+
+
+async def concurrent_bettors(redis: Redis, bettors: int, concurrency: int) -> dict[str, Any]:
+    fixtures = Fixtures(redis)
+    try:
+        user_ids = await fixtures.users(bettors, balance=10_000)
+        [(stream_id, teams)] = await fixtures.streams(1)
+        gate = asyncio.Semaphore(concurrency)
+        samples: list[float] = []
+        errors: dict[str, int] = {}
+
+        async def bet(i: int, user_id: uuid.UUID) -> None:
+            async with gate, database.session() as session:
+                started = time.perf_counter()
+                try:
+                    await BettingService(session, redis).place_bet(User(id=user_id), stream_id, teams[i % 2], 100)
+                except HTTPException as exc:
+                    errors[str(exc.detail)] = errors.get(str(exc.detail), 0) + 1
+                samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(bet(i, u) for i, u in enumerate(user_ids)))
+        return summarize(samples, time.perf_counter() - started, concurrency=concurrency, errors=errors)
+    finally:
+        await fixtures.cleanup()
+
+
+async def settle(redis: Redis, bets: int, repeats: int = 1) -> dict[str, Any]:
+    fixtures = Fixtures(redis)
+    try:
+        samples = []
+        for _ in range(repeats):
+            user_ids = await fixtures.users(bets, balance=0)
+            [(stream_id, teams)] = await fixtures.streams(1, start_in=-timedelta(minutes=5))
+            await fixtures.bets(stream_id, teams, user_ids)
+            async with database.session() as session:
+                started = time.perf_counter()
+                await BettingService(session, redis).settle_stream(stream_id, teams[0])
+                samples.append(time.perf_counter() - started)
+        return summarize(samples, bets=bets)
+    finally:
+        await fixtures.cleanup()
+
+
+async def list_streams(app: FastAPI, redis: Redis, streams: int, requests: int, concurrency: int) -> dict[str, Any]:
+    fixtures = Fixtures(redis)
+    try:
+        [user_id] = await fixtures.users(1, balance=0)
+        await fixtures.streams(streams)
+        headers = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+        gate = asyncio.Semaphore(concurrency)
+        samples: list[float] = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            response = await client.get("/streams", headers=headers)
+            response.raise_for_status()
+
+            async def fetch() -> None:
+                async with gate:
+                    started = time.perf_counter()
+                    (await client.get("/streams", headers=headers)).raise_for_status()
+                    samples.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(fetch() for _ in range(requests)))
+        return summarize(samples, time.perf_counter() - started, streams=len(response.json()), concurrency=concurrency)
+    finally:
+        await fixtures.cleanup()
+
+
+def _lock_wait_delta(before: dict[tuple[str, ...], list[float]]) -> dict[str, dict[str, float]]:
+    report = {}
+    for (operation,), series in WALLET_LOCK_WAIT.values.items():
+        previous = before.get((operation,), [0] * len(series))
+        counts = [now - then for now, then in zip(series[:-1], previous[:-1])]
+        total = sum(counts)
+        if not total:
+            continue
+        # Histogram buckets only bound the p95 from above; the mean is exact.
+        running, p95_le = 0, float("inf")
+        for bound, count in zip(WALLET_LOCK_WAIT.buckets, counts):
+            running += count
+            if running >= 0.95 * total:
+                p95_le = bound * 1000
+                break
+        report[operation] = {"count": total, "mean_ms": (series[-1] - previous[-1]) / total * 1000, "p95_le_ms": p95_le}
+    return report
+
+
+async def wallet_contention(redis: Redis, users: int, streams: int, adjustments: int, concurrency: int) -> dict[str, Any]:
+    """Settlements, new bets, single adjustments and campaigns hitting overlapping wallets at once."""
+    fixtures = Fixtures(redis)
+    try:
+        user_ids = await fixtures.users(users, balance=1_000_000)
+        # Streams being settled stay open for betting, so late bets race the settlement for the stream row (their
+        # FK check takes a key-share lock on it while they already hold a wallet lock). Half the users are seeded
+        # with bets on them; the other half bet on them during the run.
+        seeded, late = user_ids[: users // 2], user_ids[users // 2 :]
+        finished = await fixtures.streams(streams)
+        for stream_id, teams in finished:
+            await fixtures.bets(stream_id, teams, random.sample(seeded, len(seeded)))
+        [(open_stream, open_teams)] = await fixtures.streams(1)
+
+        wait_before = {labels: list(series) for labels, series in WALLET_LOCK_WAIT.values.items()}
+        failures_before = dict(WALLET_LOCK_FAILURES.values)
+        gate = asyncio.Semaphore(concurrency)
+        samples: dict[str, list[float]] = defaultdict(list)
+        outcomes: Counter[str] = Counter()
+
+        async def run(kind: str, operation) -> None:
+            async with gate, database.session() as session:
+                started = time.perf_counter()
+                try:
+                    await operation(session)
+                    outcomes[f"{kind}.ok"] += 1
+                except HTTPException as exc:
+                    outcomes[f"{kind}.{exc.status_code}"] += 1
+                samples[kind].append(time.perf_counter() - started)
+
+        operations = [run("settle", lambda s, sid=sid, t=t: BettingService(s, redis).settle_stream(sid, t[0])) for sid, t in finished]
+        operations += [run("bet", lambda s, u=u: BettingService(s, redis).place_bet(User(id=u), open_stream, open_teams[0], 10)) for u in user_ids]
+        operations += [
+            run("late_bet", lambda s, u=u, sid=sid, t=t: BettingService(s, redis).place_bet(User(id=u), sid, t[1], 10)) for u in late for sid, t in finished
+        ]
+        operations += [run("adjust", lambda s: WalletService(s, redis).adjust(random.choice(user_ids), 1, "stress")) for _ in range(adjustments)]
+        operations += [
+            run("campaign", lambda s: WalletService(s, redis).bulk_adjust(BalanceCampaignIn(target="user_ids", amount=1, reason="stress", user_ids=random.sample(user_ids, min(500, users)))))
+            for _ in range(streams)
+        ]
+        random.shuffle(operations)
+        started = time.perf_counter()
+        await asyncio.gather(*operations)
+        wall = time.perf_counter() - started
+
+        failures = {f"{op}.{reason}": n - failures_before.get((op, reason), 0) for (op, reason), n in WALLET_LOCK_FAILURES.values.items()}
+        return summarize(
+            [sample for kind in samples.values() for sample in kind],
+            wall,
+            outcomes=dict(outcomes),
+            operations={kind: summarize(values) for kind, values in samples.items()},
+            lock_wait=_lock_wait_delta(wait_before),
+            lock_failures={k: v for k, v in failures.items() if v},
+        )
+    finally:
+        await fixtures.cleanup()
@@ -0,0 +1,20 @@
+import asyncio
+from datetime import timedelta
+
+from src.core.config import get_settings
+from src.core.logging import setup_logging
+from src.db.session import database
+from src.services.chat_archive import archive_finished_chats, get_chat_archive
+
+
+async def main() -> None:
+    settings = get_settings()
+    async with database.session() as db:
+        result = await archive_finished_chats(db, get_chat_archive(), timedelta(hours=settings.chat_archive_after_hours))
+    await database.dispose()
+    print(f"Archived chat: streams={result['streams']} messages={result['messages']}")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
@@ -0,0 +1,17 @@
+import asyncio
+import json
+
+from src.db.partitions import maintain_partitions
+from src.db.session import database
+
+
+async def main() -> None:
+    engine = database.configure().engine
+    async with engine.begin() as conn:
+        report = await maintain_partitions(conn)
+    await database.dispose()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
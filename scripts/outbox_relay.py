@@ -0,0 +1,19 @@
+import asyncio
+
+from src.core.logging import setup_logging
+from src.core.redis import redis_pool
+from src.db.session import database
+from src.services.outbox import OutboxRelay
+
+
+async def main() -> None:
+    try:
+        await OutboxRelay(redis_pool.get(), database.session).run()
+    finally:
+        await redis_pool.close()
+        await database.dispose()
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
@@ -0,0 +1,19 @@
+import asyncio
+
+from src.core.logging import setup_logging
+from src.core.redis import redis_pool
+from src.db.session import database
+from src.services.leaderboard import rebuild_leaderboards
+
+
+async def main() -> None:
+    async with database.session() as db:
+        result = await rebuild_leaderboards(db, redis_pool.get())
+    await redis_pool.close()
+    await database.dispose()
+    print(f"Rebuilt leaderboards: bets={result['bets']} users={result['users']} boards={result['boards']}")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
@@ -0,0 +1,17 @@
+import asyncio
+
+from src.core.logging import setup_logging
+from src.db.session import database
+from src.services.reconciliation import LedgerReconciler
+
+
+async def main() -> None:
+    async with database.session() as db:
+        run = await LedgerReconciler(db).run()
+    await database.dispose()
+    print(f"Reconciled: scanned={run.scanned_rows} users_updated={run.users_updated} mismatches={run.mismatches} duration_ms={run.duration_ms}")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(main())
@@ -3,7 +3,7 @@ import asyncio
 from sqlalchemy import select
 
 from src.core.config import get_settings
-from src.db.session import AsyncSessionLocal
+from src.db.session import database
 from src.models.entities import User, UserRole, Wallet
 
 
@@ -14,7 +14,7 @@ async def main() -> None:
         print("No TELEGRAM_ADMIN_IDS configured")
         return
 
-    async with AsyncSessionLocal() as db:
+    async with database.session() as db:
         for tg_id in admin_ids:
             user = await db.scalar(select(User).where(User.telegram_id == tg_id))
             if not user:
@@ -28,13 +28,14 @@ async def main() -> None:
                 )
                 db.add(user)
                 await db.flush()
-                db.add(Wallet(user_id=user.id, balance=10000))
+                db.add(Wallet(user_id=user.id, balance=10000, initial_balance=10000))
             else:
                 user.role = UserRole.ADMIN
                 user.is_whitelisted = True
                 if not await db.get(Wallet, user.id):
-                    db.add(Wallet(user_id=user.id, balance=10000))
+                    db.add(Wallet(user_id=user.id, balance=10000, initial_balance=10000))
         await db.commit()
+    await database.dispose()
     print("Seed complete")
 
 
@@ -1,34 +1,31 @@
 import uuid
-from collections.abc import AsyncGenerator
 
 from fastapi import Depends, HTTPException, Request, status
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.config import get_settings
+from src.core.redis import redis_pool
 from src.core.security import bearer_scheme, decode_token, extract_bearer_token
 from src.db.session import get_db
 from src.models.entities import User, UserRole, Wallet
 
 
-async def get_redis() -> AsyncGenerator[Redis, None]:
-    settings = get_settings()
-    redis = Redis.from_url(settings.redis_url, decode_responses=True)
-    try:
-        yield redis
-    finally:
-        await redis.close()
+async def get_redis() -> Redis:
+    return redis_pool.get()
 
 
-async def get_current_user(db: AsyncSession = Depends(get_db), credentials=Depends(bearer_scheme)) -> User:
+def get_token_user_id(credentials=Depends(bearer_scheme)) -> uuid.UUID:
+    # Verifies the token without touching the database, for dependencies that must run before a session opens.
     token = extract_bearer_token(credentials)
     payload = decode_token(token)
     sub = payload.get("sub")
     try:
-        user_id = uuid.UUID(sub)
+        return uuid.UUID(sub)
     except (ValueError, TypeError) as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject") from exc
 
+
+async def get_current_user(db: AsyncSession = Depends(get_db), user_id: uuid.UUID = Depends(get_token_user_id)) -> User:
     user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
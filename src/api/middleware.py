@@ -0,0 +1,209 @@
+import logging
+import random
+import re
+import time
+import uuid
+from urllib.parse import parse_qsl
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import get_settings
+from src.core.logging import request_id_var
+from src.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT, OVERLOAD_SHED
+from src.core.overload import CRITICAL, LOW, classify, loop_lag
+from src.core.traffic import bearer_subject, create_traffic_recorder
+from src.db.instrumentation import QueryStats, current_query_stats, pool_wait
+
+sql_logger = logging.getLogger("src.sql")
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+
+class RequestContextMiddleware:
+    # Accepts a caller-supplied X-Request-ID (e.g. from the proxy) or mints one, exposes it to log records
+    # through a contextvar and echoes it back on the response.
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        incoming = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"x-request-id"), "")
+        request_id = incoming if REQUEST_ID_PATTERN.fullmatch(incoming) else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((b"x-request-id", request_id.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
+
+
+class SQLInstrumentationMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        settings = get_settings()
+        self.detect_repeats = settings.environment != "prod"
+        self.repeat_threshold = settings.sql_n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(detect_repeats=self.detect_repeats)
+        token = current_query_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and stats.count:
+                timing = f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries", db-slowest;dur={stats.slowest_ms:.2f}'
+                message.setdefault("headers", []).append((b"server-timing", timing.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            if stats.count:
+                sql_logger.info(
+                    "sql method=%s path=%s queries=%d db_ms=%.2f slowest_ms=%.2f slowest=%r",
+                    scope["method"],
+                    scope["path"],
+                    stats.count,
+                    stats.total_ms,
+                    stats.slowest_ms,
+                    stats.slowest_statement,
+                )
+            for statement, n in stats.repeated(self.repeat_threshold):
+                sql_logger.warning("possible N+1 method=%s path=%s repeats=%d statement=%r", scope["method"], scope["path"], n, statement)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            )
+
+
+class OverloadSheddingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        settings = get_settings()
+        self.enabled = settings.overload_shedding_enabled
+        self.low_prefixes = tuple(p.strip() for p in settings.overload_low_priority_paths.split(",") if p.strip())
+        self.critical_prefixes = tuple(p.strip() for p in settings.overload_critical_paths.split(",") if p.strip())
+        self.retry_after = str(settings.overload_retry_after_seconds)
+        self.thresholds = (
+            ("pool_wait", lambda: pool_wait.current_ms(), settings.overload_pool_wait_soft_ms, settings.overload_pool_wait_hard_ms),
+            ("in_flight", lambda: self.in_flight, settings.overload_in_flight_soft, settings.overload_in_flight_hard),
+            ("loop_lag", lambda: loop_lag.lag_ms, settings.overload_loop_lag_soft_ms, settings.overload_loop_lag_hard_ms),
+        )
+        self.in_flight = 0
+
+    def pressure(self) -> tuple[int, str]:
+        # 0 = healthy, 1 = past a soft threshold (shed low priority), 2 = past a hard one (shed all but critical).
+        level, signal = 0, ""
+        for name, read, soft, hard in self.thresholds:
+            value = read()
+            current = 2 if value >= hard else 1 if value >= soft else 0
+            if current > level:
+                level, signal = current, name
+        return level, signal
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        loop_lag.ensure_started()
+        priority = classify(scope["method"], scope["path"], self.low_prefixes, self.critical_prefixes)
+        if priority != CRITICAL:
+            level, signal = self.pressure()
+            if level >= (1 if priority == LOW else 2):
+                OVERLOAD_SHED.inc(priority, signal)
+                response = JSONResponse({"detail": "Server overloaded, retry later"}, status_code=503, headers={"Retry-After": self.retry_after})
+                await response(scope, receive, send)
+                return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+
+class TrafficCaptureMiddleware:
+    # Opt-in (TRAFFIC_CAPTURE_ENABLED): records anonymized request shapes for benchmarks/replay.py.
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.sample_rate = get_settings().traffic_capture_sample_rate
+        self.recorder = create_traffic_recorder()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        status_code, response_bytes = 500, 0
+
+        async def send_with_size(message: Message) -> None:
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_size)
+        finally:
+            latency_ms = (time.perf_counter() - started) * 1000
+            headers = dict(scope["headers"])
+            route = scope.get("route")
+            stream_id = scope.get("path_params", {}).get("stream_id") or dict(parse_qsl(scope["query_string"].decode("latin-1"))).get("stream_id")
+            self.recorder.record(
+                {
+                    "t": round(started_at, 3),
+                    "method": scope["method"],
+                    "route": route.path if route is not None else "unmatched",
+                    "status": status_code,
+                    "latency_ms": round(latency_ms, 3),
+                    "req_bytes": int(headers.get(b"content-length") or 0),
+                    "resp_bytes": response_bytes,
+                    "user": self.recorder.pseudonym(bearer_subject(headers[b"authorization"])) if b"authorization" in headers else None,
+                    "stream": self.recorder.pseudonym(str(stream_id)) if stream_id else None,
+                }
+            )
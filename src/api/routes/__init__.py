@@ -1 +1 @@
-from src.api.routes import admin, auth, bets, streams  # noqa: F401
+from src.api.routes import admin, auth, bets, metrics, streams, wallet  # noqa: F401
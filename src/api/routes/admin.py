@@ -1,33 +1,45 @@
 import uuid
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from redis.asyncio import Redis
-from sqlalchemy import desc, func, select
+from sqlalchemy import desc, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.deps import get_redis, require_admin
-from src.db.session import get_db
+from src.db.session import database, get_db, get_read_db
 from src.models.entities import (
     Bet,
     ChatMessage,
+    LedgerReconciliationRun,
     LoginLog,
     Stream,
     Team,
-    Transaction,
-    TransactionType,
     UnauthorizedAttempt,
+    UnauthorizedAttemptRollup,
     User,
     UserRole,
     Wallet,
 )
 from src.schemas.common import (
     AdminUserCreate,
+    AttemptOffenderOut,
+    AttemptSeriesPointOut,
     AdminUserPatch,
     BalanceAdjustIn,
+    BalanceCampaignIn,
+    BalanceCampaignOut,
+    BannedWordsIn,
+    BannedWordsOut,
     BetOut,
+    LedgerMismatchOut,
     LoginLogOut,
+    ReconciliationRunOut,
+    SecurityBlockOut,
+    SettlementPreviewOut,
     SetWinnerIn,
+    StreamBulkCreate,
     StreamCreate,
     StreamOut,
     StreamStatsOut,
@@ -37,13 +49,18 @@ from src.schemas.common import (
     UnauthorizedAttemptOut,
     UserOut,
 )
-from src.services.services import BettingService
+from src.services.chat_moderation import BANNED_WORDS_KEY, set_banned_words
+from src.services.outbox import record_event
+from src.services.reconciliation import LedgerReconciler
+from src.services.scheduler import notify_schedule_changed, sync_betting_lock
+from src.services.security_analytics import BlockList
+from src.services.services import BettingService, WalletService
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @router.get("/users", response_model=list[UserOut])
-async def list_users(db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
+async def list_users(db: AsyncSession = Depends(get_read_db), _: User = Depends(require_admin)):
     users = list(await db.scalars(select(User).order_by(User.created_at.desc())))
     return [UserOut.model_validate(u) for u in users]
 
@@ -67,7 +84,7 @@ async def create_user(payload: AdminUserCreate, db: AsyncSession = Depends(get_d
     )
     db.add(user)
     await db.flush()
-    db.add(Wallet(user_id=user.id, balance=0))
+    db.add(Wallet(user_id=user.id, balance=0, initial_balance=0))
     await db.commit()
     await db.refresh(user)
     return UserOut.model_validate(user)
@@ -78,8 +95,10 @@ async def patch_user(user_id: uuid.UUID, payload: AdminUserPatch, db: AsyncSessi
     user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    for field, value in payload.model_dump(exclude_none=True).items():
+    changes = payload.model_dump(exclude_none=True)
+    for field, value in changes.items():
         setattr(user, field, value)
+    record_event(db, "user.updated", {"user_id": user_id, "changes": changes})
     await db.commit()
     await db.refresh(user)
     return UserOut.model_validate(user)
@@ -91,6 +110,7 @@ async def ban_user(user_id: uuid.UUID, db: AsyncSession = Depends(get_db), _: Us
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.is_banned = True
+    record_event(db, "user.banned", {"user_id": user_id})
     await db.commit()
     return {"ok": True}
 
@@ -101,28 +121,59 @@ async def unban_user(user_id: uuid.UUID, db: AsyncSession = Depends(get_db), _:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.is_banned = False
+    record_event(db, "user.unbanned", {"user_id": user_id})
     await db.commit()
     return {"ok": True}
 
 
 @router.post("/users/{user_id}/balance-adjust")
-async def balance_adjust(user_id: uuid.UUID, payload: BalanceAdjustIn, db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
-    async with db.begin():
-        wallet = await db.scalar(select(Wallet).where(Wallet.user_id == user_id).with_for_update())
-        if not wallet:
-            raise HTTPException(status_code=404, detail="Wallet not found")
-        wallet.balance += payload.amount
-        db.add(Transaction(user_id=user_id, type=TransactionType.ADMIN_ADJUST, amount=payload.amount, reason=payload.reason))
+async def balance_adjust(
+    user_id: uuid.UUID,
+    payload: BalanceAdjustIn,
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    _: User = Depends(require_admin),
+):
+    await WalletService(db, redis).adjust(user_id, payload.amount, payload.reason)
     return {"ok": True}
 
 
+@router.post("/balance-campaigns", response_model=BalanceCampaignOut)
+async def balance_campaign(
+    payload: BalanceCampaignIn,
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    _: User = Depends(require_admin),
+):
+    return await WalletService(db, redis).bulk_adjust(payload)
+
+
+@router.post("/reconciliation/run", response_model=ReconciliationRunOut)
+async def run_reconciliation(_: User = Depends(require_admin)):
+    async with database.session() as session:
+        run = await LedgerReconciler(session).run()
+    return ReconciliationRunOut.model_validate(run)
+
+
+@router.get("/reconciliation/runs", response_model=list[ReconciliationRunOut])
+async def reconciliation_runs(limit: int = Query(default=20, ge=1, le=500), db: AsyncSession = Depends(get_read_db), _: User = Depends(require_admin)):
+    rows = list(await db.scalars(select(LedgerReconciliationRun).order_by(LedgerReconciliationRun.created_at.desc()).limit(limit)))
+    return [ReconciliationRunOut.model_validate(r) for r in rows]
+
+
+@router.get("/reconciliation/mismatches", response_model=list[LedgerMismatchOut])
+async def reconciliation_mismatches(db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
+    rows = await LedgerReconciler(db).list_mismatches()
+    return [LedgerMismatchOut.model_validate(r) for r in rows]
+
+
 @router.post("/users/{user_id}/mute")
 async def mute_user(user_id: uuid.UUID, db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
     return {"ok": True, "note": "Mute entity reserved; enforce in websocket layer if needed."}
 
 
 @router.post("/streams", response_model=StreamOut)
-async def create_stream(payload: StreamCreate, db: AsyncSession = Depends(get_db), admin: User = Depends(require_admin)):
+async def create_stream(payload: StreamCreate, db: AsyncSession = Depends(get_db), redis: Redis = Depends(get_redis), admin: User = Depends(require_admin)):
     if len(payload.teams) < 2:
         raise HTTPException(status_code=400, detail="At least 2 teams required")
     stream = Stream(
@@ -135,11 +186,14 @@ async def create_stream(payload: StreamCreate, db: AsyncSession = Depends(get_db
         betting_locked_at=payload.betting_locked_at,
         created_by=admin.id,
     )
+    sync_betting_lock(stream)
     db.add(stream)
     await db.flush()
     for t in payload.teams:
         db.add(Team(stream_id=stream.id, name=t.name, logo_url=t.logo_url, color=t.color))
+    record_event(db, "stream.created", {"title": stream.title, "status": stream.status, "start_time": stream.start_time}, stream.id)
     await db.commit()
+    await notify_schedule_changed(redis, stream.id)
     teams = list(await db.scalars(select(Team).where(Team.stream_id == stream.id)))
     return StreamOut(
         id=stream.id,
@@ -150,20 +204,102 @@ async def create_stream(payload: StreamCreate, db: AsyncSession = Depends(get_db
         status=stream.status,
         start_time=stream.start_time,
         betting_locked_at=stream.betting_locked_at,
+        is_betting_locked=stream.is_betting_locked,
         created_by=stream.created_by,
         created_at=stream.created_at,
         teams=[TeamOut.model_validate(t) for t in teams],
     )
 
 
+def _bracket_errors(payload: StreamBulkCreate) -> list[dict]:
+    # Everything the database would reject mid-insert is caught here, so a bad bracket never writes a row.
+    errors = []
+    limits = (("title", Stream.title), ("stream_url", Stream.stream_url))
+    team_limits = (("name", Team.name), ("logo_url", Team.logo_url), ("color", Team.color))
+    for i, s in enumerate(payload.streams):
+        if len(s.teams) < 2:
+            errors.append({"stream": i, "error": "At least 2 teams required"})
+        if len({t.name.strip().casefold() for t in s.teams}) != len(s.teams):
+            errors.append({"stream": i, "error": "Duplicate team names"})
+        if s.betting_locked_at > s.start_time:
+            errors.append({"stream": i, "error": "betting_locked_at after start_time"})
+        for field, column in limits:
+            if len(getattr(s, field)) > column.type.length:
+                errors.append({"stream": i, "error": f"{field} longer than {column.type.length}"})
+        for j, t in enumerate(s.teams):
+            for field, column in team_limits:
+                value = getattr(t, field)
+                if value is not None and len(value) > column.type.length:
+                    errors.append({"stream": i, "team": j, "error": f"{field} longer than {column.type.length}"})
+    return errors
+
+
+@router.post("/streams/bulk", response_model=list[StreamOut])
+async def bulk_create_streams(payload: StreamBulkCreate, db: AsyncSession = Depends(get_db), redis: Redis = Depends(get_redis), admin: User = Depends(require_admin)):
+    errors = _bracket_errors(payload)
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+    streams, teams = [], []
+    for s in payload.streams:
+        stream = Stream(
+            id=uuid.uuid4(),
+            title=s.title,
+            description=s.description,
+            stream_type=s.stream_type,
+            stream_url=s.stream_url,
+            status=s.status,
+            start_time=s.start_time,
+            betting_locked_at=s.betting_locked_at,
+            created_by=admin.id,
+        )
+        sync_betting_lock(stream)
+        streams.append(stream)
+        teams.append([Team(id=uuid.uuid4(), stream_id=stream.id, name=t.name, logo_url=t.logo_url, color=t.color) for t in s.teams])
+
+    columns = ("id", "title", "description", "stream_type", "stream_url", "status", "start_time", "betting_locked_at", "is_betting_locked", "created_by")
+    created_at = await db.scalars(
+        insert(Stream).returning(Stream.created_at, sort_by_parameter_order=True),
+        [{c: getattr(stream, c) for c in columns} for stream in streams],
+    )
+    for stream, at in zip(streams, created_at.all()):
+        stream.created_at = at
+    await db.execute(insert(Team), [{"id": t.id, "stream_id": t.stream_id, "name": t.name, "logo_url": t.logo_url, "color": t.color} for group in teams for t in group])
+    for stream in streams:
+        record_event(db, "stream.created", {"title": stream.title, "status": stream.status, "start_time": stream.start_time, "bulk": True}, stream.id)
+    await db.commit()
+    # The scheduler reloads its whole heap on any notification, so one publish covers the bracket.
+    await notify_schedule_changed(redis, streams[0].id)
+    return [
+        StreamOut(
+            id=stream.id,
+            title=stream.title,
+            description=stream.description,
+            stream_type=stream.stream_type,
+            stream_url=stream.stream_url,
+            status=stream.status,
+            start_time=stream.start_time,
+            betting_locked_at=stream.betting_locked_at,
+            is_betting_locked=stream.is_betting_locked,
+            created_by=stream.created_by,
+            created_at=stream.created_at,
+            teams=[TeamOut.model_validate(t) for t in group],
+        )
+        for stream, group in zip(streams, teams)
+    ]
+
+
 @router.patch("/streams/{stream_id}", response_model=StreamOut)
-async def update_stream(stream_id: uuid.UUID, payload: StreamUpdate, db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
+async def update_stream(stream_id: uuid.UUID, payload: StreamUpdate, db: AsyncSession = Depends(get_db), redis: Redis = Depends(get_redis), _: User = Depends(require_admin)):
     stream = await db.get(Stream, stream_id)
     if not stream:
         raise HTTPException(status_code=404, detail="Stream not found")
-    for field, value in payload.model_dump(exclude_none=True).items():
+    changes = payload.model_dump(exclude_none=True)
+    for field, value in changes.items():
         setattr(stream, field, value)
+    sync_betting_lock(stream)
+    record_event(db, "stream.updated", {"changes": changes, "is_betting_locked": stream.is_betting_locked}, stream.id)
     await db.commit()
+    await notify_schedule_changed(redis, stream.id)
     teams = list(await db.scalars(select(Team).where(Team.stream_id == stream.id)))
     return StreamOut(
         id=stream.id,
@@ -174,6 +310,7 @@ async def update_stream(stream_id: uuid.UUID, payload: StreamUpdate, db: AsyncSe
         status=stream.status,
         start_time=stream.start_time,
         betting_locked_at=stream.betting_locked_at,
+        is_betting_locked=stream.is_betting_locked,
         created_by=stream.created_by,
         created_at=stream.created_at,
         teams=[TeamOut.model_validate(t) for t in teams],
@@ -181,22 +318,28 @@ async def update_stream(stream_id: uuid.UUID, payload: StreamUpdate, db: AsyncSe
 
 
 @router.post("/streams/{stream_id}/status")
-async def set_stream_status(stream_id: uuid.UUID, payload: StreamStatusIn, db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
+async def set_stream_status(stream_id: uuid.UUID, payload: StreamStatusIn, db: AsyncSession = Depends(get_db), redis: Redis = Depends(get_redis), _: User = Depends(require_admin)):
     stream = await db.get(Stream, stream_id)
     if not stream:
         raise HTTPException(status_code=404, detail="Stream not found")
     stream.status = payload.status
+    sync_betting_lock(stream)
+    record_event(db, "stream.status_changed", {"status": stream.status, "is_betting_locked": stream.is_betting_locked}, stream.id)
     await db.commit()
+    await notify_schedule_changed(redis, stream.id)
     return {"ok": True}
 
 
 @router.post("/streams/{stream_id}/lock-betting")
-async def lock_betting(stream_id: uuid.UUID, db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
+async def lock_betting(stream_id: uuid.UUID, db: AsyncSession = Depends(get_db), redis: Redis = Depends(get_redis), _: User = Depends(require_admin)):
     stream = await db.get(Stream, stream_id)
     if not stream:
         raise HTTPException(status_code=404, detail="Stream not found")
-    stream.betting_locked_at = datetime.utcnow()
+    stream.betting_locked_at = datetime.now(UTC)
+    stream.is_betting_locked = True
+    record_event(db, "stream.betting_locked", {"betting_locked_at": stream.betting_locked_at}, stream.id)
     await db.commit()
+    await notify_schedule_changed(redis, stream.id)
     return {"ok": True}
 
 
@@ -212,8 +355,19 @@ async def set_winner(
     return {"ok": True}
 
 
+@router.get("/streams/{stream_id}/settlement-preview", response_model=SettlementPreviewOut)
+async def settlement_preview(
+    stream_id: uuid.UUID,
+    top: int = Query(default=5, ge=0, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
+    _: User = Depends(require_admin),
+):
+    return await BettingService(db, redis).preview_settlement(stream_id, top)
+
+
 @router.get("/bets", response_model=list[BetOut])
-async def admin_bets(stream_id: uuid.UUID | None = None, db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
+async def admin_bets(stream_id: uuid.UUID | None = None, db: AsyncSession = Depends(get_read_db), _: User = Depends(require_admin)):
     stmt = select(Bet)
     if stream_id:
         stmt = stmt.where(Bet.stream_id == stream_id)
@@ -222,7 +376,7 @@ async def admin_bets(stream_id: uuid.UUID | None = None, db: AsyncSession = Depe
 
 
 @router.get("/streams/{stream_id}/stats", response_model=StreamStatsOut)
-async def stream_stats(stream_id: uuid.UUID, db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
+async def stream_stats(stream_id: uuid.UUID, db: AsyncSession = Depends(get_read_db), _: User = Depends(require_admin)):
     bets = list(await db.scalars(select(Bet).where(Bet.stream_id == stream_id)))
     total = sum(b.amount for b in bets)
     per_team: dict[str, int] = {}
@@ -245,7 +399,7 @@ async def stream_stats(stream_id: uuid.UUID, db: AsyncSession = Depends(get_db),
 async def unauthorized_attempts(
     telegram_id: int | None = Query(default=None),
     since: datetime | None = Query(default=None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     _: User = Depends(require_admin),
 ):
     stmt = select(UnauthorizedAttempt)
@@ -257,17 +411,95 @@ async def unauthorized_attempts(
     return [UnauthorizedAttemptOut.model_validate(r) for r in rows]
 
 
+@router.get("/security/top-offenders", response_model=list[AttemptOffenderOut])
+async def top_offenders(
+    by: Literal["ip", "telegram_id"] = Query(default="ip"),
+    granularity: Literal["minute", "hour"] = Query(default="hour"),
+    since: datetime | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    _: User = Depends(require_admin),
+):
+    rollup = UnauthorizedAttemptRollup
+    key = rollup.ip if by == "ip" else rollup.telegram_id
+    total = func.sum(rollup.attempts)
+    stmt = (
+        select(key, total, func.max(rollup.last_seen))
+        .where(rollup.granularity == granularity, rollup.bucket >= (since or datetime.now(UTC) - timedelta(days=1)), key.is_not(None))
+        .group_by(key)
+        .order_by(desc(total))
+        .limit(limit)
+    )
+    rows = (await db.execute(stmt)).all()
+    return [AttemptOffenderOut(key=str(k), attempts=n, last_seen=seen) for k, n, seen in rows]
+
+
+@router.get("/security/attempts-series", response_model=list[AttemptSeriesPointOut])
+async def attempts_series(
+    granularity: Literal["minute", "hour"] = Query(default="hour"),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    reason: str | None = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+    _: User = Depends(require_admin),
+):
+    rollup = UnauthorizedAttemptRollup
+    stmt = select(rollup.bucket, func.sum(rollup.attempts)).where(
+        rollup.granularity == granularity, rollup.bucket >= (since or datetime.now(UTC) - timedelta(days=1))
+    )
+    if until is not None:
+        stmt = stmt.where(rollup.bucket < until)
+    if reason is not None:
+        stmt = stmt.where(rollup.reason == reason)
+    rows = (await db.execute(stmt.group_by(rollup.bucket).order_by(rollup.bucket))).all()
+    return [AttemptSeriesPointOut(bucket=bucket, attempts=n) for bucket, n in rows]
+
+
+@router.get("/security/blocks", response_model=list[SecurityBlockOut])
+async def security_blocks(redis: Redis = Depends(get_redis), _: User = Depends(require_admin)):
+    blocks = await BlockList(redis).list_blocks()
+    return [SecurityBlockOut(kind=kind, value=value, ttl_seconds=ttl) for kind, value, ttl in blocks]
+
+
+@router.delete("/security/blocks/{kind}/{value}")
+async def remove_security_block(kind: Literal["ip", "tg"], value: str, redis: Redis = Depends(get_redis), _: User = Depends(require_admin)):
+    if not await BlockList(redis).unblock(kind, value):
+        raise HTTPException(status_code=404, detail="Block not found")
+    return {"ok": True}
+
+
 @router.get("/security/logins", response_model=list[LoginLogOut])
-async def login_logs(db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
-    rows = list(await db.scalars(select(LoginLog).order_by(LoginLog.created_at.desc())))
+async def login_logs(
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+    _: User = Depends(require_admin),
+):
+    stmt = select(LoginLog)
+    if since is not None:
+        stmt = stmt.where(LoginLog.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(LoginLog.created_at < until)
+    rows = list(await db.scalars(stmt.order_by(LoginLog.created_at.desc())))
     return [LoginLogOut.model_validate(r) for r in rows]
 
 
 @router.delete("/chat/messages/{message_id}")
 async def delete_chat_message(message_id: uuid.UUID, db: AsyncSession = Depends(get_db), _: User = Depends(require_admin)):
-    msg = await db.get(ChatMessage, message_id)
+    msg = await db.scalar(select(ChatMessage).where(ChatMessage.id == message_id))
     if not msg:
         raise HTTPException(status_code=404, detail="Message not found")
     msg.is_deleted = True
     await db.commit()
     return {"ok": True}
+
+
+@router.get("/chat/banned-words", response_model=BannedWordsOut)
+async def get_banned_words(redis: Redis = Depends(get_redis), _: User = Depends(require_admin)):
+    return BannedWordsOut(words=sorted(await redis.smembers(BANNED_WORDS_KEY)))
+
+
+@router.put("/chat/banned-words", response_model=BannedWordsOut)
+async def put_banned_words(payload: BannedWordsIn, redis: Redis = Depends(get_redis), _: User = Depends(require_admin)):
+    # Replaces the whole list; every worker recompiles its matcher within CHAT_BANNED_WORDS_REFRESH_SECONDS.
+    return BannedWordsOut(words=await set_banned_words(redis, payload.words))
@@ -1,19 +1,51 @@
 import uuid
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from redis.asyncio import Redis
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.deps import get_current_user, get_redis
+from src.api.deps import get_current_user, get_redis, get_token_user_id
+from src.api.pagination import decode_cursor, encode_cursor
+from src.core.metrics import BETS_PLACED, BETS_REJECTED
 from src.db.session import get_db
-from src.models.entities import User
-from src.schemas.common import BetCreate, BetOut
+from src.models.entities import Bet, BetStatus, Stream, Team, User
+from src.schemas.common import BetCreate, BetHistoryItemOut, BetHistoryPageOut, BetOut
+from src.services.admission import get_bet_admission
 from src.services.services import BettingService, enforce_whitelisted
 
 router = APIRouter(prefix="/bets", tags=["bets"])
 
+# Fixed label set for bets_rejected_total; anything not listed is counted as "other" so new messages cannot grow
+# the series count.
+REJECTION_REASONS = {
+    "Temporarily blocked": "blocked",
+    "Banned": "banned",
+    "Not whitelisted": "not_whitelisted",
+    "Rate limit exceeded": "rate_limited",
+    "Amount must be positive": "invalid_amount",
+    "Insufficient balance": "insufficient_balance",
+    "Stream not found": "stream_not_found",
+    "Betting locked": "betting_locked",
+    "Invalid team": "invalid_team",
+    "One bet per stream allowed": "duplicate_bet",
+    "Wallet busy, retry later": "wallet_busy",
+}
 
-@router.post("", response_model=BetOut)
+
+def rejection_reason(exc: HTTPException) -> str:
+    return REJECTION_REASONS.get(exc.detail, "other") if isinstance(exc.detail, str) else "other"
+
+
+async def admit_bet(payload: BetCreate, user_id: uuid.UUID = Depends(get_token_user_id)) -> AsyncIterator[None]:
+    # Declared ahead of get_db in place_bet, so a queued bet waits without holding a pooled connection; keyed on
+    # the token subject because the user row is not loaded yet. Admission rejections are counted by the gate.
+    async with get_bet_admission().admit(payload.stream_id, user_id):
+        yield
+
+
+@router.post("", response_model=BetOut, dependencies=[Depends(admit_bet)])
 async def place_bet(
     payload: BetCreate,
     request: Request,
@@ -21,24 +53,53 @@ async def place_bet(
     redis: Redis = Depends(get_redis),
     user: User = Depends(get_current_user),
 ):
-    await enforce_whitelisted(db, request, user, "/bets")
-    bet = await BettingService(db, redis).place_bet(user, payload.stream_id, payload.team_id, payload.amount)
+    try:
+        await enforce_whitelisted(db, request, user, "/bets", redis)
+        bet = await BettingService(db, redis).place_bet(user, payload.stream_id, payload.team_id, payload.amount)
+    except HTTPException as exc:
+        BETS_REJECTED.inc(rejection_reason(exc))
+        raise
+    BETS_PLACED.inc()
     return BetOut.model_validate(bet)
 
 
-@router.get("/me", response_model=list[BetOut])
+@router.get("/me", response_model=BetHistoryPageOut)
 async def my_bets(
     request: Request,
     stream_id: uuid.UUID | None = Query(default=None),
+    status: list[BetStatus] | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
     db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
     user: User = Depends(get_current_user),
 ):
-    await enforce_whitelisted(db, request, user, "/bets/me")
-    from sqlalchemy import select
-    from src.models.entities import Bet
-
-    stmt = select(Bet).where(Bet.user_id == user.id)
+    await enforce_whitelisted(db, request, user, "/bets/me", redis)
+    stmt = (
+        select(
+            Bet.id,
+            Bet.user_id,
+            Bet.stream_id,
+            Bet.team_id,
+            Bet.amount,
+            Bet.status,
+            Bet.created_at,
+            Stream.title.label("stream_title"),
+            Stream.status.label("stream_status"),
+            Team.name.label("team_name"),
+            Team.logo_url.label("team_logo_url"),
+        )
+        .join(Stream, Stream.id == Bet.stream_id)
+        .join(Team, Team.id == Bet.team_id)
+        .where(Bet.user_id == user.id)
+    )
     if stream_id:
         stmt = stmt.where(Bet.stream_id == stream_id)
-    bets = list(await db.scalars(stmt.order_by(Bet.created_at.desc())))
-    return [BetOut.model_validate(b) for b in bets]
+    if status:
+        stmt = stmt.where(Bet.status.in_(status))
+    if cursor is not None:
+        stmt = stmt.where(tuple_(Bet.created_at, Bet.id) < tuple_(*decode_cursor(cursor)))
+    rows = (await db.execute(stmt.order_by(Bet.created_at.desc(), Bet.id.desc()).limit(limit + 1))).mappings().all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1]["created_at"], page[-1]["id"]) if len(rows) > limit else None
+    return BetHistoryPageOut(items=[BetHistoryItemOut.model_validate(dict(r)) for r in page], next_cursor=next_cursor)
@@ -0,0 +1,84 @@
+import uuid
+from datetime import UTC, datetime
+
+from fastapi import APIRouter, Depends, Query, Request
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.deps import get_current_user, get_redis
+from src.db.session import get_db
+from src.models.entities import User
+from src.schemas.common import LeaderboardEntryOut, LeaderboardPageOut, UserStatsOut
+from src.services.leaderboard import GLOBAL_KEY, Leaderboards, stream_key, week_id, weekly_key
+from src.services.services import enforce_whitelisted
+
+router = APIRouter(prefix="/leaderboards", tags=["leaderboards"])
+
+
+async def _page(db: AsyncSession, redis: Redis, board: str, key: str, offset: int, limit: int) -> LeaderboardPageOut:
+    total, rows = await Leaderboards(redis).page(key, offset, limit)
+    names = {}
+    if rows:
+        names = {r.id: r for r in await db.execute(select(User.id, User.username, User.first_name).where(User.id.in_([user_id for user_id, _ in rows])))}
+    items = [
+        LeaderboardEntryOut(
+            rank=offset + i + 1,
+            user_id=user_id,
+            username=names[user_id].username if user_id in names else None,
+            first_name=names[user_id].first_name if user_id in names else None,
+            profit=profit,
+        )
+        for i, (user_id, profit) in enumerate(rows)
+    ]
+    return LeaderboardPageOut(board=board, total=total, offset=offset, limit=limit, items=items)
+
+
+@router.get("/global", response_model=LeaderboardPageOut)
+async def global_leaderboard(
+    request: Request,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    user: User = Depends(get_current_user),
+):
+    await enforce_whitelisted(db, request, user, "/leaderboards/global", redis)
+    return await _page(db, redis, "global", GLOBAL_KEY, offset, limit)
+
+
+@router.get("/weekly", response_model=LeaderboardPageOut)
+async def weekly_leaderboard(
+    request: Request,
+    week: str | None = Query(default=None, pattern=r"^\d{4}-W\d{2}$", description="ISO week, e.g. 2026-W42; defaults to the current week"),
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    user: User = Depends(get_current_user),
+):
+    await enforce_whitelisted(db, request, user, "/leaderboards/weekly", redis)
+    week = week or week_id(datetime.now(UTC))
+    return await _page(db, redis, f"weekly:{week}", weekly_key(week), offset, limit)
+
+
+@router.get("/streams/{stream_id}", response_model=LeaderboardPageOut)
+async def stream_leaderboard(
+    stream_id: uuid.UUID,
+    request: Request,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    user: User = Depends(get_current_user),
+):
+    await enforce_whitelisted(db, request, user, "/leaderboards/streams", redis)
+    return await _page(db, redis, f"stream:{stream_id}", stream_key(stream_id), offset, limit)
+
+
+@router.get("/me", response_model=UserStatsOut)
+async def my_stats(request: Request, db: AsyncSession = Depends(get_db), redis: Redis = Depends(get_redis), user: User = Depends(get_current_user)):
+    await enforce_whitelisted(db, request, user, "/leaderboards/me", redis)
+    stats = await Leaderboards(redis).stats(user.id, week_id(datetime.now(UTC)))
+    decided = stats["wins"] + stats["losses"]
+    return UserStatsOut(**stats, win_rate=stats["wins"] / decided if decided else 0.0)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.core.metrics import CHAT_CONNECTIONS, DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW, DB_POOL_SIZE, REGISTRY
+from src.db.session import database
+from src.websocket.chat import connections
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    for name, pool_engine in (("primary", database.engine), ("replica", database.read_engine)):
+        if pool_engine is None:
+            continue
+        pool = pool_engine.pool
+        DB_POOL_CHECKED_OUT.set(pool.checkedout(), name)
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0), name)
+        DB_POOL_SIZE.set(pool.size(), name)
+    CHAT_CONNECTIONS.clear()
+    for stream_id, sockets in connections.items():
+        if sockets:
+            CHAT_CONNECTIONS.set(len(sockets), str(stream_id))
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -1,13 +1,18 @@
+import asyncio
 import uuid
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Query, Request
+from redis.asyncio import Redis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.deps import get_current_user
-from src.db.session import get_db
+from src.api.deps import get_current_user, get_redis
+from src.api.pagination import decode_cursor, encode_cursor
+from src.db.session import get_db, get_read_db
 from src.models.entities import Stream, Team, User
-from src.schemas.common import StreamOut, TeamOut
+from src.schemas.common import ChatReplayPageOut, StreamOut, TeamOut
+from src.services.chat_archive import get_chat_archive
 from src.services.services import enforce_whitelisted
 
 router = APIRouter(prefix="/streams", tags=["streams"])
@@ -24,6 +29,7 @@ async def _to_stream_out(db: AsyncSession, stream: Stream) -> StreamOut:
         status=stream.status,
         start_time=stream.start_time,
         betting_locked_at=stream.betting_locked_at,
+        is_betting_locked=stream.is_betting_locked,
         created_by=stream.created_by,
         created_at=stream.created_at,
         teams=[TeamOut.model_validate(t) for t in teams],
@@ -31,18 +37,49 @@ async def _to_stream_out(db: AsyncSession, stream: Stream) -> StreamOut:
 
 
 @router.get("", response_model=list[StreamOut])
-async def list_streams(request: Request, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
-    await enforce_whitelisted(db, request, user, "/streams")
-    streams = list(await db.scalars(select(Stream).order_by(Stream.start_time.desc())))
-    return [await _to_stream_out(db, s) for s in streams]
+async def list_streams(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
+    user: User = Depends(get_current_user),
+):
+    await enforce_whitelisted(db, request, user, "/streams", redis)
+    streams = list(await read_db.scalars(select(Stream).order_by(Stream.start_time.desc())))
+    return [await _to_stream_out(read_db, s) for s in streams]
 
 
 @router.get("/{stream_id}", response_model=StreamOut)
-async def get_stream(stream_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
-    await enforce_whitelisted(db, request, user, "/streams/{id}")
-    stream = await db.get(Stream, stream_id)
+async def get_stream(
+    stream_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+    redis: Redis = Depends(get_redis),
+    user: User = Depends(get_current_user),
+):
+    await enforce_whitelisted(db, request, user, "/streams/{id}", redis)
+    stream = await read_db.get(Stream, stream_id)
     if not stream:
         from fastapi import HTTPException
 
         raise HTTPException(status_code=404, detail="Stream not found")
-    return await _to_stream_out(db, stream)
+    return await _to_stream_out(read_db, stream)
+
+
+@router.get("/{stream_id}/chat/replay", response_model=ChatReplayPageOut)
+async def replay_chat(
+    stream_id: uuid.UUID,
+    request: Request,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=200, ge=1, le=2000),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    user: User = Depends(get_current_user),
+):
+    await enforce_whitelisted(db, request, user, "/streams/{id}/chat/replay", redis)
+    after = decode_cursor(cursor) if cursor is not None else None
+    items, last = await asyncio.to_thread(get_chat_archive().replay_page, stream_id, since, until, limit, after)
+    return ChatReplayPageOut(items=items, next_cursor=encode_cursor(*last) if last else None)
@@ -0,0 +1,40 @@
+import uuid
+
+from fastapi import APIRouter, Depends, Query, Request
+from redis.asyncio import Redis
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.deps import get_current_user, get_redis
+from src.api.pagination import decode_cursor, encode_cursor
+from src.db.session import get_db
+from src.models.entities import Transaction, TransactionType, User
+from src.schemas.common import TransactionOut, TransactionPageOut
+from src.services.services import enforce_whitelisted
+
+router = APIRouter(prefix="/wallet", tags=["wallet"])
+
+
+@router.get("/transactions", response_model=TransactionPageOut)
+async def my_transactions(
+    request: Request,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    type: TransactionType | None = Query(default=None),
+    stream_id: uuid.UUID | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis),
+    user: User = Depends(get_current_user),
+):
+    await enforce_whitelisted(db, request, user, "/wallet/transactions", redis)
+    stmt = select(Transaction).where(Transaction.user_id == user.id)
+    if type is not None:
+        stmt = stmt.where(Transaction.type == type)
+    if stream_id is not None:
+        stmt = stmt.where(Transaction.stream_id == stream_id)
+    if cursor is not None:
+        stmt = stmt.where(tuple_(Transaction.created_at, Transaction.id) < tuple_(*decode_cursor(cursor)))
+    rows = list(await db.scalars(stmt.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(limit + 1)))
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    return TransactionPageOut(items=[TransactionOut.model_validate(t) for t in page], next_cursor=next_cursor)
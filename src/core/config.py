@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,12 +11,68 @@ class Settings(BaseSettings):
     app_name: str = "stavki-cs2-backend"
     environment: str = "dev"
     database_url: str = Field(alias="DATABASE_URL")
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    database_read_url: str | None = Field(default=None, alias="DATABASE_READ_URL")
+    replica_max_lag_seconds: float = Field(default=5.0, alias="REPLICA_MAX_LAG_SECONDS")
+    replica_lag_check_interval_seconds: float = Field(default=2.0, alias="REPLICA_LAG_CHECK_INTERVAL_SECONDS")
     redis_url: str = Field(alias="REDIS_URL")
+    redis_max_connections: int = Field(default=50, alias="REDIS_MAX_CONNECTIONS")
     bot_token: str = Field(alias="BOT_TOKEN")
     jwt_secret: str = Field(alias="JWT_SECRET")
     jwt_expire_minutes: int = Field(default=120, alias="JWT_EXPIRE_MINUTES")
     telegram_admin_ids: str = Field(default="", alias="TELEGRAM_ADMIN_IDS")
     cors_origins: str = "*"
+    sql_n_plus_one_threshold: int = Field(default=5, alias="SQL_N_PLUS_ONE_THRESHOLD")
+    security_ip_block_threshold: int = Field(default=50, alias="SECURITY_IP_BLOCK_THRESHOLD")
+    security_telegram_block_threshold: int = Field(default=20, alias="SECURITY_TELEGRAM_BLOCK_THRESHOLD")
+    security_block_ttl_seconds: int = Field(default=900, alias="SECURITY_BLOCK_TTL_SECONDS")
+    balance_cache_ttl_seconds: int = Field(default=300, alias="BALANCE_CACHE_TTL_SECONDS")
+    partition_premake_months: int = Field(default=3, alias="PARTITION_PREMAKE_MONTHS")
+    partition_retention: str = Field(default="chat_messages:6,login_logs:12,unauthorized_attempts:6", alias="PARTITION_RETENTION")
+    partition_expire_action: Literal["detach", "drop"] = Field(default="detach", alias="PARTITION_EXPIRE_ACTION")
+    reconcile_safety_lag_seconds: int = Field(default=120, alias="RECONCILE_SAFETY_LAG_SECONDS")
+    stream_scheduler_enabled: bool = Field(default=True, alias="STREAM_SCHEDULER_ENABLED")
+    stream_scheduler_lease_seconds: float = Field(default=15.0, alias="STREAM_SCHEDULER_LEASE_SECONDS")
+    stream_scheduler_resync_seconds: float = Field(default=60.0, alias="STREAM_SCHEDULER_RESYNC_SECONDS")
+    wallet_lock_timeout_ms: int = Field(default=2000, alias="WALLET_LOCK_TIMEOUT_MS")
+    wallet_lock_retries: int = Field(default=3, alias="WALLET_LOCK_RETRIES")
+    wallet_lock_retry_backoff_ms: int = Field(default=50, alias="WALLET_LOCK_RETRY_BACKOFF_MS")
+    bet_admission_max_concurrent: int = Field(default=8, alias="BET_ADMISSION_MAX_CONCURRENT")
+    bet_admission_queue_size: int = Field(default=64, alias="BET_ADMISSION_QUEUE_SIZE")
+    bet_admission_max_wait_ms: int = Field(default=2000, alias="BET_ADMISSION_MAX_WAIT_MS")
+    overload_shedding_enabled: bool = Field(default=True, alias="OVERLOAD_SHEDDING_ENABLED")
+    overload_pool_wait_soft_ms: float = Field(default=50.0, alias="OVERLOAD_POOL_WAIT_SOFT_MS")
+    overload_pool_wait_hard_ms: float = Field(default=250.0, alias="OVERLOAD_POOL_WAIT_HARD_MS")
+    overload_in_flight_soft: int = Field(default=256, alias="OVERLOAD_IN_FLIGHT_SOFT")
+    overload_in_flight_hard: int = Field(default=512, alias="OVERLOAD_IN_FLIGHT_HARD")
+    overload_loop_lag_soft_ms: float = Field(default=100.0, alias="OVERLOAD_LOOP_LAG_SOFT_MS")
+    overload_loop_lag_hard_ms: float = Field(default=300.0, alias="OVERLOAD_LOOP_LAG_HARD_MS")
+    overload_retry_after_seconds: int = Field(default=2, alias="OVERLOAD_RETRY_AFTER_SECONDS")
+    overload_low_priority_paths: str = Field(default="/admin,/bets/me,/wallet/transactions,/leaderboards", alias="OVERLOAD_LOW_PRIORITY_PATHS")
+    overload_critical_paths: str = Field(default="/bets,/auth,/health,/metrics", alias="OVERLOAD_CRITICAL_PATHS")
+    outbox_batch_size: int = Field(default=500, alias="OUTBOX_BATCH_SIZE")
+    outbox_poll_interval_seconds: float = Field(default=0.5, alias="OUTBOX_POLL_INTERVAL_SECONDS")
+    outbox_stream_maxlen: int = Field(default=100000, alias="OUTBOX_STREAM_MAXLEN")
+    outbox_retention_hours: int = Field(default=72, alias="OUTBOX_RETENTION_HOURS")
+    outbox_safety_lag_seconds: float = Field(default=2.0, alias="OUTBOX_SAFETY_LAG_SECONDS")
+    chat_archive_dir: str = Field(default="var/chat_archive", alias="CHAT_ARCHIVE_DIR")
+    chat_archive_block_messages: int = Field(default=500, alias="CHAT_ARCHIVE_BLOCK_MESSAGES")
+    chat_archive_after_hours: int = Field(default=24, alias="CHAT_ARCHIVE_AFTER_HOURS")
+    admin_dashboard_tick_ms: int = Field(default=1000, alias="ADMIN_DASHBOARD_TICK_MS")
+    admin_dashboard_resync_seconds: float = Field(default=300.0, alias="ADMIN_DASHBOARD_RESYNC_SECONDS")
+    admin_dashboard_presence_ttl_seconds: float = Field(default=30.0, alias="ADMIN_DASHBOARD_PRESENCE_TTL_SECONDS")
+    admin_dashboard_join_timeout_seconds: float = Field(default=10.0, alias="ADMIN_DASHBOARD_JOIN_TIMEOUT_SECONDS")
+    admin_dashboard_send_timeout_seconds: float = Field(default=5.0, alias="ADMIN_DASHBOARD_SEND_TIMEOUT_SECONDS")
+    traffic_capture_enabled: bool = Field(default=False, alias="TRAFFIC_CAPTURE_ENABLED")
+    traffic_capture_path: str = Field(default="var/traffic/capture-{pid}.jsonl", alias="TRAFFIC_CAPTURE_PATH")
+    traffic_capture_sample_rate: float = Field(default=1.0, alias="TRAFFIC_CAPTURE_SAMPLE_RATE")
+    chat_flood_max_messages: int = Field(default=5, alias="CHAT_FLOOD_MAX_MESSAGES")
+    chat_flood_window_seconds: float = Field(default=5.0, alias="CHAT_FLOOD_WINDOW_SECONDS")
+    chat_duplicate_window_seconds: float = Field(default=60.0, alias="CHAT_DUPLICATE_WINDOW_SECONDS")
+    chat_duplicate_similarity: float = Field(default=0.8, alias="CHAT_DUPLICATE_SIMILARITY")
+    chat_banned_words_refresh_seconds: float = Field(default=5.0, alias="CHAT_BANNED_WORDS_REFRESH_SECONDS")
+    log_sample_rates: str = Field(default="", alias="LOG_SAMPLE_RATES")
 
     @property
     def parsed_admin_ids(self) -> List[int]:
@@ -24,6 +80,24 @@ class Settings(BaseSettings):
             return []
         return [int(v.strip()) for v in self.telegram_admin_ids.split(",") if v.strip()]
 
+    @property
+    def parsed_partition_retention(self) -> Dict[str, int]:
+        retention: Dict[str, int] = {}
+        for item in self.partition_retention.split(","):
+            if item.strip():
+                table, months = item.split(":", 1)
+                retention[table.strip()] = int(months)
+        return retention
+
+    @property
+    def parsed_log_sample_rates(self) -> Dict[str, float]:
+        rates: Dict[str, float] = {}
+        for item in self.log_sample_rates.split(","):
+            if item.strip():
+                logger_name, rate = item.rsplit(":", 1)
+                rates[logger_name.strip()] = float(rate)
+        return rates
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,9 +1,31 @@
+import atexit
 import json
 import logging
+import queue
 import sys
+import zlib
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
 
 from src.core.config import get_settings
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements; keep tooling usable without it
+    orjson = None
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+_json_encode = json.JSONEncoder(separators=(",", ":"), default=str, ensure_ascii=False).encode
+_listener: QueueListener | None = None
+
+
+def _dumps(message: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(message, default=str).decode()
+    return _json_encode(message)
+
 
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
@@ -11,21 +33,74 @@ class JsonFormatter(logging.Formatter):
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
-            "time": self.formatTime(record, self.datefmt),
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(timespec="milliseconds"),
         }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            message["request_id"] = request_id
         if record.exc_info:
             message["exc_info"] = self.formatException(record.exc_info)
-        return json.dumps(message)
+        return _dumps(message)
+
+
+class ContextFilter(logging.Filter):
+    # Runs on the calling side of the queue, where the request's contextvars are still visible.
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    # Sub-WARNING records from the configured loggers are kept at the given rate. Sampling keys on the
+    # request id when there is one, so a sampled request keeps all of its lines.
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        if rate is None or rate >= 1:
+            return True
+        key = getattr(record, "request_id", None) or f"{record.created}{record.lineno}"
+        return (zlib.crc32(key.encode()) % 10_000) < rate * 10_000
+
+
+class EnqueueOnlyHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve %-args (they may reference mutable objects); formatting happens on the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def shutdown_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def setup_logging() -> None:
+    global _listener
     settings = get_settings()
+    shutdown_logging()
     root = logging.getLogger()
     root.handlers.clear()
-    handler = logging.StreamHandler(sys.stdout)
+    output = logging.StreamHandler(sys.stdout)
     if settings.environment == "prod":
-        handler.setFormatter(JsonFormatter())
+        output.setFormatter(JsonFormatter())
     else:
-        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = EnqueueOnlyHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(SamplingFilter(settings.parsed_log_sample_rates))
     root.setLevel(logging.INFO)
     root.addHandler(handler)
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,156 @@
+import time
+from bisect import bisect_left
+from collections.abc import Sequence
+
+from redis.asyncio import Redis
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def clear(self) -> None:
+        self.values.clear()
+
+    def remove(self, *labels: str) -> None:
+        self.values.pop(labels, None)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self.values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        # [bucket counts..., +Inf count, sum]
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = []
+        for labels, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[_Metric] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status"))
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge("http_requests_in_flight", "HTTP requests currently being served."))
+DB_POOL_CHECKED_OUT = REGISTRY.register(Gauge("db_pool_checked_out", "SQLAlchemy connections checked out.", ("pool",)))
+DB_POOL_OVERFLOW = REGISTRY.register(Gauge("db_pool_overflow", "SQLAlchemy overflow connections in use.", ("pool",)))
+DB_POOL_CHECKOUT_WAIT = REGISTRY.register(
+    Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection.", buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0))
+)
+DB_POOL_SIZE = REGISTRY.register(Gauge("db_pool_size", "SQLAlchemy configured pool size.", ("pool",)))
+REDIS_COMMAND_DURATION = REGISTRY.register(
+    Histogram("redis_command_duration_seconds", "Redis command latency.", ("command",), buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5))
+)
+CHAT_CONNECTIONS = REGISTRY.register(Gauge("chat_connections", "Active chat WebSocket connections per stream.", ("stream_id",)))
+BETS_PLACED = REGISTRY.register(Counter("bets_placed_total", "Bets accepted."))
+BETS_REJECTED = REGISTRY.register(Counter("bets_rejected_total", "Bets rejected, by reason.", ("reason",)))
+SETTLEMENT_DURATION = REGISTRY.register(
+    Histogram("settlement_duration_seconds", "Stream settlement duration.", buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+)
+WALLET_LOCK_WAIT = REGISTRY.register(
+    Histogram("wallet_lock_wait_seconds", "Time to acquire wallet row locks, by operation.", ("operation",), buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+)
+WALLET_LOCK_FAILURES = REGISTRY.register(Counter("wallet_lock_failures_total", "Wallet transactions aborted by lock timeout or deadlock.", ("operation", "reason")))
+BET_ADMISSION_QUEUE_DEPTH = REGISTRY.register(Gauge("bet_admission_queue_depth", "Bets waiting for an admission slot, per stream.", ("stream_id",)))
+BET_ADMISSION_REJECTED = REGISTRY.register(Counter("bet_admission_rejected_total", "Bets shed by per-stream admission control, by reason.", ("reason",)))
+BET_ADMISSION_WAIT = REGISTRY.register(
+    Histogram("bet_admission_wait_seconds", "Time queued bets waited for an admission slot.", buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0))
+)
+EVENT_LOOP_LAG = REGISTRY.register(Gauge("event_loop_lag_seconds", "Smoothed asyncio event-loop scheduling lag."))
+CHAT_MESSAGES_BLOCKED = REGISTRY.register(Counter("chat_messages_blocked_total", "Chat messages rejected by moderation, by reason.", ("reason",)))
+BALANCE_CACHE_WRITE_FAILURES = REGISTRY.register(Counter("balance_cache_write_failures_total", "Post-commit balance cache writes that failed and were dropped."))
+LEADERBOARD_WRITE_FAILURES = REGISTRY.register(
+    Counter("leaderboard_write_failures_total", "Post-commit leaderboard updates that failed; rebuild_leaderboards repairs the drift.", ("operation",))
+)
+OVERLOAD_SHED = REGISTRY.register(Counter("overload_shed_total", "Requests rejected by overload shedding, by priority and signal.", ("priority", "signal")))
+
+
+class InstrumentedRedis(Redis):
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.observe(time.perf_counter() - started, str(args[0]).upper())
@@ -0,0 +1,49 @@
+import asyncio
+import contextlib
+
+from src.core.metrics import EVENT_LOOP_LAG
+
+LOW = "low"
+NORMAL = "normal"
+CRITICAL = "critical"
+
+
+class LoopLagMonitor:
+    def __init__(self, interval_seconds: float = 0.1):
+        self.interval_seconds = interval_seconds
+        self.lag_ms = 0.0
+        self._task: asyncio.Task | None = None
+
+    def ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self.lag_ms = 0.0
+            self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, RuntimeError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval_seconds)
+            lag_ms = max(0.0, loop.time() - started - self.interval_seconds) * 1000
+            # Jump up immediately, decay gradually, so one quiet tick doesn't hide a saturated loop.
+            self.lag_ms = max(lag_ms, self.lag_ms * 0.8)
+            EVENT_LOOP_LAG.set(self.lag_ms / 1000)
+
+
+loop_lag = LoopLagMonitor()
+
+
+def classify(method: str, path: str, low_prefixes: tuple[str, ...], critical_prefixes: tuple[str, ...]) -> str:
+    if method == "GET" and path.startswith(low_prefixes):
+        return LOW
+    if path.startswith(critical_prefixes):
+        return CRITICAL
+    return NORMAL
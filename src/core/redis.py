@@ -0,0 +1,30 @@
+from redis.asyncio import Redis
+
+from src.core.config import get_settings
+from src.core.metrics import InstrumentedRedis
+
+
+class RedisPool:
+    def __init__(self):
+        self.client: Redis | None = None
+
+    def configure(self, client: Redis | None = None) -> "RedisPool":
+        settings = get_settings()
+        self.client = client or InstrumentedRedis.from_url(settings.redis_url, decode_responses=True, max_connections=settings.redis_max_connections)
+        return self
+
+    def get(self) -> Redis:
+        if self.client is None:
+            self.configure()
+        return self.client
+
+    async def warm_up(self) -> None:
+        await self.get().ping()
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+        self.client = None
+
+
+redis_pool = RedisPool()
@@ -0,0 +1,95 @@
+import itertools
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.core.metrics import DB_POOL_CHECKOUT_WAIT
+
+
+@dataclass
+class QueryStats:
+    detect_repeats: bool = False
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: str | None = None
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+        if self.detect_repeats:
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_query_stats.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def install_query_hooks(engine: AsyncEngine) -> None:
+    if event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class PoolWaitTracker:
+    def __init__(self, window_seconds: float = 5.0):
+        self.window_seconds = window_seconds
+        self.samples: deque[tuple[float, float]] = deque(maxlen=2048)
+        self.waiting: dict[int, float] = {}
+        self._tokens = itertools.count()
+
+    def started(self) -> int:
+        token = next(self._tokens)
+        self.waiting[token] = time.monotonic()
+        return token
+
+    def finished(self, token: int) -> None:
+        now = time.monotonic()
+        waited = now - self.waiting.pop(token, now)
+        self.samples.append((now, waited))
+        DB_POOL_CHECKOUT_WAIT.observe(waited)
+
+    def current_ms(self) -> float:
+        # Worst of: slowest checkout in the recent window, and how long the oldest caller still queued has waited.
+        now = time.monotonic()
+        while self.samples and now - self.samples[0][0] > self.window_seconds:
+            self.samples.popleft()
+        recent = max((waited for _, waited in self.samples), default=0.0)
+        oldest = now - min(self.waiting.values()) if self.waiting else 0.0
+        return max(recent, oldest) * 1000
+
+
+pool_wait = PoolWaitTracker()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        token = pool_wait.started()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.finished(token)
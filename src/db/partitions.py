@@ -0,0 +1,82 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.core.config import get_settings
+
+PARTITIONED_TABLES = ("chat_messages", "login_logs", "unauthorized_attempts", "transactions")
+
+
+def month_start(moment: datetime) -> datetime:
+    return moment.astimezone(UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    years, month_index = divmod(moment.month - 1 + months, 12)
+    return moment.replace(year=moment.year + years, month=month_index + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> dict[str, datetime]:
+    rows = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table},
+    )
+    prefix = f"{table}_p"
+    partitions = {}
+    for (name,) in rows:
+        suffix = name.removeprefix(prefix)
+        if name.startswith(prefix) and suffix != "default":
+            partitions[name] = datetime.strptime(suffix, "%Y_%m").replace(tzinfo=UTC)
+    return partitions
+
+
+async def create_partition(conn: AsyncConnection, table: str, month: datetime) -> str:
+    name = partition_name(table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    in_range = f"created_at >= '{start}' AND created_at < '{end}'"
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    await conn.execute(text(f"INSERT INTO {name} SELECT * FROM {table}_pdefault WHERE {in_range}"))
+    await conn.execute(text(f"DELETE FROM {table}_pdefault WHERE {in_range}"))
+    await conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    return name
+
+
+async def expire_partition(conn: AsyncConnection, table: str, name: str, action: str) -> None:
+    if action == "drop":
+        await conn.execute(text(f"DROP TABLE {name}"))
+    else:
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+
+
+async def maintain_partitions(conn: AsyncConnection, now: datetime | None = None) -> dict[str, dict[str, list[str]]]:
+    settings = get_settings()
+    current = month_start(now or datetime.now(UTC))
+    retention = settings.parsed_partition_retention
+    report: dict[str, dict[str, list[str]]] = {}
+    for table in PARTITIONED_TABLES:
+        existing = await list_partitions(conn, table)
+        created = []
+        for offset in range(settings.partition_premake_months + 1):
+            month = add_months(current, offset)
+            if partition_name(table, month) not in existing:
+                created.append(await create_partition(conn, table, month))
+
+        expired = []
+        keep_months = retention.get(table, 0)
+        if keep_months > 0:
+            cutoff = add_months(current, -keep_months)
+            for name, month in sorted(existing.items(), key=lambda item: item[1]):
+                if add_months(month, 1) <= cutoff:
+                    await expire_partition(conn, table, name, settings.partition_expire_action)
+                    expired.append(name)
+        report[table] = {"created": created, "expired": expired}
+    return report
@@ -1,14 +1,116 @@
+import asyncio
+import logging
+import time
 from collections.abc import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Depends, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from src.core.config import get_settings
+from src.db.instrumentation import InstrumentedQueuePool, install_query_hooks
 
-settings = get_settings()
-engine = create_async_engine(settings.database_url, future=True, pool_pre_ping=True)
-AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+logger = logging.getLogger(__name__)
+
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+PRIMARY_HEADER = "x-consistency"
+
+
+class ReplicaLagMonitor:
+    def __init__(self, read_engine: AsyncEngine | None, max_lag_seconds: float, check_interval_seconds: float):
+        self.read_engine = read_engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lag_seconds: float | None = None
+        self.checked_at = 0.0
+
+    async def is_fresh(self) -> bool:
+        if self.read_engine is None:
+            return False
+        now = time.monotonic()
+        if now - self.checked_at >= self.check_interval_seconds:
+            self.checked_at = now
+            try:
+                async with self.read_engine.connect() as conn:
+                    self.lag_seconds = float(await conn.scalar(REPLICA_LAG_SQL))
+            except Exception:
+                logger.warning("replica lag check failed; routing reads to primary", exc_info=True)
+                self.lag_seconds = None
+        return self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+
+
+class Database:
+    def __init__(self):
+        self.engine: AsyncEngine | None = None
+        self.read_engine: AsyncEngine | None = None
+        self.sessionmaker: async_sessionmaker[AsyncSession] | None = None
+        self.read_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+        self.replica_monitor: ReplicaLagMonitor | None = None
+
+    def configure(self, engine: AsyncEngine | None = None, read_engine: AsyncEngine | None = None) -> "Database":
+        settings = get_settings()
+        self.engine = engine or create_async_engine(
+            settings.database_url,
+            pool_pre_ping=True,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+        )
+        if read_engine is None and settings.database_read_url:
+            read_engine = create_async_engine(
+                settings.database_read_url,
+                pool_pre_ping=True,
+                poolclass=InstrumentedQueuePool,
+                pool_size=settings.db_pool_size,
+                max_overflow=settings.db_max_overflow,
+            )
+        self.read_engine = read_engine
+        self.sessionmaker = async_sessionmaker(bind=self.engine, expire_on_commit=False, class_=AsyncSession)
+        self.read_sessionmaker = async_sessionmaker(bind=read_engine, expire_on_commit=False, class_=AsyncSession) if read_engine else None
+        self.replica_monitor = ReplicaLagMonitor(read_engine, settings.replica_max_lag_seconds, settings.replica_lag_check_interval_seconds)
+        for configured in (self.engine, self.read_engine):
+            if configured is not None:
+                install_query_hooks(configured)
+        return self
+
+    def session(self) -> AsyncSession:
+        if self.sessionmaker is None:
+            self.configure()
+        return self.sessionmaker()
+
+    async def warm_up(self, connections: int) -> None:
+        for configured in (self.engine, self.read_engine):
+            if configured is None or connections <= 0:
+                continue
+            opened = await asyncio.gather(*(configured.connect() for _ in range(connections)))
+            await asyncio.gather(*(conn.close() for conn in opened))
+
+    async def dispose(self) -> None:
+        for configured in (self.engine, self.read_engine):
+            if configured is not None:
+                await configured.dispose()
+        self.engine = self.read_engine = None
+        self.sessionmaker = self.read_sessionmaker = None
+        self.replica_monitor = None
+
+
+database = Database()
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
+    async with database.session() as session:
+        yield session
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_db)) -> AsyncGenerator[AsyncSession, None]:
+    # Falling back to the primary reuses the request's get_db session (FastAPI caches it per request), so routes that
+    # also authenticate or write never hold two primary connections at once.
+    use_primary = request.headers.get(PRIMARY_HEADER) == "primary"
+    if database.read_sessionmaker is None or use_primary or not await database.replica_monitor.is_fresh():
+        yield db
+        return
+    async with database.read_sessionmaker() as session:
         yield session
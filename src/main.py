@@ -1,30 +1,102 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-
-from src.api.routes import admin, auth, bets, streams
-from src.core.config import get_settings
-from src.core.logging import setup_logging
-from src.websocket.chat import router as chat_router
-
-setup_logging()
-settings = get_settings()
-
-app = FastAPI(title="Stream Betting Backend", version="1.0.0")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[o.strip() for o in settings.cors_origins.split(",")],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.include_router(auth.router)
-app.include_router(streams.router)
-app.include_router(bets.router)
-app.include_router(admin.router)
-app.include_router(chat_router)
-
-
-@app.get("/health", tags=["health"])
-async def health():
-    return {"status": "ok"}
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from redis.asyncio import Redis
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+def create_app(engine: "AsyncEngine | None" = None, read_engine: "AsyncEngine | None" = None, redis: "Redis | None" = None) -> "FastAPI":
+    # Heavy imports live here so importing src.main (tests, scripts, workers) stays cheap and side-effect free.
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from src.api.middleware import (
+        MetricsMiddleware,
+        OverloadSheddingMiddleware,
+        RequestContextMiddleware,
+        SQLInstrumentationMiddleware,
+        TrafficCaptureMiddleware,
+    )
+    from src.api.routes import admin, auth, bets, leaderboards, metrics, streams, wallet
+    from src.core.config import get_settings
+    from src.core.logging import setup_logging
+    from src.core.overload import loop_lag
+    from src.core.redis import redis_pool
+    from src.db.session import database
+    from src.services.scheduler import StreamLifecycleScheduler
+    from src.websocket.admin_dashboard import router as admin_dashboard_router
+    from src.websocket.chat import router as chat_router
+
+    setup_logging()
+    settings = get_settings()
+    database.configure(engine=engine, read_engine=read_engine)
+    redis_pool.configure(redis)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if database.engine is None:
+            database.configure(engine=engine, read_engine=read_engine)
+        if redis_pool.client is None:
+            redis_pool.configure(redis)
+        await database.warm_up(settings.db_pool_size)
+        await redis_pool.warm_up()
+        scheduler = None
+        if settings.stream_scheduler_enabled:
+            scheduler = StreamLifecycleScheduler(redis_pool.get(), database.session)
+            await scheduler.start()
+        try:
+            yield
+        finally:
+            if scheduler is not None:
+                await scheduler.stop()
+            await loop_lag.stop()
+            await redis_pool.close()
+            await database.dispose()
+
+    app = FastAPI(title="Stream Betting Backend", version="1.0.0", lifespan=lifespan)
+    # Innermost, so shed 503s still get CORS headers and show up in request metrics.
+    app.add_middleware(OverloadSheddingMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[o.strip() for o in settings.cors_origins.split(",")],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(SQLInstrumentationMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    if settings.traffic_capture_enabled:
+        app.add_middleware(TrafficCaptureMiddleware)
+    # Outermost, so every log line of the request, including SQL and metrics middleware, carries its id.
+    app.add_middleware(RequestContextMiddleware)
+
+    app.include_router(auth.router)
+    app.include_router(streams.router)
+    app.include_router(bets.router)
+    app.include_router(wallet.router)
+    app.include_router(leaderboards.router)
+    app.include_router(admin.router)
+    app.include_router(chat_router)
+    app.include_router(admin_dashboard_router)
+    app.include_router(metrics.router)
+
+    @app.get("/health", tags=["health"])
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+_app: "FastAPI | None" = None
+
+
+def __getattr__(name: str) -> "FastAPI":
+    # `src.main:app` keeps working for uvicorn and tests, but the app is only built on first access.
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        _app = create_app()
+    return _app
@@ -2,8 +2,8 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import BigInteger, Boolean, DateTime, Enum, ForeignKey, Integer, String, Text, UniqueConstraint, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.base import Base
@@ -59,8 +59,12 @@ class Wallet(Base):
     __tablename__ = "wallets"
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     balance: Mapped[int] = mapped_column(Integer, default=0)
+    initial_balance: Mapped[int] = mapped_column(Integer, default=0)
+    version: Mapped[int] = mapped_column(BigInteger, default=1)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class Stream(Base):
     __tablename__ = "streams"
@@ -72,6 +76,7 @@ class Stream(Base):
     status: Mapped[StreamStatus] = mapped_column(Enum(StreamStatus), default=StreamStatus.SCHEDULED)
     start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     betting_locked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    is_betting_locked: Mapped[bool] = mapped_column(Boolean, default=False)
     created_by: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
@@ -87,10 +92,13 @@ class Team(Base):
 
 class Bet(Base):
     __tablename__ = "bets"
-    __table_args__ = (UniqueConstraint("user_id", "stream_id", name="uq_user_stream_bet"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "stream_id", name="uq_user_stream_bet"),
+        Index("ix_bets_user_created", "user_id", "created_at", "id", postgresql_include=["stream_id", "team_id", "amount", "status"]),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     stream_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("streams.id", ondelete="CASCADE"), index=True)
     team_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), index=True)
     amount: Mapped[int] = mapped_column(Integer)
@@ -100,17 +108,48 @@ class Bet(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_user_created", "user_id", "created_at", "id", postgresql_include=["type", "amount", "stream_id", "reason"]),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     type: Mapped[TransactionType] = mapped_column(Enum(TransactionType))
     amount: Mapped[int] = mapped_column(Integer)
     stream_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("streams.id", ondelete="SET NULL"), nullable=True)
-    reason: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Bounded so the covering history index can include it without risking an oversized index row.
+    reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), primary_key=True, index=True)
+
+
+class WalletLedgerCheckpoint(Base):
+    __tablename__ = "wallet_ledger_checkpoints"
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    ledger_sum: Mapped[int] = mapped_column(BigInteger, default=0)
+    tx_count: Mapped[int] = mapped_column(BigInteger, default=0)
+    last_tx_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    last_tx_created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    mismatch: Mapped[int] = mapped_column(BigInteger, default=0)
+    checked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class LedgerReconciliationRun(Base):
+    __tablename__ = "ledger_reconciliation_runs"
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    cursor: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    scanned_rows: Mapped[int] = mapped_column(BigInteger, default=0)
+    users_updated: Mapped[int] = mapped_column(Integer, default=0)
+    wallets_checked: Mapped[int] = mapped_column(Integer, default=0)
+    mismatches: Mapped[int] = mapped_column(Integer, default=0)
+    duration_ms: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
 class UnauthorizedAttempt(Base):
     __tablename__ = "unauthorized_attempts"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     telegram_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True, index=True)
     username: Mapped[str | None] = mapped_column(String(100), nullable=True)
@@ -118,29 +157,61 @@ class UnauthorizedAttempt(Base):
     user_agent: Mapped[str | None] = mapped_column(String(500), nullable=True)
     endpoint: Mapped[str] = mapped_column(String(255))
     reason: Mapped[str] = mapped_column(String(100))
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), primary_key=True, index=True)
+
+
+class UnauthorizedAttemptRollup(Base):
+    __tablename__ = "unauthorized_attempt_rollups"
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket", "reason", "ip", "telegram_id", name="uq_attempt_rollup_key", postgresql_nulls_not_distinct=True),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    granularity: Mapped[str] = mapped_column(String(10))
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    reason: Mapped[str] = mapped_column(String(100))
+    ip: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    telegram_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_seen: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
 class LoginLog(Base):
     __tablename__ = "login_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     ip: Mapped[str | None] = mapped_column(String(64), nullable=True)
     user_agent: Mapped[str | None] = mapped_column(String(500), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), primary_key=True, index=True)
 
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     stream_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("streams.id", ondelete="CASCADE"), index=True)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     message: Mapped[str] = mapped_column(Text)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), primary_key=True)
 
 
 class UserMute(Base):
     __tablename__ = "user_mutes"
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     muted_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox"
+    __table_args__ = (Index("ix_outbox_unpublished", "id", postgresql_where=text("published_at IS NULL")),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    event_type: Mapped[str] = mapped_column(String(100))
+    stream_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    payload: Mapped[dict] = mapped_column(JSONB)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
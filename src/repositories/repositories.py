@@ -81,8 +81,11 @@ class SecurityRepository:
         rows = await self.db.scalars(stmt.order_by(UnauthorizedAttempt.created_at.desc()))
         return list(rows)
 
-    async def list_logins(self) -> list[LoginLog]:
-        rows = await self.db.scalars(select(LoginLog).order_by(LoginLog.created_at.desc()))
+    async def list_logins(self, since: datetime | None = None) -> list[LoginLog]:
+        stmt: Select[tuple[LoginLog]] = select(LoginLog)
+        if since is not None:
+            stmt = stmt.where(LoginLog.created_at >= since)
+        rows = await self.db.scalars(stmt.order_by(LoginLog.created_at.desc()))
         return list(rows)
 
 
@@ -1,8 +1,8 @@
 import uuid
-from datetime import datetime
-from typing import Any
+from datetime import UTC, datetime
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
 
 from src.models.entities import BetStatus, StreamStatus, StreamType, TransactionType, UserRole
 
@@ -20,6 +20,15 @@ class UserOut(BaseModel):
     is_banned: bool
 
 
+def _assume_utc(value: datetime) -> datetime:
+    # Naive timestamps have always been accepted and stored as UTC; make that explicit so they compare with
+    # aware values instead of raising.
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
+
+
+UtcDatetime = Annotated[datetime, AfterValidator(_assume_utc)]
+
+
 class TeamCreate(BaseModel):
     name: str
     logo_url: str | None = None
@@ -38,19 +47,23 @@ class StreamCreate(BaseModel):
     stream_type: StreamType
     stream_url: str
     status: StreamStatus = StreamStatus.SCHEDULED
-    start_time: datetime
-    betting_locked_at: datetime
+    start_time: UtcDatetime
+    betting_locked_at: UtcDatetime
     teams: list[TeamCreate]
 
 
+class StreamBulkCreate(BaseModel):
+    streams: list[StreamCreate] = Field(min_length=1, max_length=512)
+
+
 class StreamUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     stream_type: StreamType | None = None
     stream_url: str | None = None
     status: StreamStatus | None = None
-    start_time: datetime | None = None
-    betting_locked_at: datetime | None = None
+    start_time: UtcDatetime | None = None
+    betting_locked_at: UtcDatetime | None = None
 
 
 class StreamStatusIn(BaseModel):
@@ -67,6 +80,7 @@ class StreamOut(BaseModel):
     status: StreamStatus
     start_time: datetime
     betting_locked_at: datetime
+    is_betting_locked: bool
     created_by: uuid.UUID | None
     created_at: datetime
     teams: list[TeamOut]
@@ -110,9 +124,36 @@ class BetOut(BaseModel):
     created_at: datetime
 
 
+class BetHistoryItemOut(BetOut):
+    stream_title: str
+    stream_status: StreamStatus
+    team_name: str
+    team_logo_url: str | None
+
+
+class BetHistoryPageOut(BaseModel):
+    items: list[BetHistoryItemOut]
+    next_cursor: str | None
+
+
 class BalanceAdjustIn(BaseModel):
     amount: int
-    reason: str | None = None
+    reason: str | None = Field(default=None, max_length=255)
+
+
+class BalanceCampaignIn(BaseModel):
+    target: Literal["whitelisted", "stream_bettors", "user_ids"]
+    amount: int
+    reason: str | None = Field(default=None, max_length=255)
+    stream_id: uuid.UUID | None = None
+    user_ids: list[uuid.UUID] | None = None
+
+
+class BalanceCampaignOut(BaseModel):
+    targeted: int
+    affected: int
+    skipped: int
+    total_amount: int
 
 
 class TransactionOut(BaseModel):
@@ -126,6 +167,63 @@ class TransactionOut(BaseModel):
     created_at: datetime
 
 
+class TransactionPageOut(BaseModel):
+    items: list[TransactionOut]
+    next_cursor: str | None
+
+
+class LeaderboardEntryOut(BaseModel):
+    rank: int
+    user_id: uuid.UUID
+    username: str | None
+    first_name: str | None
+    profit: int
+
+
+class LeaderboardPageOut(BaseModel):
+    board: str
+    total: int
+    offset: int
+    limit: int
+    items: list[LeaderboardEntryOut]
+
+
+class UserStatsOut(BaseModel):
+    bets: int
+    wagered: int
+    won: int
+    profit: int
+    wins: int
+    losses: int
+    refunds: int
+    win_rate: float
+    global_rank: int | None
+    weekly_rank: int | None
+
+
+class ReconciliationRunOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: uuid.UUID
+    cursor: datetime
+    scanned_rows: int
+    users_updated: int
+    wallets_checked: int
+    mismatches: int
+    duration_ms: int
+    created_at: datetime
+
+
+class LedgerMismatchOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    user_id: uuid.UUID
+    ledger_sum: int
+    tx_count: int
+    last_tx_id: uuid.UUID | None
+    last_tx_created_at: datetime | None
+    mismatch: int
+    checked_at: datetime
+
+
 class AdminUserCreate(BaseModel):
     telegram_id: int
     username: str | None = None
@@ -143,6 +241,32 @@ class SetWinnerIn(BaseModel):
     team_id: uuid.UUID
 
 
+class PayoutPreviewOut(BaseModel):
+    bet_id: uuid.UUID
+    user_id: uuid.UUID
+    amount: int
+    payout: int
+
+
+class SettlementOutcomeOut(BaseModel):
+    team_id: uuid.UUID
+    team_name: str
+    refunded: bool
+    winners: int
+    winners_pool: int
+    losers_pool: int
+    total_paid: int
+    rounding_remainder: int
+    top_payouts: list[PayoutPreviewOut]
+
+
+class SettlementPreviewOut(BaseModel):
+    stream_id: uuid.UUID
+    total_pool: int
+    bets: int
+    outcomes: list[SettlementOutcomeOut]
+
+
 class StreamStatsOut(BaseModel):
     total_amount: int
     per_team_amount: dict[str, int]
@@ -163,6 +287,23 @@ class UnauthorizedAttemptOut(BaseModel):
     created_at: datetime
 
 
+class AttemptOffenderOut(BaseModel):
+    key: str
+    attempts: int
+    last_seen: datetime
+
+
+class AttemptSeriesPointOut(BaseModel):
+    bucket: datetime
+    attempts: int
+
+
+class SecurityBlockOut(BaseModel):
+    kind: str
+    value: str
+    ttl_seconds: int
+
+
 class LoginLogOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: uuid.UUID
@@ -180,3 +321,16 @@ class ChatMessageOut(BaseModel):
     message: str
     is_deleted: bool
     created_at: datetime
+
+
+class BannedWordsIn(BaseModel):
+    words: list[str] = Field(max_length=50_000)
+
+
+class BannedWordsOut(BaseModel):
+    words: list[str]
+
+
+class ChatReplayPageOut(BaseModel):
+    items: list[ChatMessageOut]
+    next_cursor: str | None
@@ -0,0 +1,89 @@
+import asyncio
+import math
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from fastapi import HTTPException
+
+from src.core.config import get_settings
+from src.core.metrics import BET_ADMISSION_QUEUE_DEPTH, BET_ADMISSION_REJECTED, BET_ADMISSION_WAIT
+
+
+class _StreamGate:
+    def __init__(self):
+        self.active: set[uuid.UUID] = set()
+        self.waiters: OrderedDict[uuid.UUID, asyncio.Future] = OrderedDict()
+
+
+class AdmissionController:
+    # Per-worker concurrency cap per stream with a short FIFO queue. Each user holds at most one slot
+    # (running or queued) per stream, so a few clients hammering retry cannot crowd everyone else out.
+    def __init__(self, max_concurrent: int, queue_size: int, max_wait_seconds: float):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.max_wait_seconds = max_wait_seconds
+        self.gates: dict[uuid.UUID, _StreamGate] = {}
+
+    def _reject(self, reason: str) -> HTTPException:
+        BET_ADMISSION_REJECTED.inc(reason)
+        retry_after = max(1, math.ceil(self.max_wait_seconds))
+        return HTTPException(status_code=429, detail="Betting busy", headers={"Retry-After": str(retry_after)})
+
+    def _release(self, stream_id: uuid.UUID, gate: _StreamGate, user_id: uuid.UUID) -> None:
+        gate.active.discard(user_id)
+        while gate.waiters:
+            next_user, future = gate.waiters.popitem(last=False)
+            if not future.done():
+                gate.active.add(next_user)
+                future.set_result(True)
+                break
+        BET_ADMISSION_QUEUE_DEPTH.set(len(gate.waiters), str(stream_id))
+        if not gate.active and not gate.waiters:
+            del self.gates[stream_id]
+            BET_ADMISSION_QUEUE_DEPTH.remove(str(stream_id))
+
+    @asynccontextmanager
+    async def admit(self, stream_id: uuid.UUID, user_id: uuid.UUID) -> AsyncIterator[None]:
+        gate = self.gates.setdefault(stream_id, _StreamGate())
+        if user_id in gate.active or user_id in gate.waiters:
+            raise self._reject("duplicate")
+        if len(gate.active) < self.max_concurrent and not gate.waiters:
+            gate.active.add(user_id)
+        else:
+            if len(gate.waiters) >= self.queue_size:
+                raise self._reject("queue_full")
+            future = asyncio.get_running_loop().create_future()
+            gate.waiters[user_id] = future
+            BET_ADMISSION_QUEUE_DEPTH.set(len(gate.waiters), str(stream_id))
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.max_wait_seconds)
+            except (TimeoutError, asyncio.CancelledError) as exc:
+                if future.done():
+                    # The slot was handed over just as we gave up; pass it on instead of leaking it.
+                    self._release(stream_id, gate, user_id)
+                else:
+                    future.cancel()
+                    gate.waiters.pop(user_id, None)
+                    BET_ADMISSION_QUEUE_DEPTH.set(len(gate.waiters), str(stream_id))
+                    if not gate.active and not gate.waiters:
+                        self.gates.pop(stream_id, None)
+                if isinstance(exc, asyncio.CancelledError):
+                    raise
+                raise self._reject("timeout") from exc
+            finally:
+                BET_ADMISSION_WAIT.observe(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            self._release(stream_id, gate, user_id)
+
+
+@lru_cache
+def get_bet_admission() -> AdmissionController:
+    settings = get_settings()
+    return AdmissionController(settings.bet_admission_max_concurrent, settings.bet_admission_queue_size, settings.bet_admission_max_wait_ms / 1000)
@@ -0,0 +1,82 @@
+import logging
+import uuid
+from collections.abc import Iterable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+from src.core.metrics import BALANCE_CACHE_WRITE_FAILURES
+from src.models.entities import Wallet
+
+logger = logging.getLogger(__name__)
+
+# Only overwrite the cached entry when the incoming wallet version is newer, so a slow
+# read-through load can never clobber a balance written after a later commit.
+SET_IF_NEWER = """
+local current = redis.call('HGET', KEYS[1], 'version')
+if current and tonumber(current) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'balance', ARGV[1], 'version', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class BalanceCache:
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self.ttl_seconds = get_settings().balance_cache_ttl_seconds
+        self._set_if_newer = redis.register_script(SET_IF_NEWER)
+
+    @staticmethod
+    def _key(user_id: uuid.UUID) -> str:
+        return f"balance:{user_id}"
+
+    async def get(self, user_id: uuid.UUID) -> int | None:
+        balance = await self.redis.hget(self._key(user_id), "balance")
+        return int(balance) if balance is not None else None
+
+    # Writes happen after the wallet change has committed, so they are best effort: a Redis error must not fail a
+    # request whose write already succeeded. The entry is dropped instead (also best effort), and the next read
+    # loads it from the database.
+    async def _write_failed(self, user_ids: list[uuid.UUID]) -> None:
+        BALANCE_CACHE_WRITE_FAILURES.inc()
+        logger.warning("failed to update cached balances for %d user(s)", len(user_ids), exc_info=True)
+        try:
+            await self.redis.delete(*(self._key(user_id) for user_id in user_ids))
+        except RedisError:
+            logger.warning("failed to drop stale cached balances", exc_info=True)
+
+    async def set(self, user_id: uuid.UUID, balance: int, version: int) -> None:
+        try:
+            await self._set_if_newer(keys=[self._key(user_id)], args=[balance, version, self.ttl_seconds])
+        except RedisError:
+            await self._write_failed([user_id])
+
+    async def set_many(self, entries: Iterable[tuple[uuid.UUID, int, int]]) -> None:
+        entries = list(entries)
+        if not entries:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for user_id, balance, version in entries:
+                    await self._set_if_newer(keys=[self._key(user_id)], args=[balance, version, self.ttl_seconds], client=pipe)
+                await pipe.execute()
+        except RedisError:
+            await self._write_failed([user_id for user_id, *_ in entries])
+
+    async def set_wallets(self, wallets: Iterable[Wallet]) -> None:
+        await self.set_many((w.user_id, w.balance, w.version) for w in wallets)
+
+    async def get_or_load(self, db: AsyncSession, user_id: uuid.UUID) -> int:
+        cached = await self.get(user_id)
+        if cached is not None:
+            return cached
+        wallet = await db.get(Wallet, user_id)
+        if not wallet:
+            return 0
+        await self.set(user_id, wallet.balance, wallet.version)
+        return wallet.balance
@@ -0,0 +1,193 @@
+import bisect
+import json
+import os
+import struct
+import uuid
+import zlib
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+from src.models.entities import ChatMessage, Stream, StreamStatus
+
+# One index entry per compressed block: first/last message time (µs since epoch), byte offset, byte length, count.
+INDEX_ENTRY = struct.Struct("<qqQII")
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def to_micros(at: datetime) -> int:
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=UTC)
+    return (at - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+class ArchiveWriter:
+    def __init__(self, archive: "ChatArchive", stream_id: uuid.UUID):
+        self.archive = archive
+        self.stream_id = stream_id
+        self.pending: list[dict] = []
+        self.entries: list[bytes] = []
+        self.count = 0
+        self.last_micros: int | None = None
+        data_path, _ = archive.paths(stream_id)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        self.data = open(data_path, "ab")
+
+    def add(self, message_id: uuid.UUID, user_id: uuid.UUID, message: str, is_deleted: bool, created_at: datetime) -> None:
+        self.pending.append({"id": str(message_id), "user_id": str(user_id), "message": message, "is_deleted": is_deleted, "t": to_micros(created_at)})
+        if len(self.pending) >= self.archive.block_messages:
+            self._flush_block()
+
+    def _flush_block(self) -> None:
+        if not self.pending:
+            return
+        block = zlib.compress("\n".join(json.dumps(r, separators=(",", ":"), ensure_ascii=False) for r in self.pending).encode(), 6)
+        offset = self.data.tell()
+        self.data.write(block)
+        first, last = self.pending[0]["t"], self.pending[-1]["t"]
+        self.entries.append(INDEX_ENTRY.pack(first, last, offset, len(block), len(self.pending)))
+        self.count += len(self.pending)
+        self.last_micros = last
+        self.pending = []
+
+    def close(self) -> None:
+        # Data is durable before the index references it: a crash in between leaves unreferenced bytes at the
+        # tail of the data file, never an index entry pointing at missing data.
+        self._flush_block()
+        self.data.flush()
+        os.fsync(self.data.fileno())
+        self.data.close()
+        if not self.entries:
+            return
+        _, index_path = self.archive.paths(self.stream_id)
+        with open(index_path, "ab") as index:
+            index.truncate(index.tell() - index.tell() % INDEX_ENTRY.size)
+            index.write(b"".join(self.entries))
+            index.flush()
+            os.fsync(index.fileno())
+
+
+class ChatArchive:
+    # Append-only per-stream archive: `<stream_id>.chat` holds independently zlib-compressed blocks of JSON lines
+    # in (created_at, id) order and `<stream_id>.idx` a fixed-width entry per block, so a time range is served
+    # by bisecting the index and decompressing only the overlapping blocks.
+    def __init__(self, root: Path, block_messages: int = 500):
+        self.root = root
+        self.block_messages = block_messages
+
+    def paths(self, stream_id: uuid.UUID) -> tuple[Path, Path]:
+        return self.root / f"{stream_id}.chat", self.root / f"{stream_id}.idx"
+
+    def read_index(self, stream_id: uuid.UUID) -> list[tuple[int, int, int, int, int]]:
+        _, index_path = self.paths(stream_id)
+        try:
+            raw = index_path.read_bytes()
+        except FileNotFoundError:
+            return []
+        return [INDEX_ENTRY.unpack_from(raw, pos) for pos in range(0, len(raw) - len(raw) % INDEX_ENTRY.size, INDEX_ENTRY.size)]
+
+    def watermark(self, stream_id: uuid.UUID) -> datetime | None:
+        index = self.read_index(stream_id)
+        return from_micros(index[-1][1]) if index else None
+
+    def writer(self, stream_id: uuid.UUID) -> ArchiveWriter:
+        return ArchiveWriter(self, stream_id)
+
+    def replay(self, stream_id: uuid.UUID, since: datetime | None = None, until: datetime | None = None) -> Iterator[dict]:
+        index = self.read_index(stream_id)
+        if not index:
+            return
+        since_us = to_micros(since) if since else None
+        until_us = to_micros(until) if until else None
+        start = bisect.bisect_left([entry[1] for entry in index], since_us) if since_us is not None else 0
+        data_path, _ = self.paths(stream_id)
+        with open(data_path, "rb") as data:
+            for first, _, offset, length, _ in index[start:]:
+                if until_us is not None and first >= until_us:
+                    return
+                data.seek(offset)
+                for line in zlib.decompress(data.read(length)).split(b"\n"):
+                    record = json.loads(line)
+                    if since_us is not None and record["t"] < since_us:
+                        continue
+                    if until_us is not None and record["t"] >= until_us:
+                        return
+                    yield record
+
+    def replay_page(
+        self, stream_id: uuid.UUID, since: datetime | None, until: datetime | None, limit: int, after: tuple[datetime, uuid.UUID] | None = None
+    ) -> tuple[list[dict], tuple[datetime, uuid.UUID] | None]:
+        # Keyset on (t, id), the archive's own order: messages sharing a microsecond can straddle a page boundary
+        # without being repeated or skipped.
+        after_key = None
+        if after is not None:
+            after_key = (to_micros(after[0]), str(after[1]))
+            since = after[0]
+        items: list[dict] = []
+        for record in self.replay(stream_id, since, until):
+            if record["is_deleted"] or (after_key is not None and (record["t"], record["id"]) <= after_key):
+                continue
+            if len(items) == limit:
+                return items, (items[-1]["created_at"], uuid.UUID(items[-1]["id"]))
+            items.append({**record, "stream_id": stream_id, "created_at": from_micros(record["t"])})
+        return items, None
+
+
+async def archive_stream_chat(db: AsyncSession, archive: ChatArchive, stream_id: uuid.UUID) -> int:
+    # Rows after the archive's watermark are appended, then everything up to the new watermark is deleted in
+    # one statement. Re-running after a crash between the two steps only deletes what is already archived.
+    watermark = archive.watermark(stream_id)
+    stmt = (
+        select(ChatMessage.id, ChatMessage.user_id, ChatMessage.message, ChatMessage.is_deleted, ChatMessage.created_at)
+        .where(ChatMessage.stream_id == stream_id)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+    )
+    if watermark is not None:
+        stmt = stmt.where(ChatMessage.created_at > watermark)
+    writer = archive.writer(stream_id)
+    try:
+        async for row in await db.stream(stmt.execution_options(yield_per=archive.block_messages * 4)):
+            writer.add(*row)
+    finally:
+        writer.close()
+    archived_until = from_micros(writer.last_micros) if writer.last_micros is not None else watermark
+    if archived_until is not None:
+        await db.execute(
+            delete(ChatMessage)
+            .where(ChatMessage.stream_id == stream_id, ChatMessage.created_at <= archived_until)
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+    return writer.count
+
+
+async def archive_finished_chats(db: AsyncSession, archive: ChatArchive, quiet_for: timedelta) -> dict[str, int]:
+    cutoff = datetime.now(UTC) - quiet_for
+    stream_ids = list(
+        await db.scalars(
+            select(ChatMessage.stream_id)
+            .join(Stream, Stream.id == ChatMessage.stream_id)
+            .where(Stream.status == StreamStatus.FINISHED)
+            .group_by(ChatMessage.stream_id)
+            .having(func.max(ChatMessage.created_at) < cutoff)
+        )
+    )
+    messages = 0
+    for stream_id in stream_ids:
+        messages += await archive_stream_chat(db, archive, stream_id)
+    return {"streams": len(stream_ids), "messages": messages}
+
+
+@lru_cache
+def get_chat_archive() -> ChatArchive:
+    settings = get_settings()
+    return ChatArchive(Path(settings.chat_archive_dir), settings.chat_archive_block_messages)
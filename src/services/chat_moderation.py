@@ -0,0 +1,183 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from functools import lru_cache
+
+from fastapi import HTTPException
+from redis.asyncio import Redis
+
+from src.core.config import get_settings
+from src.core.metrics import CHAT_MESSAGES_BLOCKED
+
+BANNED_WORDS_KEY = "chat:banned_words"
+BANNED_WORDS_VERSION_KEY = "chat:banned_words:version"
+
+SHINGLE = 5
+SAMPLE = 8
+HASH_BASE = 257
+HASH_MOD = (1 << 61) - 1
+
+
+class BannedWordMatcher:
+    # Aho–Corasick automaton: one left-to-right pass over the message whatever the number of banned words, with
+    # failure links instead of backtracking (amortized one transition per character).
+    def __init__(self, words: Iterable[str]):
+        self.words = sorted({w.strip().casefold() for w in words if w.strip()})
+        goto: list[dict[str, int]] = [{}]
+        output: list[int] = [0]
+        for word in self.words:
+            state = 0
+            for ch in word:
+                if ch not in goto[state]:
+                    goto.append({})
+                    output.append(0)
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            output[state] = len(word)
+
+        fail = [0] * len(goto)
+        # Dictionary-suffix link: the nearest state on the failure chain that ends a word, so every banned word
+        # ending at a position is reachable, not just the longest one.
+        suffix = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                target = fail[state]
+                while target and ch not in goto[target]:
+                    target = fail[target]
+                fail[child] = goto[target][ch] if state and ch in goto[target] else 0
+                suffix[child] = fail[child] if output[fail[child]] else suffix[fail[child]]
+                queue.append(child)
+        self.goto = goto
+        self.fail = fail
+        self.suffix = suffix
+        self.output = output
+
+    def find(self, text: str) -> str | None:
+        # Returns the first banned word that occurs as a whole word (case-insensitive), so "class" never trips "ass".
+        if not self.words:
+            return None
+        lowered = text.casefold()
+        goto, fail, suffix, output, state = self.goto, self.fail, self.suffix, self.output, 0
+        for end, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if end + 1 < len(lowered) and lowered[end + 1].isalnum():
+                continue
+            # Longest first: "bad guy" failing the word-boundary check must still let "guy" match.
+            match = state if output[state] else suffix[state]
+            while match:
+                start = end - output[match] + 1
+                if start == 0 or not lowered[start - 1].isalnum():
+                    return lowered[start : end + 1]
+                match = suffix[match]
+        return None
+
+
+def fingerprint(text: str) -> frozenset[int]:
+    # Rabin–Karp hashes of every SHINGLE-char window of the alphanumeric, case-folded text; the SAMPLE smallest
+    # form a min-hash sketch, so near-duplicates ("buy coins 1" / "buy coins 2") share most of their sketch.
+    normalized = "".join(ch for ch in text.casefold() if ch.isalnum()) or text.strip()
+    if len(normalized) <= SHINGLE:
+        return frozenset((hash(normalized),))
+    top = pow(HASH_BASE, SHINGLE - 1, HASH_MOD)
+    value = 0
+    for ch in normalized[:SHINGLE]:
+        value = (value * HASH_BASE + ord(ch)) % HASH_MOD
+    hashes = {value}
+    for i in range(SHINGLE, len(normalized)):
+        value = ((value - ord(normalized[i - SHINGLE]) * top) * HASH_BASE + ord(normalized[i])) % HASH_MOD
+        hashes.add(value)
+    return frozenset(sorted(hashes)[:SAMPLE])
+
+
+def similarity(a: frozenset[int], b: frozenset[int]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+class _UserHistory:
+    __slots__ = ("sent", "recent")
+
+    def __init__(self):
+        self.sent: deque[float] = deque()
+        self.recent: deque[tuple[float, frozenset[int]]] = deque()
+
+
+class ChatModerator:
+    # In-process, per-worker: a user's chat socket lives on one worker, so their history does too. The banned-word
+    # list is shared through Redis and re-checked at most every `refresh_seconds`.
+    def __init__(self, flood_max: int, flood_window: float, duplicate_window: float, duplicate_threshold: float, refresh_seconds: float, max_users: int = 50_000):
+        self.flood_max = flood_max
+        self.flood_window = flood_window
+        self.duplicate_window = duplicate_window
+        self.duplicate_threshold = duplicate_threshold
+        self.refresh_seconds = refresh_seconds
+        self.max_users = max_users
+        self.matcher = BannedWordMatcher(())
+        self.version: str | None = None
+        self.next_refresh = 0.0
+        self.users: OrderedDict[uuid.UUID, _UserHistory] = OrderedDict()
+
+    def _reject(self, reason: str, status_code: int, detail: str) -> HTTPException:
+        CHAT_MESSAGES_BLOCKED.inc(reason)
+        return HTTPException(status_code=status_code, detail=detail)
+
+    async def refresh(self, redis: Redis) -> None:
+        now = time.monotonic()
+        if now < self.next_refresh:
+            return
+        self.next_refresh = now + self.refresh_seconds
+        version = await redis.get(BANNED_WORDS_VERSION_KEY)
+        if version != self.version:
+            words = await redis.smembers(BANNED_WORDS_KEY)
+            self.matcher = await asyncio.to_thread(BannedWordMatcher, words)
+            self.version = version
+
+    def check(self, user_id: uuid.UUID, message: str, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        history = self.users.pop(user_id, None) or _UserHistory()
+        self.users[user_id] = history
+        if len(self.users) > self.max_users:
+            self.users.popitem(last=False)
+
+        while history.sent and history.sent[0] <= now - self.flood_window:
+            history.sent.popleft()
+        if len(history.sent) >= self.flood_max:
+            raise self._reject("flood", 429, "Slow down")
+        if self.matcher.find(message) is not None:
+            raise self._reject("banned_word", 400, "Message blocked")
+        sketch = fingerprint(message)
+        while history.recent and history.recent[0][0] <= now - self.duplicate_window:
+            history.recent.popleft()
+        if any(similarity(sketch, previous) >= self.duplicate_threshold for _, previous in history.recent):
+            raise self._reject("duplicate", 429, "Duplicate message")
+        history.sent.append(now)
+        history.recent.append((now, sketch))
+
+
+async def set_banned_words(redis: Redis, words: Iterable[str]) -> list[str]:
+    normalized = BannedWordMatcher(words).words
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.delete(BANNED_WORDS_KEY)
+        if normalized:
+            pipe.sadd(BANNED_WORDS_KEY, *normalized)
+        pipe.incr(BANNED_WORDS_VERSION_KEY)
+        await pipe.execute()
+    get_chat_moderator().next_refresh = 0.0
+    return normalized
+
+
+@lru_cache
+def get_chat_moderator() -> ChatModerator:
+    settings = get_settings()
+    return ChatModerator(
+        settings.chat_flood_max_messages,
+        settings.chat_flood_window_seconds,
+        settings.chat_duplicate_window_seconds,
+        settings.chat_duplicate_similarity,
+        settings.chat_banned_words_refresh_seconds,
+    )
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+import math
+import uuid
+from collections import deque
+from collections.abc import Callable
+from contextlib import suppress
+from functools import lru_cache
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio import Redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+from src.models.entities import Bet, BetStatus, UnauthorizedAttempt
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_CHANNEL = "admin:dashboard"
+CHAT_CONNECTIONS_PREFIX = "admin:dashboard:chat_connections:"
+RECENT_LIMIT = 20
+
+
+async def publish_dashboard_event(redis: Redis | None, kind: str, payload: dict[str, Any]) -> None:
+    # Best effort: the write has already committed, and the hub resyncs from the database periodically.
+    if redis is None:
+        return
+    try:
+        await redis.publish(DASHBOARD_CHANNEL, json.dumps({"kind": kind, **jsonable_encoder(payload)}, separators=(",", ":")))
+    except Exception:
+        logger.warning("failed to publish dashboard event %s", kind, exc_info=True)
+
+
+class ChatPresence:
+    # This worker's chat connection counts, mirrored into a Redis hash of its own. A heartbeat rewrites the hash and
+    # refreshes its TTL while the worker has connections, so counts left by a crashed or redeployed worker expire
+    # instead of lingering; the dashboard sums the hashes that are still alive.
+    def __init__(self, ttl_seconds: float):
+        self.worker_id = uuid.uuid4().hex
+        self.key = f"{CHAT_CONNECTIONS_PREFIX}{self.worker_id}"
+        self.ttl_seconds = ttl_seconds
+        self.counts: dict[str, int] = {}
+        self._task: asyncio.Task | None = None
+
+    async def track(self, redis: Redis, stream_id: uuid.UUID, delta: int) -> None:
+        sid = str(stream_id)
+        count = max(self.counts.get(sid, 0) + delta, 0)
+        if count:
+            self.counts[sid] = count
+        else:
+            self.counts.pop(sid, None)
+        if self.counts and self._task is None:
+            self._task = asyncio.create_task(self._heartbeat(redis))
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                if count:
+                    pipe.hset(self.key, sid, count)
+                else:
+                    pipe.hdel(self.key, sid)
+                pipe.expire(self.key, math.ceil(self.ttl_seconds))
+                await pipe.execute()
+        except Exception:
+            logger.warning("failed to track chat connection for stream %s", stream_id, exc_info=True)
+            return
+        await publish_dashboard_event(redis, "chat", {"stream_id": sid, "worker": self.worker_id, "connections": count})
+
+    async def _heartbeat(self, redis: Redis) -> None:
+        try:
+            while self.counts:
+                await asyncio.sleep(self.ttl_seconds / 3)
+                try:
+                    async with redis.pipeline(transaction=True) as pipe:
+                        pipe.delete(self.key)
+                        if self.counts:
+                            pipe.hset(self.key, mapping=self.counts)
+                            pipe.expire(self.key, math.ceil(self.ttl_seconds))
+                        await pipe.execute()
+                except Exception:
+                    logger.warning("chat presence heartbeat failed", exc_info=True)
+        finally:
+            self._task = None
+
+
+@lru_cache
+def get_chat_presence() -> ChatPresence:
+    return ChatPresence(get_settings().admin_dashboard_presence_ttl_seconds)
+
+
+async def track_chat_connection(redis: Redis, stream_id: uuid.UUID, delta: int) -> None:
+    await get_chat_presence().track(redis, stream_id, delta)
+
+
+class DashboardHub:
+    # Per-worker live aggregate for the admin dashboard. State is seeded from the database once, then kept current
+    # from write-path events on a Redis channel; connected sockets get a snapshot on join and, once per tick, only
+    # the keys that changed since the previous tick.
+    def __init__(self, redis: Redis, session_factory: Callable[[], AsyncSession]):
+        settings = get_settings()
+        self.redis = redis
+        self.session_factory = session_factory
+        self.tick_seconds = settings.admin_dashboard_tick_ms / 1000
+        self.resync_seconds = settings.admin_dashboard_resync_seconds
+        self.join_timeout = settings.admin_dashboard_join_timeout_seconds
+        self.send_timeout = settings.admin_dashboard_send_timeout_seconds
+        self.pools: dict[str, dict[str, int]] = {}
+        self.bet_counts: dict[str, int] = {}
+        self.chat_connections: dict[str, int] = {}
+        self.chat_by_worker: dict[str, dict[str, int]] = {}
+        self.recent_bets: deque[dict] = deque(maxlen=RECENT_LIMIT)
+        self.recent_attempts: deque[dict] = deque(maxlen=RECENT_LIMIT)
+        self.sockets: set[Any] = set()
+        # Sockets whose snapshot is still in flight, with the broadcasts they must get right after it.
+        self.joining: dict[Any, list[dict[str, Any]]] = {}
+        self.members = 0
+        self.ready = asyncio.Event()
+        self._reset_changes()
+        self._task: asyncio.Task | None = None
+
+    def _reset_changes(self) -> None:
+        self.changed_streams: set[str] = set()
+        self.removed_streams: set[str] = set()
+        self.changed_chat: set[str] = set()
+        self.new_bets: list[dict] = []
+        self.new_attempts: list[dict] = []
+        self.attempts_since_tick = 0
+
+    def apply(self, event: dict[str, Any]) -> None:
+        kind = event.get("kind")
+        if kind == "bet":
+            stream_id, team_id = event["stream_id"], event["team_id"]
+            pool = self.pools.setdefault(stream_id, {})
+            pool[team_id] = pool.get(team_id, 0) + event["amount"]
+            self.bet_counts[stream_id] = self.bet_counts.get(stream_id, 0) + 1
+            self.changed_streams.add(stream_id)
+            self.removed_streams.discard(stream_id)
+            self.recent_bets.appendleft(event)
+            self.new_bets.append(event)
+        elif kind == "settled":
+            stream_id = event["stream_id"]
+            self.pools.pop(stream_id, None)
+            self.bet_counts.pop(stream_id, None)
+            self.changed_streams.discard(stream_id)
+            self.removed_streams.add(stream_id)
+        elif kind == "unauthorized":
+            self.recent_attempts.appendleft(event)
+            self.attempts_since_tick += 1
+            if len(self.new_attempts) < RECENT_LIMIT:
+                self.new_attempts.append(event)
+        elif kind == "chat":
+            stream_id = event["stream_id"]
+            workers = self.chat_by_worker.setdefault(stream_id, {})
+            if event["connections"]:
+                workers[event["worker"]] = event["connections"]
+            else:
+                workers.pop(event["worker"], None)
+            self._total_chat(stream_id)
+            self.changed_chat.add(stream_id)
+
+    def _total_chat(self, stream_id: str) -> None:
+        total = sum(self.chat_by_worker.get(stream_id, {}).values())
+        if total:
+            self.chat_connections[stream_id] = total
+        else:
+            self.chat_connections.pop(stream_id, None)
+            self.chat_by_worker.pop(stream_id, None)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "type": "snapshot",
+            "streams": {sid: {"pool": dict(pool), "bets": self.bet_counts.get(sid, 0)} for sid, pool in self.pools.items()},
+            "recent_bets": list(self.recent_bets),
+            "unauthorized": list(self.recent_attempts),
+            "chat_connections": dict(self.chat_connections),
+        }
+
+    def take_delta(self) -> dict[str, Any] | None:
+        if not (self.changed_streams or self.removed_streams or self.changed_chat or self.new_bets or self.attempts_since_tick):
+            return None
+        delta = {
+            "type": "delta",
+            "streams": {sid: {"pool": dict(self.pools[sid]), "bets": self.bet_counts[sid]} for sid in self.changed_streams if sid in self.pools},
+            "removed_streams": sorted(self.removed_streams),
+            "new_bets": self.new_bets,
+            "unauthorized": {"count": self.attempts_since_tick, "latest": self.new_attempts},
+            "chat_connections": {sid: self.chat_connections.get(sid, 0) for sid in self.changed_chat},
+        }
+        self._reset_changes()
+        return delta
+
+    async def seed(self) -> None:
+        async with self.session_factory() as session:
+            pools = (
+                await session.execute(
+                    select(Bet.stream_id, Bet.team_id, func.sum(Bet.amount), func.count()).where(Bet.status == BetStatus.ACTIVE).group_by(Bet.stream_id, Bet.team_id)
+                )
+            ).all()
+            bets = list(await session.scalars(select(Bet).order_by(Bet.created_at.desc()).limit(RECENT_LIMIT)))
+            attempts = list(await session.scalars(select(UnauthorizedAttempt).order_by(UnauthorizedAttempt.created_at.desc()).limit(RECENT_LIMIT)))
+        # Only live workers' hashes remain; a dead worker's counts drop out once its TTL lapses.
+        chat: dict[str, dict[str, int]] = {}
+        async for key in self.redis.scan_iter(match=f"{CHAT_CONNECTIONS_PREFIX}*", count=100):
+            worker = key.removeprefix(CHAT_CONNECTIONS_PREFIX)
+            for stream_id, count in (await self.redis.hgetall(key)).items():
+                chat.setdefault(stream_id, {})[worker] = int(count)
+        self.pools, self.bet_counts = {}, {}
+        for stream_id, team_id, amount, count in pools:
+            self.pools.setdefault(str(stream_id), {})[str(team_id)] = int(amount)
+            self.bet_counts[str(stream_id)] = self.bet_counts.get(str(stream_id), 0) + count
+        self.recent_bets = deque(
+            (jsonable_encoder({"kind": "bet", "bet_id": b.id, "user_id": b.user_id, "stream_id": b.stream_id, "team_id": b.team_id, "amount": b.amount}) for b in bets),
+            maxlen=RECENT_LIMIT,
+        )
+        self.recent_attempts = deque(
+            (jsonable_encoder({"kind": "unauthorized", "telegram_id": a.telegram_id, "username": a.username, "ip": a.ip, "endpoint": a.endpoint, "reason": a.reason, "created_at": a.created_at}) for a in attempts),
+            maxlen=RECENT_LIMIT,
+        )
+        self.chat_by_worker, self.chat_connections = chat, {}
+        for stream_id in list(chat):
+            self._total_chat(stream_id)
+        self._reset_changes()
+
+    async def _deliver(self, socket: Any, message: dict[str, Any]) -> bool:
+        # A stalled client must not hold up everyone else's updates; it is closed and left to reconnect.
+        try:
+            await asyncio.wait_for(socket.send_json(message), self.send_timeout)
+            return True
+        except Exception:
+            logger.info("dropping admin dashboard socket after a failed send", exc_info=True)
+            with suppress(Exception):
+                await asyncio.wait_for(socket.close(code=1011), self.send_timeout)
+            return False
+
+    async def _send(self, message: dict[str, Any]) -> None:
+        for pending in self.joining.values():
+            pending.append(message)
+        sockets = list(self.sockets)
+        delivered = await asyncio.gather(*(self._deliver(socket, message) for socket in sockets))
+        for socket, ok in zip(sockets, delivered):
+            if not ok:
+                self.sockets.discard(socket)
+
+    async def _tick(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_resync = loop.time() + self.resync_seconds
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            # Nothing awaits this task, so a failure here must not end it: admins would silently stop getting
+            # updates while the listener keeps running.
+            try:
+                if loop.time() >= next_resync:
+                    # Events published while the hub (re)subscribed can be missed or counted twice; a periodic
+                    # full snapshot bounds that drift.
+                    next_resync = loop.time() + self.resync_seconds
+                    await self.seed()
+                    await self._send(self.snapshot())
+                    continue
+                delta = self.take_delta()
+                if delta is not None:
+                    await self._send(delta)
+            except Exception:
+                logger.warning("admin dashboard tick failed; keeping live deltas until the next resync", exc_info=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(DASHBOARD_CHANNEL)
+                    await self.seed()
+                    self.ready.set()
+                    ticker = asyncio.create_task(self._tick())
+                    try:
+                        async for message in pubsub.listen():
+                            if message["type"] == "message":
+                                self.apply(json.loads(message["data"]))
+                    finally:
+                        ticker.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("admin dashboard subscription dropped; retrying", exc_info=True)
+                await asyncio.sleep(1)
+
+    async def join(self, socket: Any) -> bool:
+        # Callers must pair every join with a leave, even when it returns False; the hub stops listening when the
+        # last member leaves.
+        self.members += 1
+        if self._task is None:
+            self.ready.clear()
+            self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self.ready.wait(), self.join_timeout)
+        except TimeoutError:
+            logger.warning("admin dashboard not ready after %ss; closing socket", self.join_timeout)
+            with suppress(Exception):
+                await socket.close(code=1011, reason="dashboard unavailable")
+            return False
+        # The snapshot is taken and the socket registered without yielding, so every later broadcast is either
+        # already in the snapshot or queued behind it.
+        pending = self.joining[socket] = [self.snapshot()]
+        while pending:
+            if not await self._deliver(socket, pending.pop(0)):
+                self.joining.pop(socket, None)
+                return False
+        self.joining.pop(socket, None)
+        self.sockets.add(socket)
+        return True
+
+    async def leave(self, socket: Any) -> None:
+        self.sockets.discard(socket)
+        self.joining.pop(socket, None)
+        self.members -= 1
+        if not self.members and self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,159 @@
+import logging
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import UTC, datetime
+
+from redis.asyncio import Redis
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.metrics import LEADERBOARD_WRITE_FAILURES
+from src.models.entities import Bet, BetStatus, Stream, Transaction, TransactionType
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_KEY = "lb:global"
+WEEKLY_TTL_SECONDS = 35 * 24 * 3600
+STAT_FIELDS = ("bets", "wagered", "won", "profit", "wins", "losses", "refunds")
+PIPELINE_CHUNK = 1000
+
+
+def week_id(at: datetime) -> str:
+    year, week, _ = at.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def weekly_key(week: str) -> str:
+    return f"lb:week:{week}"
+
+
+def stream_key(stream_id: uuid.UUID) -> str:
+    return f"lb:stream:{stream_id}"
+
+
+def stats_key(user_id: uuid.UUID) -> str:
+    return f"stats:user:{user_id}"
+
+
+def settlement_delta(amount: int, payout: int, status: BetStatus) -> dict[str, int]:
+    # Profit is realized at settlement: winners gain payout - stake, losers lose the stake, refunds are neutral.
+    if status == BetStatus.WON:
+        return {"won": payout, "profit": payout - amount, "wins": 1}
+    if status == BetStatus.LOST:
+        return {"profit": -amount, "losses": 1}
+    if status == BetStatus.REFUNDED:
+        return {"refunds": 1}
+    return {}
+
+
+class Leaderboards:
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    # record_bet/record_settlement run after the bet or settlement has committed, so they are best effort: a Redis
+    # error is logged and counted instead of failing a request whose write already succeeded. `make
+    # rebuild-leaderboards` repairs the drift.
+    async def record_bet(self, user_id: uuid.UUID, amount: int) -> None:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hincrby(stats_key(user_id), "bets", 1)
+                pipe.hincrby(stats_key(user_id), "wagered", amount)
+                await pipe.execute()
+        except Exception:
+            LEADERBOARD_WRITE_FAILURES.inc("bet")
+            logger.warning("failed to record bet for user %s on leaderboards", user_id, exc_info=True)
+
+    async def record_settlement(self, stream_id: uuid.UUID, results: Iterable[tuple[uuid.UUID, int, int, BetStatus]], settled_at: datetime) -> None:
+        week = weekly_key(week_id(settled_at))
+        results = list(results)
+        try:
+            for offset in range(0, len(results), PIPELINE_CHUNK):
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for user_id, amount, payout, status in results[offset : offset + PIPELINE_CHUNK]:
+                        delta = settlement_delta(amount, payout, status)
+                        for field, value in delta.items():
+                            pipe.hincrby(stats_key(user_id), field, value)
+                        profit = delta.get("profit", 0)
+                        pipe.zincrby(GLOBAL_KEY, profit, str(user_id))
+                        pipe.zincrby(week, profit, str(user_id))
+                        pipe.zincrby(stream_key(stream_id), profit, str(user_id))
+                    pipe.expire(week, WEEKLY_TTL_SECONDS)
+                    await pipe.execute()
+        except Exception:
+            LEADERBOARD_WRITE_FAILURES.inc("settlement")
+            logger.warning("failed to record settlement of stream %s on leaderboards", stream_id, exc_info=True)
+
+    async def page(self, key: str, offset: int, limit: int) -> tuple[int, list[tuple[uuid.UUID, int]]]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zcard(key)
+            pipe.zrevrange(key, offset, offset + limit - 1, withscores=True)
+            total, rows = await pipe.execute()
+        return total, [(uuid.UUID(member), int(score)) for member, score in rows]
+
+    async def stats(self, user_id: uuid.UUID, week: str) -> dict[str, int | None]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(stats_key(user_id))
+            pipe.zrevrank(GLOBAL_KEY, str(user_id))
+            pipe.zrevrank(weekly_key(week), str(user_id))
+            raw, global_rank, weekly_rank = await pipe.execute()
+        stats: dict[str, int | None] = {field: int(raw.get(field, 0)) for field in STAT_FIELDS}
+        stats["global_rank"] = global_rank + 1 if global_rank is not None else None
+        stats["weekly_rank"] = weekly_rank + 1 if weekly_rank is not None else None
+        return stats
+
+
+async def rebuild_leaderboards(db: AsyncSession, redis: Redis) -> dict[str, int]:
+    # Offline recomputation from bets + WIN ledger rows; results are staged under temp keys and
+    # swapped in with RENAME so readers never see a half-built board.
+    payouts = (
+        select(Transaction.user_id, Transaction.stream_id, Transaction.amount)
+        .where(Transaction.type == TransactionType.WIN)
+        .subquery()
+    )
+    stmt = (
+        select(Bet.user_id, Bet.stream_id, Bet.amount, Bet.status, payouts.c.amount, Stream.betting_locked_at)
+        .join(Stream, Stream.id == Bet.stream_id)
+        .outerjoin(payouts, and_(payouts.c.user_id == Bet.user_id, payouts.c.stream_id == Bet.stream_id))
+    )
+    stats: dict[uuid.UUID, dict[str, int]] = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+    boards: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    rows = 0
+    async for user_id, stream_id, amount, status, payout, settled_at in await db.stream(stmt.execution_options(yield_per=5000)):
+        rows += 1
+        record = stats[user_id]
+        record["bets"] += 1
+        record["wagered"] += amount
+        if status == BetStatus.ACTIVE:
+            continue
+        delta = settlement_delta(amount, payout or 0, status)
+        for field, value in delta.items():
+            record[field] += value
+        profit = delta.get("profit", 0)
+        member = str(user_id)
+        boards[GLOBAL_KEY][member] += profit
+        boards[weekly_key(week_id(settled_at or datetime.now(UTC)))][member] += profit
+        boards[stream_key(stream_id)][member] += profit
+
+    existing = set()
+    for pattern in ("lb:*", "stats:user:*"):
+        existing.update([key async for key in redis.scan_iter(match=pattern, count=1000)])
+    items = list(stats.items())
+    for offset in range(0, len(items), PIPELINE_CHUNK):
+        async with redis.pipeline(transaction=False) as pipe:
+            for user_id, record in items[offset : offset + PIPELINE_CHUNK]:
+                pipe.hset(stats_key(user_id), mapping=record)
+            await pipe.execute()
+    for key, scores in boards.items():
+        staging = f"{key}:rebuild"
+        members = list(scores.items())
+        await redis.delete(staging)
+        for offset in range(0, len(members), PIPELINE_CHUNK):
+            await redis.zadd(staging, dict(members[offset : offset + PIPELINE_CHUNK]))
+        await redis.rename(staging, key)
+        if key.startswith("lb:week:"):
+            await redis.expire(key, WEEKLY_TTL_SECONDS)
+    stale = list(existing - set(boards) - {stats_key(user_id) for user_id in stats})
+    for offset in range(0, len(stale), PIPELINE_CHUNK):
+        await redis.delete(*stale[offset : offset + PIPELINE_CHUNK])
+    return {"bets": rows, "users": len(stats), "boards": len(boards)}
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio import Redis
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+from src.models.entities import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant key; holding it serializes relays so events leave in id order.
+RELAY_LOCK_ID = 0x6F7574626F78
+
+
+def record_event(db: AsyncSession, event_type: str, payload: dict[str, Any], stream_id: uuid.UUID | None = None) -> None:
+    # Added to the caller's session, so the event commits (or rolls back) with the change it describes.
+    db.add(OutboxEvent(event_type=event_type, stream_id=stream_id, payload=jsonable_encoder(payload)))
+
+
+def redis_stream_key(stream_id: uuid.UUID | None) -> str:
+    return f"events:stream:{stream_id}" if stream_id else "events:global"
+
+
+class OutboxRelay:
+    def __init__(self, redis: Redis, session_factory: Callable[[], AsyncSession]):
+        settings = get_settings()
+        self.redis = redis
+        self.session_factory = session_factory
+        self.batch_size = settings.outbox_batch_size
+        self.poll_interval = settings.outbox_poll_interval_seconds
+        self.maxlen = settings.outbox_stream_maxlen
+        self.retention = timedelta(hours=settings.outbox_retention_hours)
+        self.safety_lag = timedelta(seconds=settings.outbox_safety_lag_seconds)
+
+    async def publish_batch(self) -> int:
+        async with self.session_factory() as session:
+            if not await session.scalar(select(func.pg_try_advisory_xact_lock(RELAY_LOCK_ID))):
+                await session.rollback()
+                return 0
+            # Ids are assigned at insert, not commit, so a transaction still in flight can commit a lower id after
+            # higher ones were relayed. Holding back rows younger than the safety lag (created_at is the inserting
+            # transaction's start time) lets anything shorter than the lag commit first, as reconciliation does.
+            events = list(
+                await session.scalars(
+                    select(OutboxEvent)
+                    .where(OutboxEvent.published_at.is_(None), OutboxEvent.created_at < func.now() - self.safety_lag)
+                    .order_by(OutboxEvent.id)
+                    .limit(self.batch_size)
+                )
+            )
+            if not events:
+                await session.rollback()
+                return 0
+            # Publish before marking: a crash in between re-sends the batch (at-least-once), and
+            # consumers dedupe on outbox_id.
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for event in events:
+                    pipe.xadd(
+                        redis_stream_key(event.stream_id),
+                        {
+                            "outbox_id": event.id,
+                            "type": event.event_type,
+                            "stream_id": str(event.stream_id or ""),
+                            "payload": json.dumps(event.payload, separators=(",", ":")),
+                            "created_at": event.created_at.isoformat(),
+                        },
+                        maxlen=self.maxlen,
+                        approximate=True,
+                    )
+                await pipe.execute()
+            await session.execute(update(OutboxEvent).where(OutboxEvent.id.in_([e.id for e in events])).values(published_at=func.now()))
+            await session.commit()
+        return len(events)
+
+    async def purge_published(self) -> int:
+        async with self.session_factory() as session:
+            result = await session.execute(delete(OutboxEvent).where(OutboxEvent.published_at < func.now() - self.retention))
+            await session.commit()
+        return result.rowcount
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_purge = 0.0
+        while True:
+            try:
+                published = await self.publish_batch()
+                if published:
+                    logger.info("outbox relay published=%d", published)
+                if loop.time() >= next_purge:
+                    purged = await self.purge_published()
+                    if purged:
+                        logger.info("outbox relay purged=%d", purged)
+                    next_purge = loop.time() + 3600
+                if published < self.batch_size:
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("outbox relay iteration failed")
+                await asyncio.sleep(1)
@@ -0,0 +1,126 @@
+import logging
+import time
+from datetime import timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+from src.models.entities import LedgerReconciliationRun, Transaction, Wallet, WalletLedgerCheckpoint
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant key; holding it serializes runs so no window is folded into checkpoints twice.
+RECONCILE_LOCK_ID = 0x6C6564676572
+
+
+class LedgerReconciler:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def run(self) -> LedgerReconciliationRun:
+        started = time.perf_counter()
+        await self._begin_locked()
+        lag = timedelta(seconds=get_settings().reconcile_safety_lag_seconds)
+        horizon = await self.db.scalar(select(func.now() - lag))
+        previous = await self.db.scalar(select(func.max(LedgerReconciliationRun.cursor)))
+
+        tx = Transaction
+        window = [tx.created_at < horizon]
+        if previous is not None:
+            window.append(tx.created_at >= previous)
+        totals = select(tx.user_id, func.sum(tx.amount).label("ledger_sum"), func.count().label("tx_count")).where(*window).group_by(tx.user_id).subquery()
+        latest = (
+            select(tx.user_id, tx.created_at.label("last_tx_created_at"), tx.id.label("last_tx_id"))
+            .where(*window)
+            .distinct(tx.user_id)
+            .order_by(tx.user_id, tx.created_at.desc(), tx.id.desc())
+            .subquery()
+        )
+        chunk = (
+            select(totals.c.user_id, totals.c.ledger_sum, totals.c.tx_count, latest.c.last_tx_created_at, latest.c.last_tx_id)
+            .join_from(totals, latest, latest.c.user_id == totals.c.user_id)
+            .cte("chunk")
+        )
+
+        checkpoint = WalletLedgerCheckpoint
+        upsert = pg_insert(checkpoint).from_select(
+            ["user_id", "ledger_sum", "tx_count", "last_tx_created_at", "last_tx_id"],
+            select(chunk.c.user_id, chunk.c.ledger_sum, chunk.c.tx_count, chunk.c.last_tx_created_at, chunk.c.last_tx_id),
+        )
+        upserted = (
+            upsert.on_conflict_do_update(
+                index_elements=[checkpoint.user_id],
+                set_={
+                    "ledger_sum": checkpoint.ledger_sum + upsert.excluded.ledger_sum,
+                    "tx_count": checkpoint.tx_count + upsert.excluded.tx_count,
+                    "last_tx_created_at": upsert.excluded.last_tx_created_at,
+                    "last_tx_id": upsert.excluded.last_tx_id,
+                    "checked_at": func.now(),
+                },
+            )
+            .returning(checkpoint.user_id)
+            .cte("upserted")
+        )
+        scanned_rows, users_updated = (
+            await self.db.execute(
+                select(
+                    select(func.coalesce(func.sum(chunk.c.tx_count), 0)).scalar_subquery(),
+                    select(func.count()).select_from(upserted).scalar_subquery(),
+                )
+            )
+        ).one()
+
+        tail = select(tx.user_id, func.sum(tx.amount).label("amount")).where(tx.created_at >= horizon).group_by(tx.user_id).subquery()
+        expected = Wallet.initial_balance + func.coalesce(checkpoint.ledger_sum, 0) + func.coalesce(tail.c.amount, 0)
+        wallets_checked = await self.db.scalar(select(func.count()).select_from(Wallet))
+        mismatched = (
+            await self.db.execute(
+                select(Wallet.user_id, Wallet.balance - expected)
+                .outerjoin(checkpoint, checkpoint.user_id == Wallet.user_id)
+                .outerjoin(tail, tail.c.user_id == Wallet.user_id)
+                .where(Wallet.balance != expected)
+            )
+        ).all()
+
+        await self.db.execute(update(checkpoint).where(checkpoint.mismatch != 0).values(mismatch=0))
+        if mismatched:
+            flag = pg_insert(checkpoint).values([{"user_id": user_id, "mismatch": delta} for user_id, delta in mismatched])
+            await self.db.execute(flag.on_conflict_do_update(index_elements=[checkpoint.user_id], set_={"mismatch": flag.excluded.mismatch}))
+
+        run = LedgerReconciliationRun(
+            cursor=horizon,
+            scanned_rows=scanned_rows,
+            users_updated=users_updated,
+            wallets_checked=wallets_checked,
+            mismatches=len(mismatched),
+            duration_ms=int((time.perf_counter() - started) * 1000),
+        )
+        self.db.add(run)
+        await self.db.commit()
+        logger.info(
+            "ledger reconciliation scanned=%s users_updated=%s mismatches=%s duration_ms=%s",
+            run.scanned_rows,
+            run.users_updated,
+            run.mismatches,
+            run.duration_ms,
+        )
+        return run
+
+    async def _begin_locked(self) -> None:
+        # One snapshot for the whole run. Rows newer than the horizon may still have uncommitted
+        # neighbours, so they are summed on the fly instead of being folded into checkpoints.
+        # The snapshot is taken by the first statement, so waiting for the lock inside it would hide the
+        # checkpoints of the run being waited for; wait in a throwaway transaction and retake the snapshot instead.
+        while True:
+            await self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            if await self.db.scalar(select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK_ID))):
+                return
+            await self.db.rollback()
+            await self.db.scalar(select(func.pg_advisory_xact_lock(RECONCILE_LOCK_ID)))
+            await self.db.rollback()
+
+    async def list_mismatches(self) -> list[WalletLedgerCheckpoint]:
+        rows = await self.db.scalars(select(WalletLedgerCheckpoint).where(WalletLedgerCheckpoint.mismatch != 0))
+        return list(rows)
@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import logging
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from redis.asyncio import Redis
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+from src.models.entities import Stream, StreamStatus
+from src.services.outbox import record_event
+
+logger = logging.getLogger(__name__)
+
+LEASE_KEY = "scheduler:streams:lease"
+SCHEDULE_CHANNEL = "scheduler:streams:changed"
+
+# Renew/release only while we still own the lease, so a worker that stalled past the TTL
+# can never extend or delete a lease another worker has since acquired.
+RENEW_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+LOCK = "lock"
+START = "start"
+
+
+def sync_betting_lock(stream: Stream) -> None:
+    # Keep the flag consistent after an admin edit; the scheduler only ever moves it forward.
+    stream.is_betting_locked = stream.status != StreamStatus.SCHEDULED or datetime.now(UTC) >= min(stream.betting_locked_at, stream.start_time)
+
+
+async def notify_schedule_changed(redis: Redis, stream_id: uuid.UUID) -> None:
+    try:
+        await redis.publish(SCHEDULE_CHANNEL, str(stream_id))
+    except Exception:
+        # The lease holder resyncs periodically, so a lost notification only delays the change.
+        logger.warning("failed to publish schedule change for stream %s", stream_id, exc_info=True)
+
+
+class StreamLifecycleScheduler:
+    def __init__(self, redis: Redis, session_factory: Callable[[], AsyncSession]):
+        settings = get_settings()
+        self.redis = redis
+        self.session_factory = session_factory
+        self.lease_ms = int(settings.stream_scheduler_lease_seconds * 1000)
+        self.resync_seconds = settings.stream_scheduler_resync_seconds
+        self.owner = uuid.uuid4().hex
+        self.heap: list[tuple[datetime, str, uuid.UUID]] = []
+        self.is_leader = False
+        self.wakeup = asyncio.Event()
+        self.dirty = True
+        self._renew = redis.register_script(RENEW_LEASE)
+        self._release = redis.register_script(RELEASE_LEASE)
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._listen())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.is_leader:
+            await self._release(keys=[LEASE_KEY], args=[self.owner])
+            self.is_leader = False
+
+    async def _hold_lease(self) -> bool:
+        if self.is_leader:
+            self.is_leader = bool(await self._renew(keys=[LEASE_KEY], args=[self.owner, self.lease_ms]))
+        else:
+            self.is_leader = bool(await self.redis.set(LEASE_KEY, self.owner, nx=True, px=self.lease_ms))
+            if self.is_leader:
+                logger.info("stream scheduler lease acquired owner=%s", self.owner)
+                self.dirty = True
+        return self.is_leader
+
+    async def reload(self) -> None:
+        async with self.session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(Stream.id, Stream.start_time, Stream.betting_locked_at, Stream.is_betting_locked).where(Stream.status == StreamStatus.SCHEDULED)
+                )
+            ).all()
+        heap = []
+        for stream_id, start_time, locked_at, is_locked in rows:
+            if not is_locked:
+                heap.append((min(locked_at, start_time), LOCK, stream_id))
+            heap.append((start_time, START, stream_id))
+        heapq.heapify(heap)
+        self.heap = heap
+        self.dirty = False
+
+    async def fire_due(self, now: datetime) -> None:
+        due: dict[str, list[uuid.UUID]] = {LOCK: [], START: []}
+        while self.heap and self.heap[0][0] <= now:
+            _, action, stream_id = heapq.heappop(self.heap)
+            due[action].append(stream_id)
+        if not due[LOCK] and not due[START]:
+            return
+        # The WHERE clauses re-check the row, so a stale heap entry after an admin edit is a no-op.
+        async with self.session_factory() as session:
+            if due[LOCK]:
+                locked = await session.scalars(
+                    update(Stream)
+                    .where(
+                        Stream.id.in_(due[LOCK]),
+                        Stream.is_betting_locked.is_(False),
+                        func.least(Stream.betting_locked_at, Stream.start_time) <= func.now(),
+                    )
+                    .values(is_betting_locked=True)
+                    .returning(Stream.id)
+                )
+                for stream_id in locked:
+                    record_event(session, "stream.betting_locked", {"by": "scheduler"}, stream_id)
+            if due[START]:
+                started = await session.scalars(
+                    update(Stream)
+                    .where(Stream.id.in_(due[START]), Stream.status == StreamStatus.SCHEDULED, Stream.start_time <= func.now())
+                    .values(status=StreamStatus.LIVE, is_betting_locked=True)
+                    .returning(Stream.id)
+                )
+                for stream_id in started:
+                    record_event(session, "stream.status_changed", {"status": StreamStatus.LIVE, "is_betting_locked": True, "by": "scheduler"}, stream_id)
+            await session.commit()
+        logger.info("stream scheduler fired locked=%d started=%d", len(due[LOCK]), len(due[START]))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_resync = 0.0
+        while True:
+            try:
+                self.wakeup.clear()
+                if not await self._hold_lease():
+                    self.heap = []
+                    await asyncio.sleep(self.lease_ms / 3000)
+                    continue
+                if self.dirty or loop.time() >= next_resync:
+                    await self.reload()
+                    next_resync = loop.time() + self.resync_seconds
+                await self.fire_due(datetime.now(UTC))
+                timeout = self.lease_ms / 3000
+                if self.heap:
+                    timeout = min(timeout, max((self.heap[0][0] - datetime.now(UTC)).total_seconds(), 0))
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout)
+                except TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("stream scheduler iteration failed")
+                self.dirty = True
+                await asyncio.sleep(1)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(SCHEDULE_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.dirty = True
+                            self.wakeup.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("stream scheduler subscription dropped; retrying", exc_info=True)
+                await asyncio.sleep(1)
@@ -0,0 +1,90 @@
+import uuid
+from datetime import UTC, datetime
+
+from redis.asyncio import Redis
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+from src.models.entities import UnauthorizedAttempt, UnauthorizedAttemptRollup
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(second=0, microsecond=0)
+
+
+async def record_attempt_rollup(db: AsyncSession, attempt: UnauthorizedAttempt, telegram_id: int | None) -> None:
+    # telegram_id comes from the caller rather than the attempt: it is None when the id was never verified.
+    now = datetime.now(UTC)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "granularity": granularity,
+            "bucket": bucket_start(now, granularity),
+            "reason": attempt.reason,
+            "ip": attempt.ip,
+            "telegram_id": telegram_id,
+            "attempts": 1,
+            "last_seen": now,
+        }
+        for granularity in ("minute", "hour")
+    ]
+    stmt = pg_insert(UnauthorizedAttemptRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_attempt_rollup_key",
+        set_={"attempts": UnauthorizedAttemptRollup.attempts + 1, "last_seen": stmt.excluded.last_seen},
+    )
+    await db.execute(stmt)
+
+
+class BlockList:
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    @staticmethod
+    def _key(kind: str, value: str | int) -> str:
+        return f"secblock:{kind}:{value}"
+
+    async def is_blocked(self, ip: str | None, telegram_id: int | None) -> bool:
+        keys = [self._key(kind, value) for kind, value in (("ip", ip), ("tg", telegram_id)) if value is not None]
+        if not keys:
+            return False
+        return await self.redis.exists(*keys) > 0
+
+    async def block(self, kind: str, value: str | int, ttl_seconds: int) -> None:
+        await self.redis.set(self._key(kind, value), 1, ex=ttl_seconds)
+
+    async def unblock(self, kind: str, value: str) -> bool:
+        return await self.redis.delete(self._key(kind, value)) > 0
+
+    async def list_blocks(self) -> list[tuple[str, str, int]]:
+        blocks = []
+        async for key in self.redis.scan_iter(match="secblock:*", count=500):
+            _, kind, value = key.split(":", 2)
+            blocks.append((kind, value, await self.redis.ttl(key)))
+        return blocks
+
+
+async def detect_offenders(db: AsyncSession, redis: Redis, ip: str | None, telegram_id: int | None) -> None:
+    settings = get_settings()
+    hour = bucket_start(datetime.now(UTC), "hour")
+    checks = (
+        ("ip", ip, UnauthorizedAttemptRollup.ip, settings.security_ip_block_threshold),
+        ("tg", telegram_id, UnauthorizedAttemptRollup.telegram_id, settings.security_telegram_block_threshold),
+    )
+    block_list = BlockList(redis)
+    for kind, value, column, threshold in checks:
+        if value is None:
+            continue
+        total = await db.scalar(
+            select(func.coalesce(func.sum(UnauthorizedAttemptRollup.attempts), 0)).where(
+                UnauthorizedAttemptRollup.granularity == "hour",
+                UnauthorizedAttemptRollup.bucket == hour,
+                column == value,
+            )
+        )
+        if total >= threshold:
+            await block_list.block(kind, value, settings.security_block_ttl_seconds)
@@ -1,13 +1,17 @@
+import heapq
 import math
+import time
 import uuid
 from datetime import UTC, datetime
 
 from fastapi import HTTPException, Request, status
 from redis.asyncio import Redis
-from sqlalchemy import func, select
+from sqlalchemy import any_, bindparam, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import get_settings
+from src.core.metrics import SETTLEMENT_DURATION
 from src.core.security import create_access_token, verify_telegram_payload
 from src.models.entities import (
     Bet,
@@ -24,11 +28,29 @@ from src.models.entities import (
     UserRole,
     Wallet,
 )
-from src.schemas.common import TelegramAuthIn
+from src.schemas.common import BalanceCampaignIn, BalanceCampaignOut, PayoutPreviewOut, SettlementOutcomeOut, SettlementPreviewOut, TelegramAuthIn
+from src.services.balance_cache import BalanceCache
+from src.services.chat_moderation import get_chat_moderator
+from src.services.dashboard import publish_dashboard_event
+from src.services.leaderboard import Leaderboards
+from src.services.outbox import record_event
 from src.services.rate_limit import RateLimiter
+from src.services.security_analytics import BlockList, detect_offenders, record_attempt_rollup
+from src.services.wallet_locks import lock_wallets, run_with_lock_retry
 
 
-async def log_unauthorized(db: AsyncSession, request: Request, endpoint: str, reason: str, telegram_id: int | None = None, username: str | None = None) -> None:
+async def log_unauthorized(
+    db: AsyncSession,
+    request: Request,
+    endpoint: str,
+    reason: str,
+    telegram_id: int | None = None,
+    username: str | None = None,
+    redis: Redis | None = None,
+    identity_verified: bool = True,
+) -> None:
+    # The raw attempt keeps whatever id was presented; rollups and blocking only count ids we have verified.
+    counted_id = telegram_id if identity_verified else None
     attempt = UnauthorizedAttempt(
         telegram_id=telegram_id,
         username=username,
@@ -38,27 +60,47 @@ async def log_unauthorized(db: AsyncSession, request: Request, endpoint: str, re
         reason=reason,
     )
     db.add(attempt)
+    await record_attempt_rollup(db, attempt, counted_id)
     await db.commit()
+    if redis is not None:
+        await publish_dashboard_event(
+            redis,
+            "unauthorized",
+            {"telegram_id": telegram_id, "username": username, "ip": attempt.ip, "endpoint": endpoint, "reason": reason, "created_at": datetime.now(UTC)},
+        )
+        await detect_offenders(db, redis, attempt.ip, counted_id)
 
 
-async def enforce_whitelisted(db: AsyncSession, request: Request, user: User, endpoint: str) -> None:
+async def enforce_not_blocked(redis: Redis | None, request: Request, telegram_id: int | None) -> None:
+    if redis is None:
+        return
+    if await BlockList(redis).is_blocked(request.client.host if request.client else None, telegram_id):
+        raise HTTPException(status_code=403, detail="Temporarily blocked")
+
+
+async def enforce_whitelisted(db: AsyncSession, request: Request, user: User, endpoint: str, redis: Redis | None = None) -> None:
+    await enforce_not_blocked(redis, request, user.telegram_id)
     if user.is_banned:
-        await log_unauthorized(db, request, endpoint, "banned", user.telegram_id, user.username)
+        await log_unauthorized(db, request, endpoint, "banned", user.telegram_id, user.username, redis)
         raise HTTPException(status_code=403, detail="Banned")
     if not user.is_whitelisted and user.role != UserRole.ADMIN:
-        await log_unauthorized(db, request, endpoint, "not_whitelisted", user.telegram_id, user.username)
+        await log_unauthorized(db, request, endpoint, "not_whitelisted", user.telegram_id, user.username, redis)
         raise HTTPException(status_code=403, detail="Not whitelisted")
 
 
 class AuthService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, redis: Redis | None = None):
         self.db = db
+        self.redis = redis
 
     async def telegram_login(self, payload: TelegramAuthIn, request: Request) -> tuple[str, User]:
+        # Until the signature checks out payload.id is only a claim, so only the IP block applies before it.
+        await enforce_not_blocked(self.redis, request, None)
         data = payload.model_dump()
         if not verify_telegram_payload(data):
-            await log_unauthorized(self.db, request, "/auth/telegram", "telegram_hash_invalid", payload.id, payload.username)
+            await log_unauthorized(self.db, request, "/auth/telegram", "telegram_hash_invalid", payload.id, payload.username, self.redis, identity_verified=False)
             raise HTTPException(status_code=401, detail="Invalid Telegram payload")
+        await enforce_not_blocked(self.redis, request, payload.id)
 
         user = await self.db.scalar(select(User).where(User.telegram_id == payload.id))
         settings = get_settings()
@@ -76,7 +118,7 @@ class AuthService:
             )
             self.db.add(user)
             await self.db.flush()
-            self.db.add(Wallet(user_id=user.id, balance=1000))
+            self.db.add(Wallet(user_id=user.id, balance=1000, initial_balance=1000))
         else:
             user.username = payload.username
             user.first_name = payload.first_name
@@ -85,11 +127,11 @@ class AuthService:
 
         if user.is_banned:
             await self.db.commit()
-            await log_unauthorized(self.db, request, "/auth/telegram", "banned_login", user.telegram_id, user.username)
+            await log_unauthorized(self.db, request, "/auth/telegram", "banned_login", user.telegram_id, user.username, self.redis)
             raise HTTPException(status_code=403, detail="Banned")
         if not user.is_whitelisted and user.role != UserRole.ADMIN:
             await self.db.commit()
-            await log_unauthorized(self.db, request, "/auth/telegram", "not_whitelisted_login", user.telegram_id, user.username)
+            await log_unauthorized(self.db, request, "/auth/telegram", "not_whitelisted_login", user.telegram_id, user.username, self.redis)
             raise HTTPException(status_code=403, detail="Not whitelisted")
 
         self.db.add(LoginLog(user_id=user.id, ip=request.client.host if request.client else None, user_agent=request.headers.get("user-agent")))
@@ -98,90 +140,290 @@ class AuthService:
         return create_access_token(str(user.id)), user
 
 
+def winner_gain(amount: int, winners_pool: int, losers_pool: int) -> int:
+    # The payout rule: a winner's share of the losers' pool, rounded down. Shared by settlement and its preview.
+    return math.floor(losers_pool * (amount / winners_pool))
+
+
 class BettingService:
     def __init__(self, db: AsyncSession, redis: Redis):
         self.db = db
+        self.redis = redis
         self.limiter = RateLimiter(redis)
+        self.balances = BalanceCache(redis)
+        self.leaderboards = Leaderboards(redis)
 
     async def place_bet(self, user: User, stream_id: uuid.UUID, team_id: uuid.UUID, amount: int) -> Bet:
-        allowed = await self.limiter.hit(f"bet:{user.id}", limit=5, window_seconds=60)
+        user_id = user.id
+        allowed = await self.limiter.hit(f"bet:{user_id}", limit=5, window_seconds=60)
         if not allowed:
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
         if amount <= 0:
             raise HTTPException(status_code=400, detail="Amount must be positive")
+        cached_balance = await self.balances.get(user_id)
+        if cached_balance is not None and cached_balance < amount:
+            raise HTTPException(status_code=400, detail="Insufficient balance")
 
-        async with self.db.begin():
+        async def body() -> tuple[Bet, Wallet]:
             stream = await self.db.get(Stream, stream_id)
             if not stream:
                 raise HTTPException(status_code=404, detail="Stream not found")
-            lock_time = min(stream.betting_locked_at, stream.start_time)
-            if datetime.now(UTC) >= lock_time:
+            # The lifecycle scheduler flips is_betting_locked/status on time. The clock check is kept as the fallback
+            # for when no worker holds the scheduler lease (failover gap, STREAM_SCHEDULER_ENABLED=false) or a
+            # transition runs late; it compares columns of the row already loaded, so it costs no query.
+            if stream.is_betting_locked or stream.status != StreamStatus.SCHEDULED or datetime.now(UTC) >= min(stream.betting_locked_at, stream.start_time):
                 raise HTTPException(status_code=400, detail="Betting locked")
 
             team = await self.db.get(Team, team_id)
             if not team or team.stream_id != stream_id:
                 raise HTTPException(status_code=400, detail="Invalid team")
 
-            existing = await self.db.scalar(select(Bet).where(Bet.user_id == user.id, Bet.stream_id == stream_id).with_for_update())
-            if existing:
-                raise HTTPException(status_code=400, detail="One bet per stream allowed")
-
-            wallet = await self.db.scalar(select(Wallet).where(Wallet.user_id == user.id).with_for_update())
+            # The wallet lock serializes this user's bets, so the duplicate check below cannot race.
+            wallet = (await lock_wallets(self.db, [user_id], "place_bet")).get(user_id)
             if not wallet or wallet.balance < amount:
                 raise HTTPException(status_code=400, detail="Insufficient balance")
 
+            existing = await self.db.scalar(select(Bet.id).where(Bet.user_id == user_id, Bet.stream_id == stream_id))
+            if existing:
+                raise HTTPException(status_code=400, detail="One bet per stream allowed")
+
             wallet.balance -= amount
-            bet = Bet(user_id=user.id, stream_id=stream_id, team_id=team_id, amount=amount, status=BetStatus.ACTIVE)
+            bet = Bet(id=uuid.uuid4(), user_id=user_id, stream_id=stream_id, team_id=team_id, amount=amount, status=BetStatus.ACTIVE)
             self.db.add(bet)
-            self.db.add(Transaction(user_id=user.id, type=TransactionType.BET, amount=-amount, stream_id=stream_id, reason="User bet placement"))
+            self.db.add(Transaction(user_id=user_id, type=TransactionType.BET, amount=-amount, stream_id=stream_id, reason="User bet placement"))
+            record_event(self.db, "bet.placed", {"bet_id": bet.id, "user_id": user_id, "team_id": team_id, "amount": amount}, stream_id)
+            return bet, wallet
 
+        bet, wallet = await run_with_lock_retry(self.db, "place_bet", body)
+        await self.balances.set(user_id, wallet.balance, wallet.version)
+        await self.leaderboards.record_bet(user_id, amount)
+        await publish_dashboard_event(self.redis, "bet", {"bet_id": bet.id, "user_id": user_id, "stream_id": stream_id, "team_id": team_id, "amount": amount})
         await self.db.refresh(bet)
         return bet
 
     async def settle_stream(self, stream_id: uuid.UUID, winner_team_id: uuid.UUID) -> None:
-        async with self.db.begin():
-            stream = await self.db.get(Stream, stream_id)
+        started = time.perf_counter()
+
+        async def body() -> tuple[dict[uuid.UUID, Wallet], list[tuple[uuid.UUID, int, int, BetStatus]]]:
+            # FOR NO KEY UPDATE: it still serializes settlements, but unlike FOR UPDATE it does not conflict with the
+            # key-share lock a concurrent bet's FK check takes on this row while that bet already holds its wallet
+            # lock; blocking there would invert the wallet -> stream order and deadlock with lock_wallets below.
+            stream = await self.db.scalar(select(Stream).where(Stream.id == stream_id).with_for_update(key_share=True))
             if not stream:
                 raise HTTPException(status_code=404, detail="Stream not found")
 
             active_bets = list(
-                await self.db.scalars(select(Bet).where(Bet.stream_id == stream_id, Bet.status == BetStatus.ACTIVE).with_for_update())
+                await self.db.scalars(
+                    select(Bet).where(Bet.stream_id == stream_id, Bet.status == BetStatus.ACTIVE).order_by(Bet.id).with_for_update()
+                )
             )
             total_pool = sum(b.amount for b in active_bets)
-            winners = [b for b in active_bets if b.team_id == winner_team_id]
-            winners_pool = sum(b.amount for b in winners)
+            winners_pool = sum(b.amount for b in active_bets if b.team_id == winner_team_id)
             losers_pool = total_pool - winners_pool
 
-            if winners_pool == 0:
-                for bet in active_bets:
+            credits: list[tuple[uuid.UUID, int, TransactionType, str]] = []
+            results: list[tuple[uuid.UUID, int, int, BetStatus]] = []
+            for bet in active_bets:
+                payout = 0
+                if winners_pool == 0:
                     bet.status = BetStatus.REFUNDED
-                    wallet = await self.db.scalar(select(Wallet).where(Wallet.user_id == bet.user_id).with_for_update())
-                    if wallet:
-                        wallet.balance += bet.amount
-                    self.db.add(Transaction(user_id=bet.user_id, type=TransactionType.REFUND, amount=bet.amount, stream_id=stream_id, reason="No winners"))
-            else:
-                for bet in active_bets:
-                    if bet.team_id == winner_team_id:
-                        gain = math.floor(losers_pool * (bet.amount / winners_pool))
-                        payout = bet.amount + gain
-                        bet.status = BetStatus.WON
-                        wallet = await self.db.scalar(select(Wallet).where(Wallet.user_id == bet.user_id).with_for_update())
-                        if wallet:
-                            wallet.balance += payout
-                        self.db.add(Transaction(user_id=bet.user_id, type=TransactionType.WIN, amount=payout, stream_id=stream_id, reason="Winner payout"))
-                    else:
-                        bet.status = BetStatus.LOST
+                    payout = bet.amount
+                    credits.append((bet.user_id, payout, TransactionType.REFUND, "No winners"))
+                elif bet.team_id == winner_team_id:
+                    gain = winner_gain(bet.amount, winners_pool, losers_pool)
+                    bet.status = BetStatus.WON
+                    payout = bet.amount + gain
+                    credits.append((bet.user_id, payout, TransactionType.WIN, "Winner payout"))
+                else:
+                    bet.status = BetStatus.LOST
+                results.append((bet.user_id, bet.amount, payout, bet.status))
+
+            wallets = await lock_wallets(self.db, (user_id for user_id, *_ in credits), "settle_stream")
+            touched: dict[uuid.UUID, Wallet] = {}
+            for user_id, amount, tx_type, reason in credits:
+                wallet = wallets.get(user_id)
+                if wallet:
+                    wallet.balance += amount
+                    touched[user_id] = wallet
+                self.db.add(Transaction(user_id=user_id, type=tx_type, amount=amount, stream_id=stream_id, reason=reason))
 
             stream.status = StreamStatus.FINISHED
             stream.betting_locked_at = datetime.now(UTC)
+            stream.is_betting_locked = True
+            record_event(
+                self.db,
+                "stream.settled",
+                {
+                    "winner_team_id": winner_team_id,
+                    "total_pool": total_pool,
+                    "winners_pool": winners_pool,
+                    "bets": len(active_bets),
+                    "refunded": winners_pool == 0,
+                    "wallets": [{"user_id": w.user_id, "balance": w.balance} for w in touched.values()],
+                },
+                stream_id,
+            )
+            return touched, results
+
+        touched, results = await run_with_lock_retry(self.db, "settle_stream", body)
+        SETTLEMENT_DURATION.observe(time.perf_counter() - started)
+        await self.balances.set_wallets(touched.values())
+        await self.leaderboards.record_settlement(stream_id, results, datetime.now(UTC))
+        await publish_dashboard_event(self.redis, "settled", {"stream_id": stream_id, "winner_team_id": winner_team_id})
+
+
+    async def preview_settlement(self, stream_id: uuid.UUID, top: int = 5) -> SettlementPreviewOut:
+        # Read-only: one column fetch of the active bets, grouped by team, then one pass per candidate over only
+        # that team's bets (every other bet simply loses), so all outcomes together touch each bet once.
+        stream = await self.db.get(Stream, stream_id)
+        if not stream:
+            raise HTTPException(status_code=404, detail="Stream not found")
+        teams = (await self.db.execute(select(Team.id, Team.name).where(Team.stream_id == stream_id).order_by(Team.name))).all()
+        rows = await self.db.execute(select(Bet.team_id, Bet.amount, Bet.id, Bet.user_id).where(Bet.stream_id == stream_id, Bet.status == BetStatus.ACTIVE))
+        by_team: dict[uuid.UUID, list[tuple[int, uuid.UUID, uuid.UUID]]] = {team_id: [] for team_id, _ in teams}
+        for team_id, amount, bet_id, user_id in rows:
+            by_team.setdefault(team_id, []).append((amount, bet_id, user_id))
+        pools = {team_id: sum(amount for amount, *_ in bets) for team_id, bets in by_team.items()}
+        total_pool = sum(pools.values())
+        bets_count = sum(len(bets) for bets in by_team.values())
+
+        outcomes = []
+        for team_id, team_name in teams:
+            winners_pool = pools[team_id]
+            losers_pool = total_pool - winners_pool
+            if winners_pool == 0:
+                outcomes.append(
+                    SettlementOutcomeOut(
+                        team_id=team_id, team_name=team_name, refunded=True, winners=0, winners_pool=0, losers_pool=losers_pool,
+                        total_paid=total_pool, rounding_remainder=0, top_payouts=[],
+                    )
+                )
+                continue
+            distributed = 0
+            for amount, *_ in by_team[team_id]:
+                distributed += winner_gain(amount, winners_pool, losers_pool)
+            # Payouts are monotonic in the stake, so the largest stakes are the largest payouts.
+            largest = heapq.nlargest(top, by_team[team_id], key=lambda bet: bet[0])
+            outcomes.append(
+                SettlementOutcomeOut(
+                    team_id=team_id,
+                    team_name=team_name,
+                    refunded=False,
+                    winners=len(by_team[team_id]),
+                    winners_pool=winners_pool,
+                    losers_pool=losers_pool,
+                    total_paid=winners_pool + distributed,
+                    rounding_remainder=losers_pool - distributed,
+                    top_payouts=[
+                        PayoutPreviewOut(bet_id=bet_id, user_id=user_id, amount=amount, payout=amount + winner_gain(amount, winners_pool, losers_pool))
+                        for amount, bet_id, user_id in largest
+                    ],
+                )
+            )
+        return SettlementPreviewOut(stream_id=stream_id, total_pool=total_pool, bets=bets_count, outcomes=outcomes)
+
+
+class WalletService:
+    def __init__(self, db: AsyncSession, redis: Redis):
+        self.db = db
+        self.balances = BalanceCache(redis)
+
+    def _campaign_targets(self, payload: BalanceCampaignIn):
+        if payload.target == "whitelisted":
+            return select(User.id.label("user_id")).where(User.is_whitelisted.is_(True), User.is_banned.is_(False))
+        if payload.target == "stream_bettors":
+            if payload.stream_id is None:
+                raise HTTPException(status_code=400, detail="stream_id required for stream_bettors target")
+            return select(Bet.user_id.label("user_id")).where(Bet.stream_id == payload.stream_id)
+        if not payload.user_ids:
+            raise HTTPException(status_code=400, detail="user_ids required for user_ids target")
+        ids = bindparam("campaign_user_ids", payload.user_ids, type_=ARRAY(UUID(as_uuid=True)))
+        return select(User.id.label("user_id")).where(User.id == any_(ids))
+
+    async def adjust(self, user_id: uuid.UUID, amount: int, reason: str | None) -> Wallet:
+        async def body() -> Wallet:
+            wallet = (await lock_wallets(self.db, [user_id], "balance_adjust")).get(user_id)
+            if not wallet:
+                raise HTTPException(status_code=404, detail="Wallet not found")
+            wallet.balance += amount
+            self.db.add(Transaction(user_id=user_id, type=TransactionType.ADMIN_ADJUST, amount=amount, reason=reason))
+            record_event(self.db, "wallet.adjusted", {"user_id": user_id, "amount": amount, "balance": wallet.balance, "reason": reason})
+            return wallet
+
+        wallet = await run_with_lock_retry(self.db, "balance_adjust", body)
+        await self.balances.set(user_id, wallet.balance, wallet.version)
+        return wallet
+
+    async def bulk_adjust(self, payload: BalanceCampaignIn) -> BalanceCampaignOut:
+        if payload.amount == 0:
+            raise HTTPException(status_code=400, detail="Amount must be non-zero")
+        targets = self._campaign_targets(payload).cte("targets")
+        # Lock in user_id order (same order as lock_wallets) before the UPDATE, whose own row order is up to the planner.
+        locked = (
+            select(Wallet.user_id)
+            .where(Wallet.user_id.in_(select(targets.c.user_id)))
+            .order_by(Wallet.user_id)
+            .with_for_update()
+            .cte("locked")
+        )
+        updated = (
+            update(Wallet)
+            .where(Wallet.user_id == locked.c.user_id, Wallet.balance + payload.amount >= 0)
+            .values(balance=Wallet.balance + payload.amount, version=Wallet.version + 1)
+            .returning(Wallet.user_id, Wallet.balance, Wallet.version)
+            .cte("updated")
+        )
+        inserted = (
+            insert(Transaction)
+            .from_select(
+                ["id", "user_id", "type", "amount", "reason"],
+                select(
+                    func.gen_random_uuid(),
+                    updated.c.user_id,
+                    literal(TransactionType.ADMIN_ADJUST, Transaction.type.type),
+                    literal(payload.amount),
+                    literal(payload.reason, Transaction.reason.type),
+                ),
+            )
+            .returning(Transaction.user_id)
+            .cte("inserted")
+        )
+        new_balances = select(
+            func.array_agg(updated.c.user_id).label("user_ids"),
+            func.array_agg(updated.c.balance).label("balances"),
+            func.array_agg(updated.c.version).label("versions"),
+        ).subquery()
+        stmt = select(
+            select(func.count()).select_from(targets).scalar_subquery(),
+            select(func.count()).select_from(inserted).scalar_subquery(),
+            new_balances.c.user_ids,
+            new_balances.c.balances,
+            new_balances.c.versions,
+        )
+
+        async def body():
+            row = (await self.db.execute(stmt)).one()
+            record_event(self.db, "wallet.campaign", {"target": payload.target, "amount": payload.amount, "reason": payload.reason, "user_ids": row[2] or []}, payload.stream_id)
+            return row
+
+        targeted, affected, user_ids, balances, versions = await run_with_lock_retry(self.db, "balance_campaign", body)
+        if user_ids:
+            await self.balances.set_many(zip(user_ids, balances, versions))
+        return BalanceCampaignOut(targeted=targeted, affected=affected, skipped=targeted - affected, total_amount=affected * payload.amount)
 
 
 class ChatService:
     def __init__(self, db: AsyncSession, redis: Redis):
         self.db = db
+        self.redis = redis
         self.limiter = RateLimiter(redis)
+        self.moderator = get_chat_moderator()
 
     async def create_message(self, stream_id: uuid.UUID, user_id: uuid.UUID, message: str) -> ChatMessage:
+        # Local checks (flood, banned words, near-duplicates) run first: they are cheap and reject spam before
+        # it costs a Redis round trip, a row or a broadcast.
+        await self.moderator.refresh(self.redis)
+        self.moderator.check(user_id, message)
         allowed = await self.limiter.hit(f"chat:{user_id}", limit=20, window_seconds=60)
         if not allowed:
             raise HTTPException(status_code=429, detail="Rate limit exceeded")
@@ -0,0 +1,71 @@
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+from typing import TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+from src.core.metrics import WALLET_LOCK_FAILURES, WALLET_LOCK_WAIT
+from src.models.entities import Wallet
+
+T = TypeVar("T")
+
+LOCK_FAILURES = {"55P03": "lock_timeout", "40P01": "deadlock"}
+
+
+def lock_failure_reason(exc: DBAPIError) -> str | None:
+    sqlstate = getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+    return LOCK_FAILURES.get(sqlstate)
+
+
+async def lock_wallets(db: AsyncSession, user_ids: Iterable[uuid.UUID], operation: str) -> dict[uuid.UUID, Wallet]:
+    # One statement, rows locked in user_id order: every multi-wallet writer takes locks in the same
+    # global order, so two of them can queue behind each other but never deadlock. That holds only if locks
+    # taken on other rows in the same transaction cannot block a wallet holder (settle_stream locks its stream
+    # FOR NO KEY UPDATE for exactly this reason).
+    ids = sorted(set(user_ids))
+    if not ids:
+        return {}
+    started = time.perf_counter()
+    stmt = (
+        select(Wallet)
+        .where(Wallet.user_id == any_(bindparam("lock_user_ids", ids, type_=ARRAY(UUID(as_uuid=True)))))
+        .order_by(Wallet.user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    wallets = {w.user_id: w for w in await db.scalars(stmt)}
+    WALLET_LOCK_WAIT.observe(time.perf_counter() - started, operation)
+    return wallets
+
+
+async def run_with_lock_retry(db: AsyncSession, operation: str, body: Callable[[], Awaitable[T]]) -> T:
+    # Runs `body` in the session's current transaction with a bounded lock_timeout and commits it. Lock
+    # timeouts and deadlocks roll back and retry with jittered backoff, then surface as 503.
+    settings = get_settings()
+    for attempt in range(settings.wallet_lock_retries + 1):
+        try:
+            await db.execute(select(func.set_config("lock_timeout", f"{settings.wallet_lock_timeout_ms}ms", True)))
+            result = await body()
+            await db.commit()
+            return result
+        except DBAPIError as exc:
+            await db.rollback()
+            reason = lock_failure_reason(exc)
+            if reason is None:
+                raise
+            WALLET_LOCK_FAILURES.inc(operation, reason)
+            if attempt == settings.wallet_lock_retries:
+                raise HTTPException(status_code=503, detail="Wallet busy, retry later", headers={"Retry-After": "1"}) from exc
+            await asyncio.sleep(settings.wallet_lock_retry_backoff_ms / 1000 * 2**attempt * random.uniform(0.5, 1.5))
+        except BaseException:
+            await db.rollback()
+            raise
+    raise AssertionError("unreachable")
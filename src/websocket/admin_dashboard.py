@@ -0,0 +1,52 @@
+import uuid
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from src.core.redis import redis_pool
+from src.core.security import decode_token
+from src.db.session import database
+from src.models.entities import User, UserRole
+from src.services.dashboard import DashboardHub
+
+router = APIRouter(tags=["admin"])
+hub: DashboardHub | None = None
+
+
+def get_dashboard_hub() -> DashboardHub:
+    global hub
+    if hub is None:
+        hub = DashboardHub(redis_pool.get(), database.session)
+    return hub
+
+
+@router.websocket("/admin/ws/dashboard")
+async def admin_dashboard_ws(websocket: WebSocket):
+    await websocket.accept()
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.close(code=1008)
+        return
+
+    try:
+        payload = decode_token(token)
+        user_id = uuid.UUID(payload["sub"])
+    except Exception:
+        await websocket.close(code=1008)
+        return
+
+    async with database.session() as db:
+        user = await db.get(User, user_id)
+        if not user or user.is_banned or user.role != UserRole.ADMIN:
+            await websocket.close(code=1008)
+            return
+
+    dashboard = get_dashboard_hub()
+    try:
+        if not await dashboard.join(websocket):
+            return
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await dashboard.leave(websocket)
@@ -2,15 +2,15 @@ import json
 import uuid
 from collections import defaultdict
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
-from redis.asyncio import Redis
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.deps import get_redis
-from src.core.config import get_settings
+from src.core.redis import redis_pool
 from src.core.security import decode_token
-from src.db.session import AsyncSessionLocal
+from src.db.session import database
 from src.models.entities import User
+from src.services.dashboard import track_chat_connection
 from src.services.services import ChatService
 
 router = APIRouter(tags=["chat"])
@@ -32,14 +32,15 @@ async def chat_ws(websocket: WebSocket, stream_id: uuid.UUID):
         await websocket.close(code=1008)
         return
 
-    async with AsyncSessionLocal() as db:
+    async with database.session() as db:
         user = await db.get(User, user_id)
         if not user or user.is_banned or (not user.is_whitelisted and user.role.value != "ADMIN"):
             await websocket.close(code=1008)
             return
 
     connections[stream_id].add(websocket)
-    redis = Redis.from_url(get_settings().redis_url, decode_responses=True)
+    redis = redis_pool.get()
+    await track_chat_connection(redis, stream_id, 1)
 
     try:
         while True:
@@ -47,8 +48,13 @@ async def chat_ws(websocket: WebSocket, stream_id: uuid.UUID):
             message = json.loads(data).get("message", "").strip()
             if not message:
                 continue
-            async with AsyncSessionLocal() as db:
-                msg = await ChatService(db, redis).create_message(stream_id, user_id, message)
+            async with database.session() as db:
+                try:
+                    msg = await ChatService(db, redis).create_message(stream_id, user_id, message)
+                except HTTPException as exc:
+                    # Only the sender learns the message was rejected; nothing is stored or broadcast.
+                    await websocket.send_json({"error": exc.detail, "status": exc.status_code})
+                    continue
                 payload_out = {
                     "id": str(msg.id),
                     "stream_id": str(stream_id),
@@ -62,4 +68,4 @@ async def chat_ws(websocket: WebSocket, stream_id: uuid.UUID):
         pass
     finally:
         connections[stream_id].discard(websocket)
-        await redis.close()
+        await track_chat_connection(redis, stream_id, -1)
@@ -0,0 +1,19 @@
+import re
+
+import pytest
+
+SERVER_TIMING_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def query_count(response) -> int:
+    match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+@pytest.fixture
+def assert_max_queries():
+    def _assert(response, limit: int) -> None:
+        count = query_count(response)
+        assert count <= limit, f"{response.request.method} {response.request.url.path} ran {count} queries (limit {limit})"
+
+    return _assert
@@ -0,0 +1,118 @@
+import asyncio
+import uuid
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from src.api.deps import get_redis
+from src.api.routes import bets
+from src.core.security import create_access_token
+from src.db import session
+from src.models.entities import BetStatus, UserRole
+from src.services.admission import AdmissionController
+
+
+def test_queue_is_fifo_and_overflow_is_rejected_fast():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, queue_size=2, max_wait_seconds=1)
+        stream_id, order = uuid.uuid4(), []
+        release = asyncio.Event()
+
+        async def bet(name: str, hold: bool = False):
+            async with controller.admit(stream_id, uuid.uuid4()):
+                order.append(name)
+                if hold:
+                    await release.wait()
+
+        first = asyncio.create_task(bet("first", hold=True))
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(bet(f"queued-{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc:
+            await bet("overflow")
+        assert exc.value.status_code == 429 and exc.value.headers["Retry-After"] == "1"
+        release.set()
+        await asyncio.gather(first, *queued)
+        assert order == ["first", "queued-0", "queued-1"]
+        assert controller.gates == {}
+
+    asyncio.run(scenario())
+
+
+def test_user_cannot_hold_two_slots_and_waiters_time_out():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, queue_size=5, max_wait_seconds=0.01)
+        stream_id, user_id = uuid.uuid4(), uuid.uuid4()
+        async with controller.admit(stream_id, user_id):
+            with pytest.raises(HTTPException):
+                async with controller.admit(stream_id, user_id):
+                    pass
+            with pytest.raises(HTTPException):
+                async with controller.admit(stream_id, uuid.uuid4()):
+                    pass
+        assert controller.gates == {}
+
+    asyncio.run(scenario())
+
+
+def test_queued_bet_holds_no_db_connection(monkeypatch):
+    user = SimpleNamespace(id=uuid.uuid4(), telegram_id=1, username=None, is_banned=False, is_whitelisted=True, role=UserRole.USER)
+    sessions, release = [], asyncio.Event()
+
+    class Session:
+        async def get(self, model, key):
+            return user
+
+    async def get_db():
+        sessions.append(1)
+        try:
+            yield Session()
+        finally:
+            sessions.pop()
+
+    class Redis:
+        async def exists(self, *keys):
+            return 0
+
+    class Betting:
+        def __init__(self, db, redis):
+            pass
+
+        async def place_bet(self, user, stream_id, team_id, amount):
+            await release.wait()
+            return SimpleNamespace(id=uuid.uuid4(), user_id=user.id, stream_id=stream_id, team_id=team_id, amount=amount, status=BetStatus.ACTIVE, created_at=datetime.now(UTC))
+
+    controller = AdmissionController(max_concurrent=1, queue_size=1, max_wait_seconds=5)
+    monkeypatch.setattr(bets, "get_bet_admission", lambda: controller)
+    monkeypatch.setattr(bets, "BettingService", Betting)
+    app = FastAPI()
+    app.include_router(bets.router)
+    app.dependency_overrides[session.get_db] = get_db
+    app.dependency_overrides[get_redis] = Redis
+
+    async def scenario():
+        stream_id = uuid.uuid4()
+        body = {"stream_id": str(stream_id), "team_id": str(uuid.uuid4()), "amount": 10}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+
+            def post(subject):
+                return asyncio.create_task(client.post("/bets", json=body, headers={"Authorization": f"Bearer {create_access_token(str(subject))}"}))
+
+            async def until(predicate):
+                while not predicate():
+                    await asyncio.sleep(0.001)
+
+            running = post(user.id)
+            await asyncio.wait_for(until(lambda: stream_id in controller.gates), 5)
+            queued = post(uuid.uuid4())
+            await asyncio.wait_for(until(lambda: controller.gates[stream_id].waiters), 5)
+            assert len(sessions) == 1
+            release.set()
+            responses = await asyncio.gather(running, queued)
+        assert [r.status_code for r in responses] == [200, 200]
+        assert sessions == [] and controller.gates == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,32 @@
+import asyncio
+import uuid
+
+from redis.exceptions import ConnectionError
+
+from src.core.metrics import BALANCE_CACHE_WRITE_FAILURES
+from src.services.balance_cache import BalanceCache
+
+
+class _Redis:
+    def __init__(self):
+        self.deleted = []
+
+    def register_script(self, script):
+        async def run(keys, args, client=None):
+            raise ConnectionError("redis down")
+
+        return run
+
+    async def delete(self, *keys):
+        self.deleted.extend(keys)
+        return len(keys)
+
+
+def test_failed_post_commit_write_drops_the_entry_instead_of_raising():
+    redis = _Redis()
+    cache = BalanceCache(redis)
+    user_id = uuid.uuid4()
+    before = BALANCE_CACHE_WRITE_FAILURES.values.get((), 0)
+    asyncio.run(cache.set(user_id, 900, 3))
+    assert redis.deleted == [f"balance:{user_id}"]
+    assert BALANCE_CACHE_WRITE_FAILURES.values[()] == before + 1
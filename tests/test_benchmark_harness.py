@@ -0,0 +1,10 @@
+import json
+
+from benchmarks.harness import compare, summarize
+
+
+def test_compare_flags_p50_regressions_over_threshold(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": {"fast": summarize([0.001] * 10), "slow": summarize([0.001] * 10)}}))
+    current = {"fast": summarize([0.00105] * 10), "slow": summarize([0.002] * 10), "new": summarize([0.001])}
+    assert compare(current, baseline, threshold=0.15) == ["slow"]
@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.routes.admin import bulk_create_streams
+from src.schemas.common import StreamBulkCreate
+
+
+class _Session:
+    def __init__(self):
+        self.statements = []
+        self.added = []
+        self.committed = False
+
+    async def scalars(self, stmt, params):
+        self.statements.append((stmt, params))
+        return SimpleNamespace(all=lambda: [datetime.now(UTC)] * len(params))
+
+    async def execute(self, stmt, params):
+        self.statements.append((stmt, params))
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        self.committed = True
+
+
+class _Redis:
+    async def publish(self, channel, message):
+        return 1
+
+
+def _bracket(matches: int, teams: int = 2) -> StreamBulkCreate:
+    start = datetime.now(UTC) + timedelta(days=1)
+    return StreamBulkCreate(
+        streams=[
+            {
+                "title": f"Match {i}",
+                "stream_type": "twitch",
+                "stream_url": "https://twitch.tv/x",
+                "start_time": start + timedelta(hours=i),
+                "betting_locked_at": start + timedelta(hours=i),
+                "teams": [{"name": f"Team {i}-{t}"} for t in range(teams)],
+            }
+            for i in range(matches)
+        ]
+    )
+
+
+def test_bracket_is_inserted_with_two_multi_row_statements():
+    db = _Session()
+    out = asyncio.run(bulk_create_streams(_bracket(64), db, _Redis(), SimpleNamespace(id=uuid.uuid4())))
+    assert len(db.statements) == 2 and db.committed
+    assert len(db.statements[0][1]) == 64 and len(db.statements[1][1]) == 128
+    assert len(db.added) == 64
+    assert [len(s.teams) for s in out] == [2] * 64
+    assert all(t.stream_id == s.id for s in out for t in s.teams)
+
+
+def test_invalid_bracket_writes_nothing():
+    db = _Session()
+    payload = _bracket(3)
+    payload.streams[1].teams = payload.streams[1].teams[:1]
+    payload.streams[2].teams[1].name = payload.streams[2].teams[0].name.upper()
+    payload.streams[2].betting_locked_at = payload.streams[2].start_time + timedelta(minutes=1)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(bulk_create_streams(payload, db, _Redis(), SimpleNamespace(id=uuid.uuid4())))
+    assert exc.value.detail == [
+        {"stream": 1, "error": "At least 2 teams required"},
+        {"stream": 2, "error": "Duplicate team names"},
+        {"stream": 2, "error": "betting_locked_at after start_time"},
+    ]
+    assert db.statements == [] and not db.committed
+
+
+def test_naive_timestamps_are_read_as_utc():
+    payload = StreamBulkCreate.model_validate(
+        {"streams": [{**stream.model_dump(), "start_time": "2030-01-01T12:00:00", "betting_locked_at": "2030-01-01T11:30:00"} for stream in _bracket(2).streams]}
+    )
+    out = asyncio.run(bulk_create_streams(payload, _Session(), _Redis(), SimpleNamespace(id=uuid.uuid4())))
+    assert [s.start_time for s in out] == [datetime(2030, 1, 1, 12, tzinfo=UTC)] * 2
+    assert not any(s.is_betting_locked for s in out)
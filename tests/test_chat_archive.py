@@ -0,0 +1,65 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from src.services.chat_archive import ChatArchive
+
+
+def test_append_and_replay_seek_across_runs(tmp_path):
+    archive = ChatArchive(tmp_path, block_messages=10)
+    stream_id = uuid.uuid4()
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    at = [start + timedelta(seconds=i) for i in range(95)]
+    for chunk in (at[:60], at[60:]):
+        writer = archive.writer(stream_id)
+        for i, created_at in enumerate(chunk):
+            writer.add(uuid.uuid4(), uuid.uuid4(), f"m{at.index(created_at)}", i == 3, created_at)
+        writer.close()
+
+    assert len(archive.read_index(stream_id)) == 6 + 4
+    assert archive.watermark(stream_id) == at[-1]
+    assert [r["message"] for r in archive.replay(stream_id, at[42], at[45])] == ["m42", "m43", "m44"]
+
+    items, last = archive.replay_page(stream_id, None, at[10], limit=5)
+    assert [i["message"] for i in items] == ["m0", "m1", "m2", "m4", "m5"] and last == (at[5], uuid.UUID(items[-1]["id"]))
+    items, last = archive.replay_page(stream_id, None, at[10], limit=5, after=last)
+    assert [i["message"] for i in items] == ["m6", "m7", "m8", "m9"] and last is None
+    items, last = archive.replay_page(stream_id, at[90], None, limit=50)
+    assert len(items) == 5 and last is None
+    assert archive.replay_page(uuid.uuid4(), None, None, limit=5) == ([], None)
+
+
+def test_replay_pages_through_messages_sharing_a_timestamp(tmp_path):
+    archive = ChatArchive(tmp_path, block_messages=4)
+    stream_id = uuid.uuid4()
+    at = datetime(2025, 1, 1, tzinfo=UTC)
+    writer = archive.writer(stream_id)
+    for i, message_id in enumerate(sorted(uuid.uuid4() for _ in range(7))):
+        writer.add(message_id, uuid.uuid4(), f"m{i}", False, at)
+    writer.close()
+
+    seen, after = [], None
+    while True:
+        items, after = archive.replay_page(stream_id, None, None, limit=3, after=after)
+        seen += [i["message"] for i in items]
+        if after is None:
+            break
+    assert seen == [f"m{i}" for i in range(7)]
+
+
+def test_torn_index_tail_is_ignored_and_repaired(tmp_path):
+    archive = ChatArchive(tmp_path, block_messages=2)
+    stream_id = uuid.uuid4()
+    at = datetime(2025, 1, 1, tzinfo=UTC)
+    writer = archive.writer(stream_id)
+    for i in range(4):
+        writer.add(uuid.uuid4(), uuid.uuid4(), f"m{i}", False, at + timedelta(seconds=i))
+    writer.close()
+    _, index_path = archive.paths(stream_id)
+    with open(index_path, "ab") as index:
+        index.write(b"\x00" * 7)
+
+    assert len(archive.read_index(stream_id)) == 2
+    writer = archive.writer(stream_id)
+    writer.add(uuid.uuid4(), uuid.uuid4(), "m4", False, at + timedelta(seconds=4))
+    writer.close()
+    assert [r["message"] for r in archive.replay(stream_id)] == ["m0", "m1", "m2", "m3", "m4"]
@@ -0,0 +1,43 @@
+import uuid
+
+from fastapi import HTTPException
+
+from src.services.chat_moderation import BannedWordMatcher, ChatModerator
+
+
+def test_matcher_finds_whole_words_through_failure_links():
+    matcher = BannedWordMatcher(["ass", "he", "she", "hers", "scam link"])
+    assert matcher.find("Class is fine") is None
+    assert matcher.find("what an ASS!") == "ass"
+    assert matcher.find("ushers") is None
+    assert matcher.find("ask her: she") == "she"
+    assert matcher.find("free scam link here") == "scam link"
+    assert BannedWordMatcher(["bad guy", "guy"]).find("notbad guy") == "guy"
+    assert BannedWordMatcher(["a-b", "b"]).find("xa-b") == "b"
+    assert BannedWordMatcher([]).find("anything") is None
+
+
+def _moderator() -> ChatModerator:
+    return ChatModerator(flood_max=3, flood_window=5, duplicate_window=60, duplicate_threshold=0.8, refresh_seconds=5)
+
+
+def _status(moderator, user_id, message, now) -> int:
+    try:
+        moderator.check(user_id, message, now)
+    except HTTPException as exc:
+        return exc.status_code
+    return 200
+
+
+def test_duplicates_and_floods_are_rejected_per_user():
+    moderator = _moderator()
+    spammer, other = uuid.uuid4(), uuid.uuid4()
+    assert _status(moderator, spammer, "FREE SKINS at example.com join now", 0) == 200
+    assert _status(moderator, spammer, "free skins at example.com   join now!! 2", 1) == 429
+    assert _status(moderator, other, "free skins at example.com join now", 1) == 200
+    assert _status(moderator, spammer, "gg wp", 2) == 200
+    assert _status(moderator, spammer, "what a clutch", 3) == 200
+    assert _status(moderator, spammer, "no way", 4) == 429
+    assert _status(moderator, spammer, "no way", 6) == 200
+    assert _status(moderator, spammer, "FREE SKINS at example.com join now", 70) == 200
+
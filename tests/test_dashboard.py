@@ -0,0 +1,173 @@
+import asyncio
+
+from src.services.dashboard import CHAT_CONNECTIONS_PREFIX, DashboardHub
+
+
+def _hub() -> DashboardHub:
+    return DashboardHub(redis=None, session_factory=None)  # type: ignore[arg-type]
+
+
+def test_events_coalesce_into_one_delta_per_tick():
+    hub = _hub()
+    for amount in (100, 50):
+        hub.apply({"kind": "bet", "bet_id": "b", "user_id": "u", "stream_id": "s1", "team_id": "t1", "amount": amount})
+    hub.apply({"kind": "bet", "bet_id": "b", "user_id": "u", "stream_id": "s2", "team_id": "t9", "amount": 7})
+    for _ in range(30):
+        hub.apply({"kind": "unauthorized", "ip": "1.2.3.4", "reason": "banned"})
+    hub.apply({"kind": "chat", "stream_id": "s1", "worker": "w1", "connections": 1})
+    hub.apply({"kind": "chat", "stream_id": "s1", "worker": "w2", "connections": 2})
+
+    delta = hub.take_delta()
+    assert delta["streams"] == {"s1": {"pool": {"t1": 150}, "bets": 2}, "s2": {"pool": {"t9": 7}, "bets": 1}}
+    assert len(delta["new_bets"]) == 3
+    assert delta["unauthorized"]["count"] == 30 and len(delta["unauthorized"]["latest"]) == 20
+    assert delta["chat_connections"] == {"s1": 3}
+    assert hub.take_delta() is None
+
+    hub.apply({"kind": "settled", "stream_id": "s2"})
+    hub.apply({"kind": "chat", "stream_id": "s1", "worker": "w1", "connections": 0})
+    hub.apply({"kind": "chat", "stream_id": "s1", "worker": "w2", "connections": 0})
+    delta = hub.take_delta()
+    assert delta["streams"] == {} and delta["removed_streams"] == ["s2"] and delta["chat_connections"] == {"s1": 0}
+
+    snapshot = hub.snapshot()
+    assert snapshot["streams"] == {"s1": {"pool": {"t1": 150}, "bets": 2}}
+    assert snapshot["chat_connections"] == {} and len(snapshot["recent_bets"]) == 3
+
+
+class _FailingSession:
+    async def __aenter__(self):
+        raise ConnectionError("database unavailable")
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Socket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+
+def test_ticker_survives_a_failed_resync():
+    async def scenario():
+        hub = DashboardHub(redis=None, session_factory=_FailingSession)  # type: ignore[arg-type]
+        hub.tick_seconds, hub.resync_seconds = 0.001, 0
+        socket = _Socket()
+        hub.sockets.add(socket)
+        ticker = asyncio.create_task(hub._tick())
+        await asyncio.sleep(0.01)
+        hub.apply({"kind": "chat", "stream_id": "s1", "worker": "w1", "connections": 1})
+        hub.resync_seconds = 3600
+        for _ in range(100):
+            if socket.sent:
+                break
+            await asyncio.sleep(0.005)
+        assert not ticker.done()
+        ticker.cancel()
+        assert socket.sent[0]["chat_connections"] == {"s1": 1}
+
+    asyncio.run(scenario())
+
+
+class _Redis:
+    def __init__(self, hashes):
+        self.hashes = hashes
+
+    async def scan_iter(self, match, count):
+        for key in self.hashes:
+            yield key
+
+    async def hgetall(self, key):
+        return self.hashes[key]
+
+
+class _EmptySession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        return type("Result", (), {"all": lambda self: []})()
+
+    async def scalars(self, stmt):
+        return []
+
+
+def test_seed_sums_live_workers_chat_counts():
+    hub = DashboardHub(redis=_Redis({f"{CHAT_CONNECTIONS_PREFIX}w1": {"s1": "2"}, f"{CHAT_CONNECTIONS_PREFIX}w2": {"s1": "3", "s2": "1"}}), session_factory=_EmptySession)  # type: ignore[arg-type]
+    hub.chat_by_worker = {"s3": {"dead": 7}}
+    hub.chat_connections = {"s3": 7}
+    asyncio.run(hub.seed())
+    assert hub.chat_connections == {"s1": 5, "s2": 1}
+    hub.apply({"kind": "chat", "stream_id": "s1", "worker": "w1", "connections": 0})
+    assert hub.chat_connections["s1"] == 3
+
+
+class _StalledSocket(_Socket):
+    def __init__(self, stall: asyncio.Event | None = None):
+        super().__init__()
+        self.stall = stall or asyncio.Event()
+        self.closed = None
+
+    async def send_json(self, message):
+        await self.stall.wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=None):
+        self.closed = code
+
+
+def test_stalled_socket_is_dropped_without_delaying_others():
+    async def scenario():
+        hub = _hub()
+        hub.send_timeout = 0.05
+        healthy, stalled = _Socket(), _StalledSocket()
+        hub.sockets.update({healthy, stalled})
+        await hub._send({"type": "delta"})
+        assert healthy.sent == [{"type": "delta"}]
+        assert stalled.closed == 1011 and hub.sockets == {healthy}
+
+    asyncio.run(scenario())
+
+
+def test_join_times_out_when_hub_never_seeds():
+    async def scenario():
+        hub = _hub()
+        hub.join_timeout = 0.01
+
+        async def never_ready():
+            await asyncio.Event().wait()
+
+        hub._run = never_ready
+        socket = _StalledSocket()
+        assert not await hub.join(socket)
+        assert socket.closed == 1011 and not hub.sockets
+        await hub.leave(socket)
+        assert hub._task is None
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_during_join_follows_the_snapshot():
+    async def scenario():
+        hub = _hub()
+        hub.ready.set()
+        hub._task = asyncio.create_task(asyncio.Event().wait())
+        release = asyncio.Event()
+        socket = _StalledSocket(release)
+        joining = asyncio.create_task(hub.join(socket))
+        while socket not in hub.joining:
+            await asyncio.sleep(0)
+        await hub._send({"type": "delta"})
+        release.set()
+        assert await joining
+        assert [m["type"] for m in socket.sent] == ["snapshot", "delta"]
+        assert hub.sockets == {socket} and not hub.joining
+        await hub.leave(socket)
+
+    asyncio.run(scenario())
@@ -0,0 +1,44 @@
+import asyncio
+import uuid
+from datetime import UTC, datetime
+
+from redis.exceptions import ConnectionError
+
+from src.core.metrics import LEADERBOARD_WRITE_FAILURES
+from src.models.entities import BetStatus
+from src.services.leaderboard import Leaderboards, settlement_delta, week_id
+
+
+def test_settlement_delta_realizes_profit_per_outcome():
+    assert settlement_delta(100, 250, BetStatus.WON) == {"won": 250, "profit": 150, "wins": 1}
+    assert settlement_delta(100, 0, BetStatus.LOST) == {"profit": -100, "losses": 1}
+    assert settlement_delta(100, 100, BetStatus.REFUNDED) == {"refunds": 1}
+    assert settlement_delta(100, 0, BetStatus.ACTIVE) == {}
+
+
+def test_week_id_uses_iso_weeks():
+    assert week_id(datetime(2027, 1, 1)) == "2026-W53"
+    assert week_id(datetime(2026, 10, 19)) == "2026-W43"
+
+
+class _BrokenPipeline:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    async def execute(self):
+        raise ConnectionError("redis down")
+
+
+def test_post_commit_writes_survive_redis_errors():
+    leaderboards = Leaderboards(type("Redis", (), {"pipeline": lambda self, transaction: _BrokenPipeline()})())
+    before = dict(LEADERBOARD_WRITE_FAILURES.values)
+    asyncio.run(leaderboards.record_bet(uuid.uuid4(), 100))
+    asyncio.run(leaderboards.record_settlement(uuid.uuid4(), [(uuid.uuid4(), 100, 200, BetStatus.WON)], datetime.now(UTC)))
+    for operation in ("bet", "settlement"):
+        assert LEADERBOARD_WRITE_FAILURES.values[(operation,)] == before.get((operation,), 0) + 1
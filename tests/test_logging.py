@@ -0,0 +1,66 @@
+import asyncio
+import json
+import logging
+import queue
+
+from src.api.middleware import RequestContextMiddleware
+from src.core.logging import ContextFilter, EnqueueOnlyHandler, JsonFormatter, SamplingFilter, request_id_var
+
+
+def _record(name: str, level: int, msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_enqueued_record_is_resolved_and_tagged():
+    queued: queue.SimpleQueue = queue.SimpleQueue()
+    handler = EnqueueOnlyHandler(queued)
+    handler.addFilter(ContextFilter())
+    token = request_id_var.set("req-1")
+    try:
+        handler.handle(_record("src.test", logging.INFO, "bet %s placed", {"id": 1}))
+    finally:
+        request_id_var.reset(token)
+    record = queued.get_nowait()
+    assert record.msg == "bet {'id': 1} placed" and record.args is None
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["request_id"] == "req-1" and payload["message"] == "bet {'id': 1} placed"
+
+
+def test_sampling_keeps_whole_requests_and_all_warnings():
+    sampler = SamplingFilter({"src.sql": 0.5})
+    kept = set()
+    for i in range(200):
+        record = _record("src.sql", logging.INFO, "q")
+        record.request_id = f"r{i}"
+        again = _record("src.sql", logging.INFO, "q")
+        again.request_id = f"r{i}"
+        assert sampler.filter(record) == sampler.filter(again)
+        if sampler.filter(record):
+            kept.add(i)
+    assert 50 < len(kept) < 150
+    warning = _record("src.sql", logging.WARNING, "n+1")
+    warning.request_id = "dropped"
+    assert sampler.filter(warning)
+    assert sampler.filter(_record("src.other", logging.INFO, "x"))
+
+
+def test_request_id_is_propagated_and_echoed():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(request_id_var.get())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    def call(headers):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(RequestContextMiddleware(app)({"type": "http", "headers": headers}, None, send))
+        return dict(sent[0]["headers"])[b"x-request-id"].decode()
+
+    assert call([(b"x-request-id", b"edge-123")]) == "edge-123" == seen[-1]
+    generated = call([(b"x-request-id", b"bad id\n")])
+    assert generated == seen[-1] and len(generated) == 32
+    assert request_id_var.get() is None
@@ -0,0 +1,33 @@
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.api.routes.bets import rejection_reason
+from src.core.metrics import Histogram
+from src.main import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+    lines = histogram.render()
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_metrics_endpoint():
+    client = TestClient(app)
+    client.get('/health')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert 'db_pool_checked_out{pool="primary"} 0' in response.text
+
+
+def test_bet_rejection_reasons_are_a_fixed_set():
+    assert rejection_reason(HTTPException(status_code=400, detail="Betting locked")) == "betting_locked"
+    assert rejection_reason(HTTPException(status_code=400, detail="Team 7 is closed for user 42")) == "other"
+    assert rejection_reason(HTTPException(status_code=422, detail=[{"loc": ["body"]}])) == "other"
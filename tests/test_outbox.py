@@ -0,0 +1,55 @@
+import asyncio
+import uuid
+from datetime import timedelta
+
+from src.core.config import get_settings
+from src.models.entities import OutboxEvent, StreamStatus
+from src.services.outbox import OutboxRelay, record_event, redis_stream_key
+
+
+class _Session:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+
+def test_record_event_adds_json_ready_row_to_session():
+    session, stream_id, user_id = _Session(), uuid.uuid4(), uuid.uuid4()
+    record_event(session, "bet.placed", {"user_id": user_id, "status": StreamStatus.LIVE, "amount": 10}, stream_id)
+    [event] = session.added
+    assert isinstance(event, OutboxEvent)
+    assert event.payload == {"user_id": str(user_id), "status": "live", "amount": 10}
+    assert redis_stream_key(event.stream_id) == f"events:stream:{stream_id}"
+    assert redis_stream_key(None) == "events:global"
+
+
+class _RelaySession:
+    def __init__(self):
+        self.queries = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def scalar(self, stmt):
+        return True
+
+    async def scalars(self, stmt):
+        self.queries.append(stmt)
+        return []
+
+    async def rollback(self):
+        pass
+
+
+def test_relay_holds_back_rows_younger_than_safety_lag():
+    session = _RelaySession()
+    relay = OutboxRelay(redis=None, session_factory=lambda: session)  # type: ignore[arg-type]
+    assert asyncio.run(relay.publish_batch()) == 0
+    [query] = session.queries
+    assert "outbox.created_at < now() - " in str(query)
+    assert relay.safety_lag == timedelta(seconds=get_settings().outbox_safety_lag_seconds)
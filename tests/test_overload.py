@@ -0,0 +1,50 @@
+import asyncio
+
+from src.api.middleware import OverloadSheddingMiddleware
+from src.core.config import get_settings
+from src.core.overload import CRITICAL, LOW, NORMAL, classify, loop_lag
+
+
+async def _ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _call(middleware, method: str, path: str) -> tuple[int, dict]:
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def run():
+        await middleware({"type": "http", "method": method, "path": path, "headers": [], "query_string": b""}, receive, send)
+        await loop_lag.stop()
+
+    asyncio.run(run())
+    start = sent[0]
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}
+
+
+def test_classify_prefers_low_priority_reads():
+    low, critical = ("/admin", "/bets/me"), ("/bets", "/auth")
+    assert classify("GET", "/bets/me", low, critical) == LOW
+    assert classify("POST", "/bets", low, critical) == CRITICAL
+    assert classify("POST", "/admin/streams", low, critical) == NORMAL
+    assert classify("GET", "/streams", low, critical) == NORMAL
+
+
+def test_sheds_by_priority_as_pressure_rises():
+    settings = get_settings()
+    middleware = OverloadSheddingMiddleware(_ok)
+
+    middleware.in_flight = settings.overload_in_flight_soft
+    status, headers = _call(middleware, "GET", "/admin/users")
+    assert status == 503 and headers["retry-after"] == str(settings.overload_retry_after_seconds)
+    assert _call(middleware, "GET", "/streams")[0] == 200
+
+    middleware.in_flight = settings.overload_in_flight_hard
+    assert _call(middleware, "GET", "/streams")[0] == 503
+    assert _call(middleware, "POST", "/bets")[0] == 200
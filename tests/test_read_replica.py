@@ -0,0 +1,24 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.db.session import database, get_db, get_read_db
+
+
+def test_read_db_reuses_primary_session_without_replica(monkeypatch):
+    monkeypatch.setattr(database, "read_sessionmaker", None)
+    opened = []
+
+    async def fake_db():
+        session = object()
+        opened.append(session)
+        yield session
+
+    app = FastAPI()
+    app.dependency_overrides[get_db] = fake_db
+
+    @app.get("/read")
+    async def read(db=Depends(get_db), read_db=Depends(get_read_db)):
+        return {"shared": db is read_db}
+
+    assert TestClient(app).get("/read").json() == {"shared": True}
+    assert len(opened) == 1
@@ -0,0 +1,37 @@
+import asyncio
+
+from src.services.reconciliation import LedgerReconciler
+
+
+class _Session:
+    def __init__(self, free_after: int):
+        self.free_after = free_after
+        self.calls: list[str] = []
+
+    async def connection(self, execution_options=None):
+        self.calls.append(f"begin:{execution_options['isolation_level']}")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+    async def scalar(self, stmt):
+        name = "try_lock" if "pg_try_advisory_xact_lock" in str(stmt) else "wait_lock"
+        self.calls.append(name)
+        if name == "try_lock":
+            self.free_after -= 1
+            return self.free_after < 0
+        return None
+
+
+def test_run_retakes_snapshot_after_waiting_for_lock():
+    session = _Session(free_after=1)
+    asyncio.run(LedgerReconciler(session)._begin_locked())
+    assert session.calls == [
+        "begin:REPEATABLE READ",
+        "try_lock",
+        "rollback",
+        "wait_lock",
+        "rollback",
+        "begin:REPEATABLE READ",
+        "try_lock",
+    ]
@@ -0,0 +1,68 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.deps import get_redis, require_admin
+from src.api.routes import admin
+from src.db.session import get_db
+from src.models.entities import Stream, StreamStatus
+from src.services.scheduler import sync_betting_lock
+
+
+def test_sync_betting_lock_follows_status_and_schedule():
+    now = datetime.now(UTC)
+    stream = Stream(status=StreamStatus.SCHEDULED, start_time=now + timedelta(hours=1), betting_locked_at=now + timedelta(minutes=30))
+    sync_betting_lock(stream)
+    assert stream.is_betting_locked is False
+
+    stream.betting_locked_at = now - timedelta(seconds=1)
+    sync_betting_lock(stream)
+    assert stream.is_betting_locked is True
+
+    stream.betting_locked_at = now + timedelta(minutes=30)
+    stream.status = StreamStatus.LIVE
+    sync_betting_lock(stream)
+    assert stream.is_betting_locked is True
+
+
+class _Session:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        for obj in self.added:
+            if isinstance(obj, Stream):
+                obj.id, obj.created_at = uuid.uuid4(), datetime.now(UTC)
+
+    async def commit(self):
+        pass
+
+    async def scalars(self, stmt):
+        return []
+
+
+class _Redis:
+    async def publish(self, channel, message):
+        return 1
+
+
+def test_create_stream_accepts_naive_timestamps():
+    app = FastAPI()
+    app.include_router(admin.router)
+    app.dependency_overrides[get_db] = _Session
+    app.dependency_overrides[get_redis] = _Redis
+    app.dependency_overrides[require_admin] = lambda: SimpleNamespace(id=uuid.uuid4())
+    start = (datetime.now(UTC) + timedelta(hours=1)).replace(tzinfo=None).isoformat()
+    response = TestClient(app).post(
+        "/admin/streams",
+        json={"title": "Final", "stream_type": "twitch", "stream_url": "https://twitch.tv/x", "start_time": start, "betting_locked_at": start, "teams": [{"name": "A"}, {"name": "B"}]},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["is_betting_locked"] is False
+    assert response.json()["start_time"].endswith("Z") or response.json()["start_time"].endswith("+00:00")
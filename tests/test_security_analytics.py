@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.schemas.common import TelegramAuthIn
+from src.services import services
+from src.services.services import AuthService
+
+
+class _Session:
+    def add(self, obj):
+        pass
+
+    async def commit(self):
+        pass
+
+
+class _Redis:
+    def __init__(self, blocked: set[str]):
+        self.blocked = blocked
+        self.checked: list[tuple[str, ...]] = []
+
+    async def exists(self, *keys):
+        self.checked.append(keys)
+        return sum(key in self.blocked for key in keys)
+
+    async def publish(self, channel, message):
+        return 1
+
+
+def _login(redis):
+    request = SimpleNamespace(client=SimpleNamespace(host="203.0.113.7"), headers={})
+    payload = TelegramAuthIn(id=42, first_name="Victim", auth_date=0, hash="forged")
+    return asyncio.run(AuthService(_Session(), redis).telegram_login(payload, request))
+
+
+def test_forged_login_counts_against_ip_only(monkeypatch):
+    counted = []
+
+    async def rollup(db, attempt, telegram_id):
+        counted.append(("rollup", attempt.telegram_id, telegram_id))
+
+    async def detect(db, redis, ip, telegram_id):
+        counted.append(("detect", ip, telegram_id))
+
+    monkeypatch.setattr(services, "record_attempt_rollup", rollup)
+    monkeypatch.setattr(services, "detect_offenders", detect)
+    redis = _Redis(set())
+    with pytest.raises(HTTPException) as exc:
+        _login(redis)
+    assert exc.value.status_code == 401
+    assert counted == [("rollup", 42, None), ("detect", "203.0.113.7", None)]
+    assert redis.checked == [("secblock:ip:203.0.113.7",)]
+
+
+def test_telegram_block_applies_only_after_signature(monkeypatch):
+    monkeypatch.setattr(services, "verify_telegram_payload", lambda data: True)
+    redis = _Redis({"secblock:tg:42"})
+    with pytest.raises(HTTPException) as exc:
+        _login(redis)
+    assert exc.value.status_code == 403
+    assert redis.checked[-1] == ("secblock:ip:203.0.113.7", "secblock:tg:42")
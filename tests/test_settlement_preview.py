@@ -0,0 +1,52 @@
+import asyncio
+import random
+import uuid
+from types import SimpleNamespace
+
+from redis.asyncio import Redis
+
+from src.services.services import BettingService, winner_gain
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class _Session:
+    def __init__(self, teams, bets):
+        self.results = [_Rows(teams), _Rows(bets)]
+
+    async def get(self, model, key):
+        return SimpleNamespace(id=key)
+
+    async def execute(self, stmt):
+        return self.results.pop(0)
+
+
+def test_preview_matches_settlement_rule():
+    a, b, empty = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    rng = random.Random(7)
+    bets = [(rng.choice((a, b)), rng.randint(1, 10_000), uuid.uuid4(), uuid.uuid4()) for _ in range(5_000)]
+    service = BettingService(_Session([(a, "A"), (b, "B"), (empty, "C")], bets), Redis())  # type: ignore[arg-type]
+    preview = asyncio.run(service.preview_settlement(uuid.uuid4(), top=3))
+
+    total = sum(amount for _, amount, *_ in bets)
+    assert preview.total_pool == total and preview.bets == len(bets)
+    outcomes = {o.team_id: o for o in preview.outcomes}
+    for team in (a, b):
+        stakes = [amount for team_id, amount, *_ in bets if team_id == team]
+        winners_pool = sum(stakes)
+        paid = sum(amount + winner_gain(amount, winners_pool, total - winners_pool) for amount in stakes)
+        outcome = outcomes[team]
+        assert outcome.winners == len(stakes) and outcome.total_paid == paid
+        assert outcome.total_paid + outcome.rounding_remainder == total
+        assert [p.amount for p in outcome.top_payouts] == sorted(stakes, reverse=True)[:3]
+    refund = outcomes[empty]
+    assert refund.refunded and refund.total_paid == total and refund.rounding_remainder == 0
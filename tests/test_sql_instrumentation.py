@@ -0,0 +1,31 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.middleware import SQLInstrumentationMiddleware
+from src.db.instrumentation import QueryStats, current_query_stats
+
+
+def test_query_stats_flags_repeated_statements():
+    stats = QueryStats(detect_repeats=True)
+    for _ in range(6):
+        stats.record("SELECT teams.id FROM teams WHERE teams.stream_id = $1", 1.0)
+    stats.record("SELECT streams.id FROM streams", 3.0)
+
+    assert stats.count == 7
+    assert stats.slowest_statement == "SELECT streams.id FROM streams"
+    assert stats.repeated(5) == [("SELECT teams.id FROM teams WHERE teams.stream_id = $1", 6)]
+
+
+def test_server_timing_header_reports_queries(assert_max_queries):
+    app = FastAPI()
+    app.add_middleware(SQLInstrumentationMiddleware)
+
+    @app.get("/fake")
+    async def fake():
+        for _ in range(3):
+            current_query_stats.get().record("SELECT 1", 0.5)
+        return {}
+
+    response = TestClient(app).get("/fake")
+    assert 'desc="3 queries"' in response.headers["server-timing"]
+    assert_max_queries(response, 3)
@@ -0,0 +1,48 @@
+import asyncio
+import json
+import uuid
+
+import httpx
+
+from benchmarks.replay import Cast, replay, replayable, synthetic_trace
+from src.core.security import create_access_token
+from src.core.traffic import TrafficRecorder, bearer_subject
+
+
+def test_capture_pseudonyms_are_stable_and_hide_ids(tmp_path):
+    user_id = str(uuid.uuid4())
+    assert bearer_subject(f"Bearer {create_access_token(user_id)}".encode()) == user_id
+    assert bearer_subject(b"Bearer garbage") is None
+    recorder = TrafficRecorder(tmp_path / "capture.jsonl", b"secret")
+    other = TrafficRecorder(tmp_path / "other.jsonl", b"secret")
+    assert recorder.pseudonym(user_id) == other.pseudonym(user_id) != user_id
+    recorder.record({"route": "/streams"})
+    recorder.close()
+    other.close()
+    assert json.loads((tmp_path / "capture.jsonl").read_text()) == {"route": "/streams"}
+
+
+def test_replay_drives_trace_and_reports_per_route():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append((scope["method"], scope["path"], dict(scope["headers"]).get(b"authorization") is not None))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    trace = synthetic_trace(200, rps=5_000, users=20, streams=3)
+    trace += [{"t": trace[-1]["t"], "method": "POST", "route": "/admin/streams", "user": "u1", "stream": None}]
+    assert not replayable(trace[-1])
+    streams = [(uuid.uuid4(), [uuid.uuid4(), uuid.uuid4()]) for _ in range(3)]
+    cast = Cast([uuid.uuid4() for _ in range(20)], streams)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay") as client:
+            return await replay(client, trace, cast, speed=10, max_in_flight=1_000)
+
+    results = asyncio.run(run())
+    assert results["replay.total"]["n"] == 200 == len(seen)
+    assert results["replay.total"]["skipped"] == {"POST /admin/streams": 1}
+    assert all(has_auth for *_, has_auth in seen)
+    assert {path.split("/")[2] for method, path, _ in seen if path.startswith("/streams/")} <= {str(s) for s, _ in streams}
+    assert results["replay.POST /bets"]["statuses"] == {"200": results["replay.POST /bets"]["n"]}
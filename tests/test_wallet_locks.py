@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import DBAPIError
+
+from src.core.config import get_settings
+from src.services.wallet_locks import run_with_lock_retry
+
+
+class _PgError(Exception):
+    def __init__(self, sqlstate: str):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+class _Session:
+    def __init__(self):
+        self.commits = self.rollbacks = 0
+
+    async def execute(self, stmt):
+        return None
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+def test_retries_deadlock_then_commits():
+    session, calls = _Session(), []
+
+    async def body():
+        calls.append(1)
+        if len(calls) == 1:
+            raise DBAPIError("UPDATE wallets", {}, _PgError("40P01"))
+        return "ok"
+
+    assert asyncio.run(run_with_lock_retry(session, "test", body)) == "ok"
+    assert (len(calls), session.rollbacks, session.commits) == (2, 1, 1)
+
+
+def test_gives_up_with_503_after_retries():
+    session = _Session()
+
+    async def body():
+        raise DBAPIError("SELECT ... FOR UPDATE", {}, _PgError("55P03"))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run_with_lock_retry(session, "test", body))
+    assert exc.value.status_code == 503
+    assert session.rollbacks == get_settings().wallet_lock_retries + 1